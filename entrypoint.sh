@@ -4,4 +4,4 @@ echo "Running database population script..."
 python scripts/populate_db.py || true  
 
 echo "Starting Dash application..."
-exec poetry run python src/dash/main.py 
\ No newline at end of file
+exec poetry run gunicorn -c python:src.dash.serve src.dash.main:server 
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+Summary tables behind the dashboard widgets.
+
+The dashboard pipeline computes them once per run from the dash collection
+and stores them in the snapshot, so the dashboard reads tables whose size
+depends on the number of locations and room types instead of computing
+them from every listing.
+
+Every table is computed for each transaction and estate type, and for each
+transaction with all the estate types together (`ALL_ESTATES`), since
+medians of the separate estate types cannot be combined afterwards.
+"""
+
+import pandas as pd
+
+MIN_AREA = 10
+MAX_AREA = 500_000
+
+ALL_ESTATES = 'ALL'
+SEGMENT = ['transaction', 'estate']
+
+
+def dashboard_listings(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keeps the listings with a plausible area, as shown in the dashboard.
+    """
+
+    return df[
+        (df['areaInSquareMeters'] > MIN_AREA)
+        & (df['areaInSquareMeters'] < MAX_AREA)
+    ].reset_index(drop=True)
+
+
+def with_all_estates(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Appends a copy of the listings with the estate set to `ALL_ESTATES`,
+    so grouping by `SEGMENT` also gives the totals of each transaction.
+    """
+
+    return pd.concat([df, df.assign(estate=ALL_ESTATES)], ignore_index=True)
+
+
+def location_prices(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Mean and median total price by location.
+    """
+
+    return (
+        with_all_estates(df)
+        .groupby([*SEGMENT, 'location'])['totalPrice']
+        .agg(['mean', 'median'])
+        .round(0)
+        .reset_index()
+    )
+
+
+def price_heatmap(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Median price per square meter by location and number of rooms.
+    """
+
+    return (
+        with_all_estates(df)
+        .groupby([*SEGMENT, 'location', 'roomsNumberNotation'])[
+            'pricePerSquareMeter'
+        ]
+        .median()
+        .reset_index()
+    )
+
+
+def room_breakdown(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Number of listings by number of rooms and location, and their
+    proportion of the listings of the segment.
+    """
+
+    counts = (
+        with_all_estates(df)
+        .groupby([*SEGMENT, 'roomsNumberNotation', 'location'])
+        .size()
+        .rename('count')
+        .reset_index()
+    )
+    counts['proportion'] = counts['count'] / counts.groupby(SEGMENT)[
+        'count'
+    ].transform('sum')
+
+    return counts
+
+
+def headline(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Number of listings and median prices.
+    """
+
+    return (
+        with_all_estates(df)
+        .groupby(SEGMENT)
+        .agg(
+            listings=('id', 'size'),
+            median_price=('totalPrice', 'median'),
+            median_price_per_m2=('pricePerSquareMeter', 'median'),
+        )
+        .reset_index()
+    )
+
+
+AGGREGATES = {
+    'location_prices': location_prices,
+    'price_heatmap': price_heatmap,
+    'room_breakdown': room_breakdown,
+    'headline': headline,
+}
+
+
+def compute_aggregates(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Computes every summary table from the listings of the dash collection.
+
+    Args:
+        df (pd.DataFrame): The listings.
+
+    Returns:
+        dict[str, pd.DataFrame]: The tables, keyed by name.
+    """
+
+    listings = dashboard_listings(df)
+
+    return {
+        name: aggregate(listings) for name, aggregate in AGGREGATES.items()
+    }
+
+
+def select_segment(
+    table: pd.DataFrame, transaction: str, estate: str | None = None
+) -> pd.DataFrame:
+    """
+    Returns the rows of a summary table for a transaction and an estate
+    type, or all the estate types if `estate` is None.
+
+    Args:
+        table (pd.DataFrame): The summary table.
+        transaction (str): The transaction, e.g. 'SELL'.
+        estate (str | None): Optional; The estate type, e.g. 'FLAT'.
+
+    Returns:
+        pd.DataFrame: The rows of the segment, without the segment columns.
+    """
+
+    rows = table[
+        (table['transaction'] == transaction)
+        & (table['estate'] == (estate or ALL_ESTATES))
+    ]
+
+    return rows.drop(columns=SEGMENT).reset_index(drop=True)
@@ -0,0 +1,271 @@
+from datetime import datetime, timezone
+from typing import AsyncIterator
+
+from pymongo import AsyncMongoClient, errors
+
+from src.core.bulk_writer import BulkWriter, BulkWriteResult, OnDuplicate
+from src.core.indexes import indexes_to_ensure
+from src.core.mongodb import build_projection, client_options
+from src.core.settings import settings
+
+
+class AsyncMongoConnection:
+    def __init__(self, database: str | None = None):
+        """
+        Initializes the AsyncMongoConnection instance.
+
+        This is the asyncio counterpart of `MongoConnection`, built on the
+        native PyMongo async client, so documents can be written from inside
+        the event loop without blocking it or going through a thread pool.
+
+        Unlike `MongoConnection`, it is not a singleton: an async client is
+        bound to the event loop it was created in, so each loop needs its own
+        connection. Use it as an async context manager so the client is
+        closed when the loop is done with it.
+
+        Args:
+            database (str | None): Optional; The database to use. Defaults
+            to `MONGO_DATABASE` from the settings.
+        """
+
+        self.host = settings.MONGO_HOST
+        self.port = settings.MONGO_PORT
+        self.database_name = database or settings.MONGO_DATABASE
+        self._ensured_indexes: set[tuple[str, str]] = set()
+        self._connect()
+
+    async def __aenter__(self) -> 'AsyncMongoConnection':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close_connection()
+
+    def _connect(self) -> None:
+        """
+        Creates the async client and selects the database as specified
+        in the configuration settings. The client connects lazily, on the
+        first operation.
+        """
+
+        self._client = AsyncMongoClient(
+            self.host, self.port, **client_options()
+        )
+        self._db = self._client[self.database_name]
+
+    async def ping(self) -> bool:
+        """
+        Pings the MongoDB server to check if the connection is alive.
+
+        Returns:
+            bool: True if the connection is successful, False otherwise.
+        """
+
+        try:
+            await self._client.admin.command('ping')
+            return True
+        except errors.ServerSelectionTimeoutError:
+            print('Server selection timed out. Unable to connect to MongoDB.')
+            return False
+        except errors.PyMongoError as e:
+            print(f'An error occurred while connecting to MongoDB: {e}')
+            return False
+
+    async def set_collection(self, collection: str, unique_index: str = ''):
+        """
+        Returns the collection to interact with, making sure its declared
+        indexes exist.
+
+        Args:
+            collection (str): The name of the collection to use.
+            unique_index (str): Optional; An extra field to be indexed
+            uniquely, if the collection does not declare it already.
+
+        Returns:
+            AsyncCollection: The async collection.
+        """
+
+        await self.ensure_indexes(
+            collection=collection, unique_index=unique_index
+        )
+        return self._db[collection]
+
+    async def ensure_indexes(
+        self, collection: str, unique_index: str = ''
+    ) -> None:
+        """
+        Creates the indexes declared for the collection in
+        `src.core.indexes`, plus the optional unique index, once per
+        collection for this connection. If they cannot be created, they
+        are tried again on the next call.
+
+        Args:
+            collection (str): The name of the collection.
+            unique_index (str): Optional; An extra field to be indexed
+            uniquely.
+        """
+
+        if (collection, unique_index) in self._ensured_indexes:
+            return
+
+        indexes = indexes_to_ensure(
+            collection=collection, unique_index=unique_index
+        )
+
+        if indexes:
+            try:
+                await self._db[collection].create_indexes(indexes)
+            except errors.OperationFailure as e:
+                print(
+                    f'It was not possible to create the indexes of '
+                    f'"{collection}" collection: {e}'
+                )
+                return
+
+        self._ensured_indexes.add((collection, unique_index))
+
+    async def save_data(
+        self,
+        collection: str,
+        data: list[dict],
+        unique_index: str = '',
+        on_duplicate: OnDuplicate = 'skip',
+    ) -> BulkWriteResult:
+        """
+        Saves a list of documents to the specified collection.
+
+        The documents are written in parallel, unordered chunks by a
+        `BulkWriter`, so a duplicated key does not abort the whole write.
+
+        Args:
+            collection (str): The name of the collection where data will
+            be saved.
+            data (list[dict]): The list of documents to be inserted.
+            unique_index (str): Optional; The unique index field to be used.
+            on_duplicate (OnDuplicate): Optional; 'skip' to ignore documents
+            whose `id` already exists, or 'upsert' to replace them.
+
+        Returns:
+            BulkWriteResult: The inserted, updated, duplicated and failed
+            counts, and the time spent writing.
+        """
+
+        mongo_collection = await self.set_collection(
+            collection=collection, unique_index=unique_index
+        )
+
+        if not data:
+            print('There are no records to insert.')
+            return BulkWriteResult()
+
+        result = await BulkWriter(on_duplicate=on_duplicate).write_async(
+            mongo_collection, data
+        )
+
+        print(f'Data saved in MongoDB. {result.describe(collection)}')
+        for error in result.errors[:5]:
+            print(f'ERROR: {error}')
+
+        return result
+
+    async def get_data_from_collection(
+        self,
+        collection: str,
+        filter: dict | None = None,
+        fields: list | None = None,
+    ) -> list[dict]:
+        """
+        Retrieves data from the specified collection.
+
+        Args:
+            collection (str): The name of the collection to query.
+            filter (dict | None): Optional; The filter criteria for the query.
+            fields (list | None): Optional; The list of fields to include in
+            the results.
+
+        Returns:
+            list[dict]: A list of documents retrieved from the collection.
+        """
+
+        mongo_collection = await self.set_collection(collection=collection)
+
+        cursor = mongo_collection.find(
+            filter=filter, projection=build_projection(fields)
+        )
+        return await cursor.to_list()
+
+    async def iter_batches(
+        self,
+        collection: str,
+        filter: dict | None = None,
+        fields: list | None = None,
+        batch_size: int | None = None,
+    ) -> AsyncIterator[list[dict]]:
+        """
+        Streams the documents of the specified collection in batches.
+
+        Args:
+            collection (str): The name of the collection to query.
+            filter (dict | None): Optional; The filter criteria for the query.
+            fields (list | None): Optional; The list of fields to include in
+            the results.
+            batch_size (int | None): Optional; The number of documents per
+            batch. Defaults to `MONGO_BATCH_SIZE` from the settings.
+
+        Yields:
+            list[dict]: The next batch of documents.
+        """
+
+        mongo_collection = await self.set_collection(collection=collection)
+
+        batch_size = batch_size or settings.MONGO_BATCH_SIZE
+        cursor = mongo_collection.find(
+            filter=filter, projection=build_projection(fields)
+        ).batch_size(batch_size)
+
+        batch: list[dict] = []
+        async for document in cursor:
+            batch.append(document)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+    async def update_is_available(
+        self, collection: str, unique_index: str, ids: list[int]
+    ) -> None:
+        """
+        Updates the 'is_available' field to False for the given list of ids,
+        stamping them with the `updated_at` time.
+
+        Args:
+            collection (str): The name of the collection to update.
+            unique_index (str): The unique index field to use.
+            ids (list[int]): The list of ids to be updated.
+        """
+
+        mongo_collection = await self.set_collection(
+            collection=collection, unique_index=unique_index
+        )
+        try:
+            result = await mongo_collection.update_many(
+                {'id': {'$in': ids}},
+                {
+                    '$set': {
+                        'is_available': False,
+                        'updated_at': datetime.now(timezone.utc),
+                    }
+                },
+            )
+            print(f'Matched {result.matched_count} documents.')
+            print(f'Modified {result.modified_count} documents.')
+        except errors.PyMongoError as e:
+            print(f'An error occurred: {e}')
+
+    async def close_connection(self) -> None:
+        """
+        Closes the connection to the MongoDB server.
+        """
+
+        await self._client.close()
@@ -0,0 +1,289 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Literal
+
+import bson
+from pymongo import InsertOne, ReplaceOne, errors
+
+from src.core.settings import settings
+
+DUPLICATE_KEY_ERROR = 11000
+UNIQUE_KEY = 'id'
+
+OnDuplicate = Literal['skip', 'upsert']
+
+
+@dataclass
+class BulkWriteResult:
+    """
+    Summary of a bulk write.
+
+    Attributes:
+        inserted (int): Documents inserted, including upserted ones.
+        updated (int): Existing documents replaced by an upsert.
+        duplicates (int): Documents skipped because their key already
+        existed.
+        failed (int): Documents that could not be written.
+        elapsed (float): Seconds spent writing.
+        errors (list[str]): The messages of the failed writes.
+        failed_ids (list): The `id` of the documents that could not be
+        written.
+    """
+
+    inserted: int = 0
+    updated: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    errors: list[str] = field(default_factory=list)
+    failed_ids: list = field(default_factory=list)
+
+    def describe(self, collection: str) -> str:
+        return (
+            f'Added {self.inserted} and updated {self.updated} records in '
+            f'"{collection}" collection in {self.elapsed:.2f}s '
+            f'({self.duplicates} duplicates skipped, {self.failed} failed).'
+        )
+
+    def merge(self, other: 'BulkWriteResult') -> None:
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.duplicates += other.duplicates
+        self.failed += other.failed
+        self.errors.extend(other.errors)
+        self.failed_ids.extend(other.failed_ids)
+
+
+def split_chunks(
+    documents: list[dict], chunk_size: int, chunk_bytes: int
+) -> list[list[dict]]:
+    """
+    Splits documents into chunks with at most `chunk_size` documents and,
+    unless a single document is bigger, at most `chunk_bytes` of BSON.
+
+    Args:
+        documents (list[dict]): The documents to split.
+        chunk_size (int): The maximum number of documents per chunk.
+        chunk_bytes (int): The maximum BSON size of a chunk.
+
+    Returns:
+        list[list[dict]]: The chunks, in the original order.
+    """
+
+    chunks: list[list[dict]] = []
+    chunk: list[dict] = []
+    size = 0
+
+    for document in documents:
+        document_size = len(bson.encode(document))
+
+        if chunk and (
+            len(chunk) == chunk_size or size + document_size > chunk_bytes
+        ):
+            chunks.append(chunk)
+            chunk = []
+            size = 0
+
+        chunk.append(document)
+        size += document_size
+
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Whether a write error is worth retrying: network errors, timeouts and
+    anything the server labels as a retryable write error.
+    """
+
+    if isinstance(error, (errors.AutoReconnect, errors.ExecutionTimeout)):
+        return True
+
+    return isinstance(error, errors.PyMongoError) and error.has_error_label(
+        'RetryableWriteError'
+    )
+
+
+class BulkWriter:
+    def __init__(
+        self,
+        on_duplicate: OnDuplicate = 'skip',
+        chunk_size: int | None = None,
+        chunk_bytes: int | None = None,
+        workers: int | None = None,
+        max_retries: int | None = None,
+    ) -> None:
+        """
+        Writes documents in parallel, unordered chunks.
+
+        Duplicate keys never abort a write: with `on_duplicate='skip'` the
+        duplicated documents are counted and skipped, and with
+        `on_duplicate='upsert'` they replace the stored document with the
+        same `id`. Chunks failing with transient errors are retried with an
+        exponential backoff.
+
+        Args:
+            on_duplicate (OnDuplicate): Optional; 'skip' or 'upsert'.
+            Defaults to 'skip'.
+            chunk_size (int | None): Optional; Maximum documents per chunk.
+            Defaults to `BULK_WRITE_CHUNK_SIZE` from the settings.
+            chunk_bytes (int | None): Optional; Maximum BSON bytes per chunk.
+            Defaults to `BULK_WRITE_CHUNK_BYTES` from the settings.
+            workers (int | None): Optional; How many chunks are written at
+            the same time. Defaults to `BULK_WRITE_WORKERS`.
+            max_retries (int | None): Optional; Retries for a chunk failing
+            with a transient error. Defaults to `BULK_WRITE_MAX_RETRIES`.
+        """
+
+        self.on_duplicate = on_duplicate
+        self.chunk_size = chunk_size or settings.BULK_WRITE_CHUNK_SIZE
+        self.chunk_bytes = chunk_bytes or settings.BULK_WRITE_CHUNK_BYTES
+        self.workers = workers or settings.BULK_WRITE_WORKERS
+        self.max_retries = (
+            settings.BULK_WRITE_MAX_RETRIES
+            if max_retries is None
+            else max_retries
+        )
+
+    def write(self, collection, documents: list[dict]) -> BulkWriteResult:
+        """
+        Writes the documents to a PyMongo collection, using a thread pool
+        to send several chunks at once.
+
+        Args:
+            collection (Collection): The collection to write to.
+            documents (list[dict]): The documents to write.
+
+        Returns:
+            BulkWriteResult: The summary of the write.
+        """
+
+        start = time.perf_counter()
+        result = BulkWriteResult()
+
+        chunks = split_chunks(documents, self.chunk_size, self.chunk_bytes)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for chunk_result in executor.map(
+                lambda chunk: self._write_chunk(collection, chunk), chunks
+            ):
+                result.merge(chunk_result)
+
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    async def write_async(
+        self, collection, documents: list[dict]
+    ) -> BulkWriteResult:
+        """
+        Writes the documents to a PyMongo async collection, with at most
+        `workers` chunks in flight.
+
+        Args:
+            collection (AsyncCollection): The collection to write to.
+            documents (list[dict]): The documents to write.
+
+        Returns:
+            BulkWriteResult: The summary of the write.
+        """
+
+        start = time.perf_counter()
+        result = BulkWriteResult()
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def write_chunk(chunk: list[dict]) -> BulkWriteResult:
+            async with semaphore:
+                return await self._write_chunk_async(collection, chunk)
+
+        chunks = split_chunks(documents, self.chunk_size, self.chunk_bytes)
+        for chunk_result in await asyncio.gather(*map(write_chunk, chunks)):
+            result.merge(chunk_result)
+
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _write_chunk(self, collection, chunk: list[dict]) -> BulkWriteResult:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = collection.bulk_write(
+                    self._requests(chunk), ordered=False
+                )
+                return self._from_response(response.bulk_api_result, chunk)
+            except errors.BulkWriteError as e:
+                return self._from_response(e.details, chunk)
+            except errors.PyMongoError as e:
+                if not is_transient(e) or attempt == self.max_retries:
+                    return self._failed(chunk, e)
+                time.sleep(self._backoff(attempt))
+
+    async def _write_chunk_async(
+        self, collection, chunk: list[dict]
+    ) -> BulkWriteResult:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await collection.bulk_write(
+                    self._requests(chunk), ordered=False
+                )
+                return self._from_response(response.bulk_api_result, chunk)
+            except errors.BulkWriteError as e:
+                return self._from_response(e.details, chunk)
+            except errors.PyMongoError as e:
+                if not is_transient(e) or attempt == self.max_retries:
+                    return self._failed(chunk, e)
+                await asyncio.sleep(self._backoff(attempt))
+
+    def _requests(self, chunk: list[dict]) -> list:
+        if self.on_duplicate == 'upsert':
+            return [
+                ReplaceOne(
+                    {UNIQUE_KEY: document[UNIQUE_KEY]},
+                    {k: v for k, v in document.items() if k != '_id'},
+                    upsert=True,
+                )
+                for document in chunk
+            ]
+
+        return [InsertOne(document) for document in chunk]
+
+    @staticmethod
+    def _from_response(details: dict, chunk: list[dict]) -> BulkWriteResult:
+        """
+        Builds the result of a chunk from the `bulk_api_result` of a
+        successful write, or the `details` of a BulkWriteError. A retried
+        chunk that was partially written reports the documents written by
+        the first attempt as duplicates.
+        """
+
+        result = BulkWriteResult(
+            inserted=details.get('nInserted', 0) + details.get('nUpserted', 0),
+            updated=details.get('nMatched', 0),
+        )
+
+        for write_error in details.get('writeErrors', []):
+            if write_error.get('code') == DUPLICATE_KEY_ERROR:
+                result.duplicates += 1
+            else:
+                result.failed += 1
+                result.errors.append(write_error.get('errmsg', ''))
+                result.failed_ids.append(
+                    chunk[write_error['index']].get(UNIQUE_KEY)
+                )
+
+        return result
+
+    @staticmethod
+    def _failed(chunk: list[dict], error: Exception) -> BulkWriteResult:
+        return BulkWriteResult(
+            failed=len(chunk),
+            errors=[str(error)],
+            failed_ids=[document.get(UNIQUE_KEY) for document in chunk],
+        )
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        return 0.5 * 2**attempt
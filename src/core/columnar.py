@@ -0,0 +1,234 @@
+"""
+Columnar reads from MongoDB into pandas.
+
+Instead of materializing the whole collection as a list of dicts and then
+building a DataFrame from it, documents are streamed in batches and each
+batch is turned into columns right away. Only one batch of documents is held
+in memory at a time.
+
+Fields can be dotted paths (e.g. 'totalPrice.value'); the column keeps the
+dotted name.
+
+Frames kept in memory for a long time, like the dashboard listings, can be
+made compact with a schema: low-cardinality text columns become
+categoricals, filtered by their integer codes, and numeric columns are
+downcast to the narrowest type that keeps their values.
+"""
+
+from typing import Iterator, Literal
+
+import numpy as np
+import pandas as pd
+
+from src.core.mongodb import MongoConnection
+
+
+def get_path(document: dict, path: list[str]):
+    """
+    Returns the value of a nested field, or None if any part is missing.
+    """
+
+    value = document
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+
+    return value
+
+
+def frame_from_batch(batch: list[dict], fields: list[str]) -> pd.DataFrame:
+    """
+    Builds a DataFrame from a batch of documents, one column per field.
+
+    Args:
+        batch (list[dict]): The documents of the batch.
+        fields (list[str]): The fields to extract, dotted for nested fields.
+
+    Returns:
+        pd.DataFrame: A DataFrame with one column per field.
+    """
+
+    columns = {}
+    for field in fields:
+        if '.' in field:
+            path = field.split('.')
+            columns[field] = [get_path(document, path) for document in batch]
+        else:
+            columns[field] = [document.get(field) for document in batch]
+
+    return pd.DataFrame(columns)
+
+
+def iter_frames(
+    mongo_conn: MongoConnection,
+    collection: str,
+    fields: list[str],
+    filter: dict | None = None,
+    batch_size: int | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Streams a collection as DataFrames of at most `batch_size` rows.
+
+    Args:
+        mongo_conn (MongoConnection): An active MongoDB connection.
+        collection (str): The name of the collection to query.
+        fields (list[str]): The fields to read, dotted for nested fields.
+        filter (dict | None): Optional; The filter criteria for the query.
+        batch_size (int | None): Optional; The number of documents per
+        batch. Defaults to `MONGO_BATCH_SIZE` from the settings.
+
+    Yields:
+        pd.DataFrame: The next batch as a DataFrame.
+    """
+
+    for batch in mongo_conn.iter_batches(
+        collection=collection,
+        filter=filter,
+        fields=fields,
+        batch_size=batch_size,
+    ):
+        yield frame_from_batch(batch=batch, fields=fields)
+
+
+def read_dataframe(
+    mongo_conn: MongoConnection,
+    collection: str,
+    fields: list[str],
+    filter: dict | None = None,
+    batch_size: int | None = None,
+) -> pd.DataFrame:
+    """
+    Reads the projected fields of a collection into a single DataFrame,
+    converting the documents to columns batch by batch.
+
+    Args:
+        mongo_conn (MongoConnection): An active MongoDB connection.
+        collection (str): The name of the collection to query.
+        fields (list[str]): The fields to read, dotted for nested fields.
+        filter (dict | None): Optional; The filter criteria for the query.
+        batch_size (int | None): Optional; The number of documents per
+        batch. Defaults to `MONGO_BATCH_SIZE` from the settings.
+
+    Returns:
+        pd.DataFrame: The collection data, one column per field.
+    """
+
+    frames = list(
+        iter_frames(
+            mongo_conn=mongo_conn,
+            collection=collection,
+            fields=fields,
+            filter=filter,
+            batch_size=batch_size,
+        )
+    )
+
+    if not frames:
+        return pd.DataFrame(columns=fields)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+ColumnKind = Literal['category', 'numeric']
+
+
+def downcast_numeric(series: pd.Series) -> pd.Series:
+    """
+    Downcasts a numeric column: to the narrowest integer type if every value
+    is a whole number, or to float32 otherwise.
+    """
+
+    values = pd.to_numeric(series)
+    if values.notna().all() and (values % 1 == 0).all():
+        return pd.to_numeric(values.astype('int64'), downcast='integer')
+
+    return values.astype('float32')
+
+
+def compact_frame(
+    df: pd.DataFrame, schema: dict[str, ColumnKind]
+) -> pd.DataFrame:
+    """
+    Keeps only the columns in the schema, converting the 'category' ones to
+    categoricals and downcasting the 'numeric' ones.
+
+    Args:
+        df (pd.DataFrame): The frame to compact.
+        schema (dict[str, ColumnKind]): The kind of each column to keep.
+
+    Returns:
+        pd.DataFrame: The compact frame.
+    """
+
+    columns = {}
+    for column, kind in schema.items():
+        if kind == 'category':
+            columns[column] = df[column].astype('category')
+        else:
+            columns[column] = downcast_numeric(df[column])
+
+    return pd.DataFrame(columns, index=df.index)
+
+
+def memory_usage(df: pd.DataFrame) -> int:
+    """
+    Returns the bytes used by a frame, including the contents of its
+    strings.
+    """
+
+    return int(df.memory_usage(deep=True).sum())
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> str:
+    """
+    Describes the memory saved by compacting a frame, column by column.
+
+    Args:
+        before (pd.DataFrame): The original frame.
+        after (pd.DataFrame): The compact frame.
+
+    Returns:
+        str: The report, one line per column and a total.
+    """
+
+    before_bytes = before.memory_usage(deep=True, index=False)
+    after_bytes = after.memory_usage(deep=True, index=False)
+
+    lines = [f'{"column":<25}{"before":>12}{"after":>12}  type']
+    for column in before.columns:
+        after_size = after_bytes.get(column, 0)
+        dtype = after[column].dtype if column in after else 'dropped'
+        lines.append(
+            f'{column:<25}{before_bytes[column]:>12}{after_size:>12}  {dtype}'
+        )
+
+    total_before = memory_usage(before)
+    total_after = memory_usage(after)
+    saved = 1 - total_after / total_before if total_before else 0
+    lines.append(
+        f'{"total":<25}{total_before:>12}{total_after:>12}  '
+        f'{saved:.0%} smaller'
+    )
+
+    return '\n'.join(lines)
+
+
+def category_mask(series: pd.Series, value) -> np.ndarray:
+    """
+    Compares a categorical column with a value through the integer codes,
+    instead of comparing every string.
+
+    Args:
+        series (pd.Series): The categorical column.
+        value: The category to match.
+
+    Returns:
+        np.ndarray: A boolean mask, all False if `value` is not a category.
+    """
+
+    categories = series.cat.categories
+    if value not in categories:
+        return np.zeros(len(series), dtype=bool)
+
+    return series.array.codes == categories.get_loc(value)
@@ -0,0 +1,161 @@
+"""
+Declarative index specification for the MongoDB collections.
+
+Each collection declares the indexes it needs and the queries the pipeline
+runs against it. `MongoConnection` creates the declared indexes the first
+time a collection is used in the process, and `index_report` uses the
+queries to show which index MongoDB picks for each of them.
+
+Raw collections are named `raw_<site-name>` by the crawlers, so they are
+matched by prefix.
+"""
+
+from pymongo import ASCENDING, IndexModel
+
+from src.core.settings import settings
+
+RAW_PREFIX = 'raw_'
+
+
+def is_raw_collection(collection: str) -> bool:
+    return collection == settings.COLLECTION_RAW or collection.startswith(
+        RAW_PREFIX
+    )
+
+
+def index_spec(collection: str) -> list[IndexModel]:
+    """
+    Returns the indexes declared for a collection.
+
+    Args:
+        collection (str): The name of the collection.
+
+    Returns:
+        list[IndexModel]: The declared indexes, empty if the collection has
+        none.
+    """
+
+    if collection == settings.COLLECTION_CONSOLIDATE:
+        return [
+            IndexModel([('id', ASCENDING)], unique=True),
+            IndexModel([('is_available', ASCENDING)]),
+            IndexModel([('updated_at', ASCENDING)]),
+        ]
+
+    if collection == settings.COLLECTION_DASH:
+        return [
+            IndexModel([('id', ASCENDING)], unique=True),
+            IndexModel([
+                ('district', ASCENDING),
+                ('transaction', ASCENDING),
+                ('estate', ASCENDING),
+                ('location', ASCENDING),
+            ]),
+        ]
+
+    if is_raw_collection(collection):
+        return [
+            IndexModel([('id', ASCENDING)]),
+            IndexModel([('crawl_run_id', ASCENDING)]),
+        ]
+
+    return []
+
+
+def indexes_to_ensure(
+    collection: str, unique_index: str = ''
+) -> list[IndexModel]:
+    """
+    Returns the declared indexes of a collection, plus a unique index on
+    `unique_index` when the collection does not declare one on that field.
+
+    Args:
+        collection (str): The name of the collection.
+        unique_index (str): Optional; An extra field to be indexed uniquely.
+
+    Returns:
+        list[IndexModel]: The indexes to create.
+    """
+
+    indexes = index_spec(collection)
+    declared_keys = [next(iter(index.document['key'])) for index in indexes]
+
+    if unique_index and unique_index not in declared_keys:
+        indexes.append(IndexModel([(unique_index, ASCENDING)], unique=True))
+
+    return indexes
+
+
+def query_spec(collection: str) -> dict[str, dict]:
+    """
+    Returns the filters of the queries the pipeline runs on a collection,
+    keyed by a short description.
+
+    Args:
+        collection (str): The name of the collection.
+
+    Returns:
+        dict[str, dict]: The query filters by name.
+    """
+
+    queries: dict[str, dict] = {'full scan': {}}
+
+    if collection == settings.COLLECTION_CONSOLIDATE:
+        queries['update availability by id'] = {'id': {'$in': [0]}}
+        queries['available ads'] = {'is_available': True}
+        queries['changed since watermark'] = {'updated_at': {'$gt': 0}}
+
+    elif collection == settings.COLLECTION_DASH:
+        queries['ad by id'] = {'id': 0}
+        queries['explorer rows by id'] = {'id': {'$in': [0]}}
+        queries['snapshot district'] = {'district': 'lisboa'}
+        queries['dashboard listings'] = {
+            'district': 'lisboa',
+            'transaction': 'SELL',
+        }
+        queries['dashboard filter'] = {
+            'district': 'lisboa',
+            'transaction': 'SELL',
+            'estate': 'FLAT',
+            'location': '',
+        }
+
+    elif is_raw_collection(collection):
+        queries['ad by id'] = {'id': 0}
+        queries['ads by crawl run'] = {'crawl_run_id': ''}
+
+    return queries
+
+
+def winning_index(plan: dict) -> str:
+    """
+    Walks an explain plan and returns the name of the index it uses, or the
+    stage name (e.g. 'COLLSCAN') when no index is used.
+    """
+
+    if 'queryPlan' in plan:
+        return winning_index(plan['queryPlan'])
+
+    if 'indexName' in plan:
+        return plan['indexName']
+
+    if 'inputStage' in plan:
+        return winning_index(plan['inputStage'])
+
+    if plan.get('inputStages'):
+        return ', '.join(winning_index(stage) for stage in plan['inputStages'])
+
+    return plan.get('stage', 'UNKNOWN')
+
+
+if __name__ == '__main__':
+    from src.core.mongodb import MongoConnection
+
+    mongo = MongoConnection()
+
+    for collection in [
+        f'{RAW_PREFIX}imovirtual',
+        settings.COLLECTION_CONSOLIDATE,
+        settings.COLLECTION_DASH,
+    ]:
+        mongo.index_report(collection=collection)
@@ -1,8 +1,81 @@
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+
 from pymongo import MongoClient, errors
 
+from src.core.bulk_writer import BulkWriter, BulkWriteResult, OnDuplicate
+from src.core.indexes import indexes_to_ensure, query_spec, winning_index
+from src.core.monitoring import CommandMetricsListener, PoolMetricsListener
 from src.core.settings import settings
 
 
+def client_options() -> dict:
+    """
+    Builds the client options shared by the sync and async connections:
+    pool size, timeouts and wire compression from the settings, plus the
+    listeners recording command and pool metrics in
+    `src.core.monitoring.mongo_stats` when `MONGO_MONITORING` is on.
+
+    Returns:
+        dict: The keyword arguments for the MongoDB client.
+    """
+
+    options = {
+        'serverSelectionTimeoutMS': settings.MONGO_TIMEOUT,
+        'connectTimeoutMS': settings.MONGO_CONNECT_TIMEOUT,
+        'socketTimeoutMS': settings.MONGO_SOCKET_TIMEOUT or None,
+        'waitQueueTimeoutMS': settings.MONGO_WAIT_QUEUE_TIMEOUT or None,
+        'maxPoolSize': settings.MONGO_MAX_POOL_SIZE,
+        'minPoolSize': settings.MONGO_MIN_POOL_SIZE,
+    }
+
+    if settings.MONGO_COMPRESSORS:
+        options['compressors'] = settings.MONGO_COMPRESSORS
+
+    if settings.MONGO_MONITORING:
+        options['event_listeners'] = [
+            CommandMetricsListener(),
+            PoolMetricsListener(),
+        ]
+
+    return options
+
+
+def build_projection(fields: list | None) -> dict:
+    """
+    Builds the projection for a query. Without fields, every field but
+    `_id` is returned.
+
+    Args:
+        fields (list | None): The list of fields to include in the results.
+
+    Returns:
+        dict: The projection document.
+    """
+
+    if fields:
+        return {field: 1 for field in fields}
+
+    return {'_id': 0}
+
+
+def batched(cursor: Iterable[dict], batch_size: int) -> Iterator[list[dict]]:
+    """
+    Groups the documents of a cursor into lists of `batch_size` documents,
+    the last one possibly shorter.
+    """
+
+    batch: list[dict] = []
+    for document in cursor:
+        batch.append(document)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
 class MongoConnection:
     _instance = None
 
@@ -19,6 +92,7 @@ class MongoConnection:
             cls._instance._client = None
             cls._instance._db = None
             cls._instance._collection = None
+            cls._instance._ensured_indexes = set()
         return cls._instance
 
     def __init__(self):
@@ -40,13 +114,10 @@ class MongoConnection:
         Establishes a connection to the MongoDB server.
 
         Initializes the MongoClient and selects the database as specified
-        in the configuration settings.
+        in the configuration settings. Command latencies and pool events are
+        recorded in `src.core.monitoring.mongo_stats`.
         """
-        self._client = MongoClient(
-            self.host,
-            self.port,
-            serverSelectionTimeoutMS=settings.MONGO_TIMEOUT,
-        )
+        self._client = MongoClient(self.host, self.port, **client_options())
         self._db = self._client[self.database_name]
 
     def ping(self) -> bool:
@@ -69,67 +140,122 @@ class MongoConnection:
 
     def set_collection(self, collection: str, unique_index: str = '') -> None:
         """
-        Sets the collection to interact with and optionally creates
-        a unique index.
+        Sets the collection to interact with and makes sure its declared
+        indexes exist.
 
         Args:
             collection (str): The name of the collection to use.
-            unique_index (str): The field to be indexed uniquely (if any).
+            unique_index (str): Optional; An extra field to be indexed
+            uniquely, if the collection does not declare it already.
         """
 
         self._collection = self._db[collection]
+        self.ensure_indexes(collection=collection, unique_index=unique_index)
 
-        if unique_index:
-            collection_indexes = self._collection.index_information()
-            indexes = [
-                index_info['key'][0][0]
-                for _, index_info in collection_indexes.items()
-            ]
+    def ensure_indexes(self, collection: str, unique_index: str = '') -> None:
+        """
+        Creates the indexes declared for the collection in
+        `src.core.indexes`, plus the optional unique index.
 
-            if unique_index in indexes:
-                print(
-                    f'"{unique_index}" is already a unique index from '
-                    f'"{collection}" collection'
-                )
-            else:
-                self._collection.create_index([(unique_index, 1)], unique=True)
+        Indexes are ensured only once per collection in the process, so
+        later calls do not make any request to the server. If they cannot
+        be created, they are tried again on the next call.
+
+        Args:
+            collection (str): The name of the collection.
+            unique_index (str): Optional; An extra field to be indexed
+            uniquely.
+        """
+
+        if (collection, unique_index) in self._ensured_indexes:
+            return
+
+        indexes = indexes_to_ensure(
+            collection=collection, unique_index=unique_index
+        )
+
+        if indexes:
+            try:
+                names = self._db[collection].create_indexes(indexes)
+                print(f'Indexes {names} ensured for "{collection}" collection')
+            except errors.OperationFailure as e:
                 print(
-                    f'Unique index "{unique_index}" created for '
-                    f'"{collection}" collection'
+                    f'It was not possible to create the indexes of '
+                    f'"{collection}" collection: {e}'
                 )
+                return
+
+        self._ensured_indexes.add((collection, unique_index))
+
+    def index_report(self, collection: str) -> dict[str, str]:
+        """
+        Explains the queries declared for the collection and shows which
+        index each one uses.
+
+        Args:
+            collection (str): The name of the collection.
+
+        Returns:
+            dict[str, str]: The index name (or the plan stage, such as
+            'COLLSCAN') used by each query.
+        """
+
+        self.set_collection(collection=collection)
+
+        report = {}
+        for name, query in query_spec(collection).items():
+            explain = self._collection.find(query).explain()
+            report[name] = winning_index(
+                explain['queryPlanner']['winningPlan']
+            )
+
+        print(f'-- Index usage for "{collection}" collection --')
+        for name, index in report.items():
+            print(f'{name}: {index}')
+
+        return report
 
     def save_data(
-        self, collection: str, data: list[dict], unique_index: str = ''
-    ) -> None:
+        self,
+        collection: str,
+        data: list[dict],
+        unique_index: str = '',
+        on_duplicate: OnDuplicate = 'skip',
+    ) -> BulkWriteResult:
         """
         Saves a list of documents to the specified collection.
 
+        The documents are written in parallel, unordered chunks by a
+        `BulkWriter`, so a duplicated key does not abort the whole write.
+
         Args:
             collection (str): The name of the collection where data will
             be saved.
             data (list[dict]): The list of documents to be inserted.
             unique_index (str): Optional; The unique index field to be used.
+            on_duplicate (OnDuplicate): Optional; 'skip' to ignore documents
+            whose `id` already exists, or 'upsert' to replace them.
 
-        Raises:
-            SystemExit: If an error occurs during data insertion.
+        Returns:
+            BulkWriteResult: The inserted, updated, duplicated and failed
+            counts, and the time spent writing.
         """
 
         self.set_collection(collection=collection, unique_index=unique_index)
 
-        if data:
-            try:
-                self._collection.insert_many(data)
-                print(
-                    'Data saved in MongoDB. '
-                    f'Added {len(data)} records to "{collection}" collection.'
-                )
-            except errors.BulkWriteError as e:
-                print('It was not possible to save data in MongoDB.')
-                raise SystemExit(
-                    f'ERROR: {e.details['writeErrors'][0]['errmsg']}'
-                )
-        else:
+        if not data:
             print('There are no records to insert.')
+            return BulkWriteResult()
+
+        result = BulkWriter(on_duplicate=on_duplicate).write(
+            self._collection, data
+        )
+
+        print(f'Data saved in MongoDB. {result.describe(collection)}')
+        for error in result.errors[:5]:
+            print(f'ERROR: {error}')
+
+        return result
 
     def get_data_from_collection(
         self,
@@ -152,19 +278,81 @@ class MongoConnection:
 
         self.set_collection(collection=collection)
 
-        projection = {field: 1 for field in fields} if fields else None
+        documents = self._collection.find(
+            filter=filter, projection=build_projection(fields)
+        )
+        return list(documents)
 
-        if not projection:
-            projection = {'_id': 0}
+    def iter_batches(
+        self,
+        collection: str,
+        filter: dict | None = None,
+        fields: list | None = None,
+        batch_size: int | None = None,
+    ) -> Iterator[list[dict]]:
+        """
+        Streams the documents of the specified collection in batches, so
+        callers can process a collection without holding all of it in
+        memory.
 
-        documents = self._collection.find(filter=filter, projection=projection)
-        return list(documents)
+        Args:
+            collection (str): The name of the collection to query.
+            filter (dict | None): Optional; The filter criteria for the query.
+            fields (list | None): Optional; The list of fields to include in
+            the results.
+            batch_size (int | None): Optional; The number of documents per
+            batch. Defaults to `MONGO_BATCH_SIZE` from the settings.
+
+        Yields:
+            list[dict]: The next batch of documents.
+        """
+
+        self.set_collection(collection=collection)
+
+        batch_size = batch_size or settings.MONGO_BATCH_SIZE
+        cursor = self._collection.find(
+            filter=filter, projection=build_projection(fields)
+        ).batch_size(batch_size)
+
+        yield from batched(cursor, batch_size)
+
+    def aggregate_batches(
+        self,
+        collection: str,
+        pipeline: list[dict],
+        batch_size: int | None = None,
+    ) -> Iterator[list[dict]]:
+        """
+        Runs an aggregation pipeline on the specified collection and streams
+        its results in batches, so the filtering and reshaping happen on the
+        server and only the pipeline output is transferred.
+
+        Args:
+            collection (str): The name of the collection to aggregate.
+            pipeline (list[dict]): The aggregation stages.
+            batch_size (int | None): Optional; The number of documents per
+            batch. Defaults to `MONGO_BATCH_SIZE` from the settings.
+
+        Yields:
+            list[dict]: The next batch of results.
+        """
+
+        self.set_collection(collection=collection)
+
+        batch_size = batch_size or settings.MONGO_BATCH_SIZE
+        cursor = self._collection.aggregate(
+            pipeline, batchSize=batch_size, allowDiskUse=True
+        )
+
+        yield from batched(cursor, batch_size)
 
     def update_is_available(
         self, collection: str, unique_index: str, ids: list[int]
     ) -> None:
         """
-        Updates the 'is_available' field to False for the given list of ids.
+        Updates the 'is_available' field to False for the given list of ids,
+        stamping them with the `updated_at` time so incremental pipelines
+        pick the change up.
 
         This method is used to update the availability status of ads in the
         consolidation collection based on the raw data that has been crawled.
@@ -179,13 +367,58 @@ class MongoConnection:
         try:
             result = self._collection.update_many(
                 {'id': {'$in': ids}},
-                {'$set': {'is_available': False}},
+                {
+                    '$set': {
+                        'is_available': False,
+                        'updated_at': datetime.now(timezone.utc),
+                    }
+                },
             )
             print(f'Matched {result.matched_count} documents.')
             print(f'Modified {result.modified_count} documents.')
         except errors.PyMongoError as e:
             print(f'An error occurred: {e}')
 
+    def get_watermark(self, pipeline: str) -> datetime | None:
+        """
+        Returns the watermark saved by the last run of a pipeline: the
+        latest `updated_at` it has processed.
+
+        Args:
+            pipeline (str): The name of the pipeline.
+
+        Returns:
+            datetime | None: The watermark, or None if the pipeline never
+            saved one.
+        """
+
+        state = self._db[settings.COLLECTION_ETL_STATE].find_one({
+            '_id': pipeline
+        })
+        return state.get('watermark') if state else None
+
+    def set_watermark(self, pipeline: str, watermark: datetime) -> None:
+        """
+        Saves the watermark of a pipeline in the `COLLECTION_ETL_STATE`
+        collection, so the next run only processes later changes.
+
+        Args:
+            pipeline (str): The name of the pipeline.
+            watermark (datetime): The latest `updated_at` processed.
+        """
+
+        self._db[settings.COLLECTION_ETL_STATE].update_one(
+            {'_id': pipeline},
+            {
+                '$set': {
+                    'watermark': watermark,
+                    'saved_at': datetime.now(timezone.utc),
+                }
+            },
+            upsert=True,
+        )
+        print(f'Watermark of "{pipeline}" set to {watermark}.')
+
     def close_connection(self) -> None:
         """
         Closes the connection to the MongoDB server.
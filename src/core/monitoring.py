@@ -0,0 +1,415 @@
+import json
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+
+import bson
+from bson.errors import InvalidDocument
+from pymongo import monitoring
+
+from src.core.settings import settings
+
+# Upper bounds, in milliseconds, of the latency histogram buckets. The last
+# bucket holds everything slower than the last bound.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+NO_COLLECTION = '-'
+
+# Commands whose reply carries the documents read, and where they are.
+CURSOR_BATCHES = {
+    'find': 'firstBatch',
+    'aggregate': 'firstBatch',
+    'getMore': 'nextBatch',
+}
+
+
+class LatencyHistogram:
+    def __init__(self) -> None:
+        """
+        Counts durations into the `LATENCY_BUCKETS_MS` buckets, keeping
+        their total and maximum, so percentiles can be estimated without
+        storing every sample.
+        """
+
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, duration_ms: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Estimates a percentile as the upper bound of the bucket it falls
+        in, or the maximum for the last bucket.
+
+        Args:
+            fraction (float): The percentile, between 0 and 1.
+
+        Returns:
+            float: The estimated duration, in milliseconds.
+        """
+
+        if not self.count:
+            return 0.0
+
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max_ms)
+
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        labels = [f'<={bound}ms' for bound in LATENCY_BUCKETS_MS]
+        labels.append(f'>{LATENCY_BUCKETS_MS[-1]}ms')
+
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.count, 3)
+            if self.count
+            else 0.0,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'max_ms': round(self.max_ms, 3),
+            'buckets': dict(zip(labels, self.buckets)),
+        }
+
+
+class CommandStats:
+    def __init__(self) -> None:
+        self.latency = LatencyHistogram()
+        self.failures = 0
+        self.documents = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def to_dict(self) -> dict:
+        return {
+            'latency': self.latency.to_dict(),
+            'failures': self.failures,
+            'documents': self.documents,
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+        }
+
+
+class PoolStats:
+    def __init__(self) -> None:
+        self.checkout_wait = LatencyHistogram()
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.pools_cleared = 0
+        self.in_use = 0
+        self.max_in_use = 0
+
+    def to_dict(self) -> dict:
+        return {
+            'checkout_wait': self.checkout_wait.to_dict(),
+            'checkouts': self.checkouts,
+            'checkout_failures': self.checkout_failures,
+            'connections_created': self.connections_created,
+            'connections_closed': self.connections_closed,
+            'pools_cleared': self.pools_cleared,
+            'max_in_use': self.max_in_use,
+        }
+
+
+class MongoStats:
+    def __init__(self) -> None:
+        """
+        In-process registry of the MongoDB metrics recorded by the
+        listeners. Listeners are called from the driver's threads, so every
+        update holds a lock.
+        """
+
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._commands: dict[tuple[str, str], CommandStats] = {}
+            self._pool = PoolStats()
+            self._started = datetime.now()
+
+    def record_command(  # noqa: PLR0913
+        self,
+        collection: str,
+        operation: str,
+        duration_ms: float,
+        *,
+        documents: int = 0,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+        failed: bool = False,
+    ) -> None:
+        with self._lock:
+            stats = self._commands.setdefault(
+                (collection, operation), CommandStats()
+            )
+            stats.latency.add(duration_ms)
+            stats.documents += documents
+            stats.bytes_sent += bytes_sent
+            stats.bytes_received += bytes_received
+            stats.failures += failed
+
+    def record_checkout(self, wait_ms: float | None, failed: bool) -> None:
+        with self._lock:
+            pool = self._pool
+            if wait_ms is not None:
+                pool.checkout_wait.add(wait_ms)
+            if failed:
+                pool.checkout_failures += 1
+                return
+            pool.checkouts += 1
+            pool.in_use += 1
+            pool.max_in_use = max(pool.max_in_use, pool.in_use)
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self._pool.in_use = max(self._pool.in_use - 1, 0)
+
+    def record_connection(self, created: bool) -> None:
+        with self._lock:
+            if created:
+                self._pool.connections_created += 1
+            else:
+                self._pool.connections_closed += 1
+
+    def record_pool_cleared(self) -> None:
+        with self._lock:
+            self._pool.pools_cleared += 1
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the metrics recorded since the last reset.
+
+        Returns:
+            dict: The `commands`, keyed by `collection.operation`, the
+            `pool` metrics and the time window they cover.
+        """
+
+        with self._lock:
+            return {
+                'since': self._started.isoformat(timespec='seconds'),
+                'until': datetime.now().isoformat(timespec='seconds'),
+                'commands': {
+                    f'{collection}.{operation}': stats.to_dict()
+                    for (collection, operation), stats in sorted(
+                        self._commands.items()
+                    )
+                },
+                'pool': self._pool.to_dict(),
+            }
+
+    def dump(self, path: str | Path) -> Path:
+        """
+        Writes the stats snapshot as JSON to `path`, or to a timestamped
+        file inside it if it is a directory.
+
+        Args:
+            path (str | Path): The file or directory to write to.
+
+        Returns:
+            Path: The written file.
+        """
+
+        path = Path(path)
+        if not path.suffix:
+            timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
+            path /= f'mongo_stats_{timestamp}.json'
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.stats(), indent=2), encoding='utf-8')
+        print(f'MongoDB stats saved at {path}.')
+        return path
+
+    def summary(self, top: int = 10) -> str:
+        """
+        Formats the slowest collection operations, by total time, as a
+        table to be printed.
+
+        Args:
+            top (int): Optional; How many operations to show. Defaults to 10.
+
+        Returns:
+            str: The table.
+        """
+
+        commands = self.stats()['commands']
+        slowest = sorted(
+            commands.items(),
+            key=lambda item: item[1]['latency']['total_ms'],
+            reverse=True,
+        )[:top]
+
+        lines = [
+            f'{"operation":<45}{"count":>8}{"total ms":>12}'
+            f'{"p95 ms":>10}{"docs":>10}'
+        ]
+        for name, stats in slowest:
+            latency = stats['latency']
+            lines.append(
+                f'{name:<45}{latency["count"]:>8}'
+                f'{latency["total_ms"]:>12.1f}{latency["p95_ms"]:>10}'
+                f'{stats["documents"]:>10}'
+            )
+
+        return '\n'.join(lines)
+
+
+mongo_stats = MongoStats()
+
+
+def command_collection(command_name: str, command: dict) -> str:
+    """
+    Returns the collection a command runs against, or `NO_COLLECTION` for
+    commands such as `ping` that do not target one.
+    """
+
+    if command_name == 'getMore':
+        return command.get('collection', NO_COLLECTION)
+
+    target = command.get(command_name)
+    return target if isinstance(target, str) else NO_COLLECTION
+
+
+def reply_documents(command_name: str, reply: dict) -> int:
+    """
+    Counts the documents a command moved: the cursor batch of a read, or
+    the `n` affected documents of a write.
+    """
+
+    if command_name in CURSOR_BATCHES:
+        cursor = reply.get('cursor', {})
+        return len(cursor.get(CURSOR_BATCHES[command_name], []))
+
+    return reply.get('n', 0) if isinstance(reply.get('n'), int) else 0
+
+
+def encoded_size(document: dict) -> int:
+    try:
+        return len(bson.encode(document))
+    except (InvalidDocument, TypeError, OverflowError):
+        return 0
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    def __init__(
+        self,
+        stats: MongoStats = mongo_stats,
+        measure_bytes: bool | None = None,
+    ) -> None:
+        """
+        Records the latency and documents of every command sent to
+        MongoDB, per collection and operation, and optionally its bytes.
+
+        Args:
+            stats (MongoStats): Optional; The registry to record into.
+            Defaults to the process-wide `mongo_stats`.
+            measure_bytes (bool | None): Optional; Whether to record the
+            size of every command and reply, which encodes them again as
+            BSON. Defaults to `MONGO_MONITORING_BYTES` from the settings.
+        """
+
+        self.stats = stats
+        self.measure_bytes = (
+            settings.MONGO_MONITORING_BYTES
+            if measure_bytes is None
+            else measure_bytes
+        )
+        self._lock = threading.Lock()
+        self._started: dict[tuple, tuple[str, int]] = {}
+
+    @staticmethod
+    def _key(event) -> tuple:
+        return (event.connection_id, event.request_id)
+
+    def started(self, event) -> None:
+        command = event.command
+        collection = command_collection(event.command_name, command)
+        with self._lock:
+            self._started[self._key(event)] = (
+                collection,
+                encoded_size(command) if self.measure_bytes else 0,
+            )
+
+    def succeeded(self, event) -> None:
+        self._finish(event, reply=event.reply, failed=False)
+
+    def failed(self, event) -> None:
+        self._finish(event, reply={}, failed=True)
+
+    def _finish(self, event, reply: dict, failed: bool) -> None:
+        with self._lock:
+            collection, bytes_sent = self._started.pop(
+                self._key(event), (NO_COLLECTION, 0)
+            )
+
+        self.stats.record_command(
+            collection=collection,
+            operation=event.command_name,
+            duration_ms=event.duration_micros / 1000,
+            documents=reply_documents(event.command_name, reply),
+            bytes_sent=bytes_sent,
+            bytes_received=(
+                encoded_size(reply) if reply and self.measure_bytes else 0
+            ),
+            failed=failed,
+        )
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    def __init__(self, stats: MongoStats = mongo_stats) -> None:
+        """
+        Records connection checkout waits and connection churn of the
+        driver's connection pools.
+
+        Args:
+            stats (MongoStats): Optional; The registry to record into.
+            Defaults to the process-wide `mongo_stats`.
+        """
+
+        self.stats = stats
+
+    @staticmethod
+    def _wait_ms(event) -> float | None:
+        duration = getattr(event, 'duration', None)
+        return None if duration is None else duration * 1000
+
+    def connection_checked_out(self, event) -> None:
+        self.stats.record_checkout(self._wait_ms(event), failed=False)
+
+    def connection_check_out_failed(self, event) -> None:
+        self.stats.record_checkout(self._wait_ms(event), failed=True)
+
+    def connection_checked_in(self, event) -> None:
+        self.stats.record_checkin()
+
+    def connection_created(self, event) -> None:
+        self.stats.record_connection(created=True)
+
+    def connection_closed(self, event) -> None:
+        self.stats.record_connection(created=False)
+
+    def pool_cleared(self, event) -> None:
+        self.stats.record_pool_cleared()
+
+    def connection_check_out_started(self, event) -> None: ...
+
+    def connection_ready(self, event) -> None: ...
+
+    def pool_created(self, event) -> None: ...
+
+    def pool_ready(self, event) -> None: ...
+
+    def pool_closed(self, event) -> None: ...
@@ -0,0 +1,546 @@
+"""
+Stage-level profiling of the ingestion pipeline.
+
+Code runs inside named stages, which nest:
+
+    with profiler.stage('consolidate'):
+        with profiler.stage('diff') as stage:
+            ...
+            stage.records += len(ads)
+
+Each stage is recorded under its dotted path (e.g. `consolidate.diff`),
+adding up the wall time, CPU time and records of every time it runs, and
+keeping the peak RSS of the process and, with `PROFILING_TRACEMALLOC` on,
+the peak memory traced by `tracemalloc` while it ran. Stages that run
+concurrently, like the page saves of the crawler, can add up to more wall
+time than their parent. CPU time is the time of the whole process, so it
+includes the work of other threads running at the same time.
+
+With `PROFILING_CPROFILE` on, each top-level stage also runs under cProfile
+and its stats are dumped next to the report, to be opened with `pstats` or
+`snakeviz`.
+
+Every run writes a JSON report to `METRICS_PATH`, and
+
+    task profile_compare
+
+compares the newest report with the previous runs, exiting with status 1
+if a stage got slower or used more memory.
+"""
+
+import argparse
+import cProfile
+import json
+import multiprocessing
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from statistics import median
+from typing import Iterable, Iterator
+
+from src.core.settings import settings
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows.
+    resource = None
+
+STAGE_SEPARATOR = '.'
+REPORT_PREFIX = 'profile_'
+REPORT_SUFFIX = '.json'
+CPROFILE_SUFFIX = '.prof'
+
+TIME_METRICS = ('wall_s', 'cpu_s')
+MEMORY_METRICS = ('peak_rss_bytes', 'peak_traced_bytes')
+# Stages shorter than this in the baseline are too noisy to compare.
+MIN_COMPARED_SECONDS = 0.05
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_BASELINE_RUNS = 5
+
+_stack: ContextVar[tuple[str, ...]] = ContextVar('profiling_stack', default=())
+
+
+def peak_rss_bytes() -> int | None:
+    """
+    Returns the peak resident set size of the process so far, or None
+    where `resource` is not available.
+    """
+
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS bytes.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def max_value(first: int | None, second: int | None) -> int | None:
+    if first is None or second is None:
+        return first if second is None else second
+    return max(first, second)
+
+
+@dataclass
+class StageRun:
+    """
+    A single run of a stage, yielded by `StageProfiler.stage` so the
+    caller can count the records it processed.
+
+    Attributes:
+        path (str): The dotted path of the stage.
+        records (int): The number of records processed in this run.
+    """
+
+    path: str
+    records: int = 0
+
+
+class StageStats:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.records = 0
+        self.peak_rss_bytes: int | None = None
+        self.peak_traced_bytes: int | None = None
+
+    def add(self, stats: dict) -> None:
+        self.calls += stats['calls']
+        self.wall_s += stats['wall_s']
+        self.cpu_s += stats['cpu_s']
+        self.records += stats['records']
+        self.peak_rss_bytes = max_value(
+            self.peak_rss_bytes, stats['peak_rss_bytes']
+        )
+        self.peak_traced_bytes = max_value(
+            self.peak_traced_bytes, stats['peak_traced_bytes']
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'calls': self.calls,
+            'wall_s': round(self.wall_s, 6),
+            'cpu_s': round(self.cpu_s, 6),
+            'records': self.records,
+            'records_per_s': round(self.records / self.wall_s, 1)
+            if self.wall_s
+            else 0.0,
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'peak_traced_bytes': self.peak_traced_bytes,
+        }
+
+
+class StageProfiler:
+    def __init__(self) -> None:
+        """
+        In-process registry of the stages run by the pipeline. Stages can
+        run from several threads and asyncio tasks, so every update holds
+        a lock, and the current stage is kept in a context variable.
+        """
+
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages: dict[str, StageStats] = {}
+            self._traced_peaks: dict[int, int] = {}
+            self._profiles: list[str] = []
+            self._started = datetime.now()
+            self.run_id = self._started.strftime('%Y%m%d%H%M%S')
+
+    def _record(self, path: str, stats: dict) -> None:
+        with self._lock:
+            self._stages.setdefault(path, StageStats()).add(stats)
+
+    def _fold_traced_peak(self) -> None:
+        """
+        Folds the `tracemalloc` peak since the last fold into every open
+        stage, so nested and concurrent stages each keep their own peak.
+        """
+
+        _, peak = tracemalloc.get_traced_memory()
+        for key, stage_peak in self._traced_peaks.items():
+            self._traced_peaks[key] = max(stage_peak, peak)
+        tracemalloc.reset_peak()
+
+    def _open_traced(self, key: int) -> None:
+        if not settings.PROFILING_TRACEMALLOC:
+            return
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        with self._lock:
+            self._fold_traced_peak()
+            self._traced_peaks[key] = tracemalloc.get_traced_memory()[0]
+
+    def _close_traced(self, key: int) -> int | None:
+        with self._lock:
+            if key not in self._traced_peaks:
+                return None
+            self._fold_traced_peak()
+            return self._traced_peaks.pop(key)
+
+    @staticmethod
+    def _start_cprofile(parents: tuple[str, ...]) -> cProfile.Profile | None:
+        if (
+            not settings.PROFILING_CPROFILE
+            or parents
+            or multiprocessing.parent_process() is not None
+            or threading.current_thread() is not threading.main_thread()
+        ):
+            return None
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as error:
+            print(f'cProfile was not started: {error}')
+            return None
+
+        return profile
+
+    def _dump_cprofile(self, profile: cProfile.Profile, path: str) -> None:
+        profile.disable()
+        if not settings.METRICS_PATH:
+            return
+
+        directory = (
+            Path(settings.METRICS_PATH) / f'{REPORT_PREFIX}{self.run_id}'
+        )
+        directory.mkdir(parents=True, exist_ok=True)
+        file_path = directory / f'{path}{CPROFILE_SUFFIX}'
+        profile.dump_stats(file_path)
+
+        with self._lock:
+            self._profiles.append(str(file_path))
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageRun]:
+        """
+        Records the wall time, CPU time, records and memory of the code run
+        inside it, under the path of the enclosing stages.
+
+        Args:
+            name (str): The name of the stage, e.g. 'extract'.
+
+        Yields:
+            StageRun: The run, to count its records in.
+        """
+
+        parents = _stack.get()
+        run = StageRun(path=STAGE_SEPARATOR.join([*parents, name]))
+        if not settings.PROFILING:
+            yield run
+            return
+
+        token = _stack.set((*parents, name))
+        with self._lock:
+            # Registered on entry, so parents are listed before children.
+            self._stages.setdefault(run.path, StageStats())
+        key = id(run)
+        self._open_traced(key)
+        profile = self._start_cprofile(parents)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            yield run
+        finally:
+            wall_s = time.perf_counter() - wall_start
+            cpu_s = time.process_time() - cpu_start
+            if profile is not None:
+                self._dump_cprofile(profile, run.path)
+            _stack.reset(token)
+
+            self._record(
+                run.path,
+                {
+                    'calls': 1,
+                    'wall_s': wall_s,
+                    'cpu_s': cpu_s,
+                    'records': run.records,
+                    'peak_rss_bytes': peak_rss_bytes(),
+                    'peak_traced_bytes': self._close_traced(key),
+                },
+            )
+
+    def profile_batches(
+        self, name: str, batches: Iterable[list]
+    ) -> Iterator[list]:
+        """
+        Yields the batches of an iterable, recording the time spent getting
+        each one, and its size, as a run of the stage. The time spent by
+        the caller on a batch is not included.
+
+        Args:
+            name (str): The name of the stage, e.g. 'extract'.
+            batches (Iterable[list]): The batches, e.g. a cursor.
+
+        Yields:
+            list: The next batch.
+        """
+
+        iterator = iter(batches)
+        while True:
+            with self.stage(name) as run:
+                batch = next(iterator, None)
+                if batch is None:
+                    break
+                run.records += len(batch)
+            yield batch
+
+    def collect(self) -> dict[str, dict]:
+        """
+        Returns the stages recorded so far and clears them, so a worker
+        process can send them to `merge` in the main process.
+        """
+
+        with self._lock:
+            stages = {
+                path: stats.to_dict() for path, stats in self._stages.items()
+            }
+            self._stages = {}
+
+        return stages
+
+    def merge(self, stages: dict[str, dict]) -> None:
+        """
+        Adds stages recorded by a worker process, under the path of the
+        current stage.
+
+        Args:
+            stages (dict[str, dict]): The stages returned by `collect`.
+        """
+
+        parents = list(_stack.get())
+        for path, stats in stages.items():
+            self._record(STAGE_SEPARATOR.join([*parents, path]), stats)
+
+    def report(self) -> dict:
+        """
+        Returns the machine-readable report of the run.
+
+        Returns:
+            dict: The run id and time window, the stats of every stage by
+            path, and the cProfile dumps.
+        """
+
+        with self._lock:
+            return {
+                'run_id': self.run_id,
+                'started_at': self._started.isoformat(timespec='seconds'),
+                'finished_at': datetime.now().isoformat(timespec='seconds'),
+                'tracemalloc': settings.PROFILING_TRACEMALLOC,
+                'stages': {
+                    path: stats.to_dict()
+                    for path, stats in self._stages.items()
+                },
+                'cprofile': list(self._profiles),
+            }
+
+    def dump(self, path: str | Path) -> Path:
+        """
+        Writes the report as JSON to `path`, or to a file named after the
+        run inside it if it is a directory.
+
+        Args:
+            path (str | Path): The file or directory to write to.
+
+        Returns:
+            Path: The written file.
+        """
+
+        path = Path(path)
+        if not path.suffix:
+            path /= f'{REPORT_PREFIX}{self.run_id}{REPORT_SUFFIX}'
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2), encoding='utf-8')
+        print(f'Profiling report saved at {path}.')
+        return path
+
+    def summary(self) -> str:
+        """
+        Formats the stages, in the order they first ran, as a table to be
+        printed.
+
+        Returns:
+            str: The table.
+        """
+
+        lines = [
+            f'{"stage":<36}{"calls":>7}{"wall s":>10}{"cpu s":>10}'
+            f'{"records":>10}{"rec/s":>11}{"rss MiB":>9}'
+        ]
+        for path, stats in self.report()['stages'].items():
+            depth = path.count(STAGE_SEPARATOR)
+            name = '  ' * depth + path.rsplit(STAGE_SEPARATOR, 1)[-1]
+            rss = (stats['peak_rss_bytes'] or 0) / 1024**2
+            lines.append(
+                f'{name:<36}{stats["calls"]:>7}{stats["wall_s"]:>10.3f}'
+                f'{stats["cpu_s"]:>10.3f}{stats["records"]:>10}'
+                f'{stats["records_per_s"]:>11.1f}{rss:>9.1f}'
+            )
+
+        return '\n'.join(lines)
+
+
+profiler = StageProfiler()
+
+
+@dataclass
+class Regression:
+    """
+    A stage metric that got worse than its baseline.
+
+    Attributes:
+        stage (str): The dotted path of the stage.
+        metric (str): The metric, e.g. 'wall_s'.
+        baseline (float): The median of the metric in the baseline runs.
+        current (float): The metric in the compared run.
+    """
+
+    stage: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1
+
+
+def load_reports(path: str | Path | None = None) -> list[dict]:
+    """
+    Loads the profiling reports in a directory, oldest first.
+
+    Args:
+        path (str | Path | None): Optional; The directory of the reports.
+        Defaults to `METRICS_PATH` from the settings.
+
+    Returns:
+        list[dict]: The reports.
+    """
+
+    root = Path(path or settings.METRICS_PATH)
+    if not root.is_dir():
+        return []
+
+    return [
+        json.loads(file_path.read_text(encoding='utf-8'))
+        for file_path in sorted(root.glob(f'{REPORT_PREFIX}*{REPORT_SUFFIX}'))
+    ]
+
+
+def compare_reports(
+    current: dict,
+    baselines: list[dict],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[Regression]:
+    """
+    Compares the stages of a run with the median of the same stages in the
+    baseline runs and returns the metrics that grew by more than
+    `threshold`. Time metrics of stages that took under
+    `MIN_COMPARED_SECONDS` in the baseline are not compared.
+
+    Args:
+        current (dict): The report of the run to check.
+        baselines (list[dict]): The reports of earlier runs.
+        threshold (float): Optional; The allowed relative growth. Defaults
+        to `DEFAULT_THRESHOLD`.
+
+    Returns:
+        list[Regression]: The regressions, worst first.
+    """
+
+    regressions = []
+    for stage, stats in current['stages'].items():
+        for metric in (*TIME_METRICS, *MEMORY_METRICS):
+            values = [
+                report['stages'][stage][metric]
+                for report in baselines
+                if report['stages'].get(stage, {}).get(metric) is not None
+            ]
+            if not values or stats.get(metric) is None:
+                continue
+
+            baseline = median(values)
+            if baseline <= 0 or (
+                metric in TIME_METRICS and baseline < MIN_COMPARED_SECONDS
+            ):
+                continue
+
+            regression = Regression(stage, metric, baseline, stats[metric])
+            if regression.change > threshold:
+                regressions.append(regression)
+
+    return sorted(regressions, key=lambda item: item.change, reverse=True)
+
+
+def format_regressions(regressions: list[Regression]) -> str:
+    lines = [f'{"stage":<36}{"metric":<20}{"baseline":>14}{"current":>14}']
+    for regression in regressions:
+        lines.append(
+            f'{regression.stage:<36}{regression.metric:<20}'
+            f'{regression.baseline:>14.3f}{regression.current:>14.3f}'
+            f'  +{regression.change:.0%}'
+        )
+
+    return '\n'.join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            'Compares the newest profiling report with the previous runs.'
+        )
+    )
+    parser.add_argument(
+        '--path',
+        default=settings.METRICS_PATH,
+        help='directory of the reports (default: METRICS_PATH)',
+    )
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=DEFAULT_BASELINE_RUNS,
+        help='how many previous runs make the baseline',
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help='allowed relative growth of a metric, e.g. 0.25 for 25%%',
+    )
+    args = parser.parse_args(argv)
+
+    reports = load_reports(args.path)
+    if len(reports) < 2:  # noqa: PLR2004
+        print(f'At least two profiling reports are needed in "{args.path}".')
+        return 0
+
+    current, baselines = reports[-1], reports[-1 - args.runs : -1]
+    regressions = compare_reports(current, baselines, args.threshold)
+
+    print(
+        f'Run {current["run_id"]} compared with {len(baselines)} previous '
+        'runs.'
+    )
+    if not regressions:
+        print('No regressions found.')
+        return 0
+
+    print(format_regressions(regressions))
+    return 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -10,6 +12,47 @@ class Settings(BaseSettings):
     MONGO_PORT: int = 27017
     MONGO_DATABASE: str = 'scraper_db'
     MONGO_TIMEOUT: int = 7000
+    MONGO_BATCH_SIZE: int = 10_000
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_CONNECT_TIMEOUT: int = 20_000
+    MONGO_SOCKET_TIMEOUT: int = 0
+    MONGO_WAIT_QUEUE_TIMEOUT: int = 0
+    MONGO_COMPRESSORS: str = ''
+    MONGO_MONITORING: bool = True
+    MONGO_MONITORING_BYTES: bool = False
+    METRICS_PATH: str = 'metrics'
+    PROFILING: bool = True
+    PROFILING_TRACEMALLOC: bool = False
+    PROFILING_CPROFILE: bool = False
+
+    BULK_WRITE_CHUNK_SIZE: int = 1000
+    BULK_WRITE_CHUNK_BYTES: int = 8 * 1024 * 1024
+    BULK_WRITE_WORKERS: int = 4
+    BULK_WRITE_MAX_RETRIES: int = 3
+
+    DASH_ETL_EXTRACTION: Literal['aggregation', 'python'] = 'aggregation'
+    DASH_ETL_CHUNKED: bool = True
+    DASH_ETL_WORKERS: int = 4
+    DASH_DEFAULT_DISTRICT: str = 'lisboa'
+    DASH_FIGURE_CACHE_SIZE: int = 128
+    DASH_RESPONSE_CACHE_SIZE: int = 64
+    DASH_COMPRESS: bool = True
+    DASH_COMPRESS_MIN_SIZE: int = 500
+    DASH_SCATTER_WEBGL_POINTS: int = 5_000
+    DASH_SCATTER_MAX_POINTS: int = 20_000
+    DASH_SCATTER_DOWNSAMPLE: Literal['bins', 'sample'] = 'bins'
+    DASH_SCATTER_BINS: int = 80
+    DASH_CLIENTSIDE_FILTERING: bool = False
+    DASH_CLIENTSIDE_MAX_LISTINGS: int = 100_000
+    DASH_EXPLORER_PAGE_SIZE: int = 20
+    DASH_REFRESH_INTERVAL: float = 60
+    DASH_SHARED_FRAMES: bool = True
+    DASH_WORKERS: int = 4
+    DASH_BIND: str = '0.0.0.0:8051'
+
+    SNAPSHOT_PATH: str = 'snapshots'
+    SNAPSHOT_KEEP: int = 3
 
     AWS_ACCESS_KEY_ID: str = ''
     AWS_SECRET_ACCESS_KEY: str = ''
@@ -25,6 +68,7 @@ class Settings(BaseSettings):
     COLLECTION_RAW: str = 'raw_collection'
     COLLECTION_CONSOLIDATE: str = 'consolidated_imovirtual'
     COLLECTION_DASH: str = 'dash'
+    COLLECTION_ETL_STATE: str = 'etl_state'
 
 
 settings = Settings()
@@ -0,0 +1,367 @@
+"""
+Versioned columnar snapshots of the dashboard collection.
+
+After each run, the dashboard pipeline writes the dash collection as Arrow
+IPC files with typed columns, inside a directory named after its version.
+The listings are partitioned by district, each partition in its own
+directory:
+
+    SNAPSHOT_PATH/
+        20241019120000123456/
+            lisboa/
+                listings.arrow
+                location_prices.arrow
+                ...
+            porto/
+                ...
+            manifest.json
+
+Besides the listings, a partition holds the summary tables of
+`src.core.aggregates` computed from its listings, one Arrow file each.
+
+A version directory is written under a temporary name and renamed when
+complete, so readers never see a partial snapshot. The dashboard memory-maps
+the partition it shows from the newest version instead of querying MongoDB,
+and the manifest lists the partitions without reading any of them.
+"""
+
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Mapping
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import ipc
+
+from src.core.settings import settings
+
+LISTINGS = 'listings'
+ARROW_SUFFIX = '.arrow'
+MANIFEST_FILE = 'manifest.json'
+TMP_PREFIX = '.tmp-'
+
+SNAPSHOT_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('title', pa.string()),
+    ('estate', pa.string()),
+    ('transaction', pa.string()),
+    ('district', pa.string()),
+    ('location', pa.string()),
+    ('city', pa.string()),
+    ('totalPrice', pa.float64()),
+    ('pricePerSquareMeter', pa.float64()),
+    ('areaInSquareMeters', pa.float64()),
+    ('roomsNumber', pa.string()),
+    ('roomsNumberNotation', pa.string()),
+    ('is_available', pa.bool_()),
+])
+
+
+@dataclass
+class Snapshot:
+    """
+    A partition of a snapshot version loaded from disk.
+
+    Attributes:
+        version (str): The version, the name of its directory.
+        partition (str): The partition, the name of its directory.
+        listings (pd.DataFrame | None): The listings of the partition, or
+            None if they were not loaded.
+        tables (dict[str, pd.DataFrame]): The summary tables, by name.
+    """
+
+    version: str
+    partition: str
+    listings: pd.DataFrame | None
+    tables: dict[str, pd.DataFrame] = field(default_factory=dict)
+
+
+def snapshot_root(path: str | Path | None = None) -> Path:
+    return Path(path or settings.SNAPSHOT_PATH)
+
+
+def to_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Converts the listings to an Arrow table with the `SNAPSHOT_SCHEMA`
+    columns and types. Missing columns are filled with nulls and extra
+    columns are dropped.
+
+    Args:
+        df (pd.DataFrame): The listings.
+
+    Returns:
+        pa.Table: The typed table.
+    """
+
+    df = df.reindex(columns=SNAPSHOT_SCHEMA.names)
+    return pa.Table.from_pandas(
+        df, schema=SNAPSHOT_SCHEMA, preserve_index=False
+    )
+
+
+def write_table(table: pa.Table, file_path: Path) -> None:
+    with ipc.new_file(file_path, table.schema) as writer:
+        writer.write_table(table)
+
+
+def write_partition(
+    frames: dict[str, pd.DataFrame], partition_dir: Path
+) -> dict:
+    """
+    Writes the listings and the summary tables of a partition, one Arrow
+    file each, and returns its manifest entry.
+    """
+
+    partition_dir.mkdir()
+
+    listings = to_table(frames.get(LISTINGS, pd.DataFrame()))
+    files = {LISTINGS: f'{LISTINGS}{ARROW_SUFFIX}'}
+    write_table(listings, partition_dir / files[LISTINGS])
+
+    for name, table in frames.items():
+        if name == LISTINGS:
+            continue
+        files[name] = f'{name}{ARROW_SUFFIX}'
+        write_table(
+            pa.Table.from_pandas(table, preserve_index=False),
+            partition_dir / files[name],
+        )
+
+    return {'rows': listings.num_rows, 'files': files}
+
+
+def write_snapshot(
+    partitions: Mapping[str, dict[str, pd.DataFrame]]
+    | Iterable[tuple[str, dict[str, pd.DataFrame]]],
+    path: str | Path | None = None,
+    keep: int | None = None,
+) -> Path:
+    """
+    Writes the partitions as a new snapshot version and removes the oldest
+    versions, keeping the newest `keep`.
+
+    The partitions can be given as pairs from a generator, so they are
+    written one at a time and each one is released before the next is
+    built.
+
+    Args:
+        partitions (Mapping | Iterable): The frames of each partition, by
+        partition name, or as (name, frames) pairs. Each partition has its
+        listings under `LISTINGS` and its summary tables under their names.
+        path (str | Path | None): Optional; The snapshots directory.
+        Defaults to `SNAPSHOT_PATH` from the settings.
+        keep (int | None): Optional; How many versions to keep. Defaults to
+        `SNAPSHOT_KEEP` from the settings.
+
+    Returns:
+        Path: The directory of the new version.
+    """
+
+    root = snapshot_root(path)
+    root.mkdir(parents=True, exist_ok=True)
+
+    created_at = datetime.now(timezone.utc)
+    version = created_at.strftime('%Y%m%d%H%M%S%f')
+    tmp_dir = root / f'{TMP_PREFIX}{version}'
+    tmp_dir.mkdir()
+
+    if isinstance(partitions, Mapping):
+        partitions = partitions.items()
+
+    entries = {}
+    for partition, frames in partitions:
+        entries[partition] = write_partition(frames, tmp_dir / partition)
+        # Released before the next partition is built.
+        del frames
+
+    manifest = {
+        'version': version,
+        'created_at': created_at.isoformat(),
+        'partitions': entries,
+    }
+    (tmp_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+
+    version_dir = root / version
+    os.replace(tmp_dir, version_dir)
+    rows = sum(entry['rows'] for entry in entries.values())
+    print(
+        f'Snapshot with {rows} listings in {len(entries)} partitions '
+        f'saved at {version_dir}.'
+    )
+
+    prune_snapshots(path=root, keep=keep or settings.SNAPSHOT_KEEP)
+
+    return version_dir
+
+
+def list_snapshots(path: str | Path | None = None) -> list[Path]:
+    """
+    Returns the complete snapshot versions, oldest first.
+    """
+
+    if not (path or settings.SNAPSHOT_PATH):
+        return []
+
+    root = snapshot_root(path)
+    if not root.is_dir():
+        return []
+
+    return sorted(
+        version_dir
+        for version_dir in root.iterdir()
+        if not version_dir.name.startswith(TMP_PREFIX)
+        and (version_dir / MANIFEST_FILE).is_file()
+    )
+
+
+def latest_snapshot(path: str | Path | None = None) -> Path | None:
+    snapshots = list_snapshots(path)
+    return snapshots[-1] if snapshots else None
+
+
+def prune_snapshots(path: str | Path | None = None, keep: int = 1) -> None:
+    for version_dir in list_snapshots(path)[:-keep]:
+        shutil.rmtree(version_dir, ignore_errors=True)
+
+
+def read_table(file_path: Path) -> pa.Table:
+    """
+    Memory-maps an Arrow file of a snapshot version, so its columns are
+    paged in from disk instead of being read and parsed up front.
+    """
+
+    source = pa.memory_map(str(file_path), 'r')
+    return ipc.open_file(source).read_all()
+
+
+def read_manifest(version_dir: Path) -> dict:
+    return json.loads((version_dir / MANIFEST_FILE).read_text())
+
+
+def snapshot_partitions(version_dir: Path) -> list[str]:
+    """
+    Returns the partitions of a snapshot version, read from its manifest.
+    """
+
+    return list(read_manifest(version_dir).get('partitions', {}))
+
+
+def partition_table(
+    version_dir: Path, partition: str, name: str = LISTINGS
+) -> pa.Table | None:
+    """
+    Memory-maps one table of a partition of a snapshot version as an Arrow
+    table, without converting it, so a few rows can be read from it.
+
+    Args:
+        version_dir (Path): The directory of the snapshot version.
+        partition (str): The partition of the table.
+        name (str): Optional; The table to map. Defaults to `LISTINGS`.
+
+    Returns:
+        pa.Table | None: The table, or None if the partition does not have
+        it.
+    """
+
+    entry = read_manifest(version_dir).get('partitions', {}).get(partition)
+    if entry is None or name not in entry['files']:
+        return None
+
+    return read_table(version_dir / partition / entry['files'][name])
+
+
+def load_partition(
+    version_dir: Path, partition: str, names: list[str] | None = None
+) -> Snapshot | None:
+    """
+    Loads the listings and the summary tables of one partition of a
+    snapshot version, leaving the other partitions on disk.
+
+    Args:
+        version_dir (Path): The directory of the snapshot version.
+        partition (str): The partition to load.
+        names (list[str] | None): Optional; The tables to load, such as
+        `LISTINGS`. Defaults to all of them.
+
+    Returns:
+        Snapshot | None: The partition, or None if the version does not
+        have it.
+    """
+
+    manifest = read_manifest(version_dir)
+    entry = manifest.get('partitions', {}).get(partition)
+    if entry is None:
+        return None
+
+    print(
+        f'Loading the "{partition}" dashboard data from the snapshot at '
+        f'{version_dir}.'
+    )
+    tables = {
+        name: read_table(version_dir / partition / file_name).to_pandas()
+        for name, file_name in entry['files'].items()
+        if names is None or name in names
+    }
+
+    return Snapshot(
+        version=manifest['version'],
+        partition=partition,
+        listings=tables.pop(LISTINGS, None),
+        tables=tables,
+    )
+
+
+def load_snapshot(
+    path: str | Path | None = None, partition: str | None = None
+) -> Snapshot | None:
+    """
+    Loads the listings and the summary tables of a partition of the newest
+    snapshot, all from the same version.
+
+    Args:
+        path (str | Path | None): Optional; The snapshots directory.
+        Defaults to `SNAPSHOT_PATH` from the settings.
+        partition (str | None): Optional; The partition to load. Defaults
+        to the first partition of the version.
+
+    Returns:
+        Snapshot | None: The partition, or None if there is no snapshot or
+        it does not have the partition.
+    """
+
+    version_dir = latest_snapshot(path)
+    if version_dir is None:
+        return None
+
+    if partition is None:
+        partitions = snapshot_partitions(version_dir)
+        if not partitions:
+            return None
+        partition = partitions[0]
+
+    return load_partition(version_dir, partition)
+
+
+def read_snapshot(
+    path: str | Path | None = None, partition: str | None = None
+) -> pd.DataFrame | None:
+    """
+    Reads the listings of a partition of the newest snapshot.
+
+    Args:
+        path (str | Path | None): Optional; The snapshots directory.
+        Defaults to `SNAPSHOT_PATH` from the settings.
+        partition (str | None): Optional; The partition to read. Defaults
+        to the first partition of the version.
+
+    Returns:
+        pd.DataFrame | None: The listings, or None if there is no snapshot
+        or it does not have the partition.
+    """
+
+    snapshot = load_snapshot(path, partition=partition)
+    return snapshot.listings if snapshot else None
@@ -0,0 +1,155 @@
+/*
+ * Clientside filters of the dashboard, used with DASH_CLIENTSIDE_FILTERING.
+ *
+ * The scatter store holds the listings of a district as typed arrays,
+ * grouped by estate type and sorted by area, with the offsets of the area
+ * slider marks of each estate type (see src/dash/clientside.py), so every
+ * filter is a slice of the arrays. The treemap store holds the figure of
+ * every estate type.
+ */
+
+const TYPED_ARRAYS = {
+    int8: Int8Array,
+    uint8: Uint8Array,
+    int16: Int16Array,
+    uint16: Uint16Array,
+    int32: Int32Array,
+    uint32: Uint32Array,
+    float32: Float32Array,
+    float64: Float64Array,
+};
+
+// Same marker size scale as plotly express.
+const SIZE_MAX = 20;
+
+// The decoded columns of each store, kept while the store is.
+const decodedStores = new WeakMap();
+
+function decodeArray(column) {
+    const bytes = Uint8Array.from(atob(column.data), (char) =>
+        char.charCodeAt(0)
+    );
+    return new TYPED_ARRAYS[column.dtype](bytes.buffer);
+}
+
+function decodeColumns(store) {
+    if (!decodedStores.has(store)) {
+        const columns = {};
+        for (const [name, column] of Object.entries(store.columns)) {
+            columns[name] = decodeArray(column);
+        }
+        decodedStores.set(store, columns);
+    }
+    return decodedStores.get(store);
+}
+
+function areaSlices(store, estate, areaMark) {
+    const low = store.marks.indexOf(areaMark[0]);
+    const high = store.marks.indexOf(areaMark[1]);
+    const estates = estate ? [estate] : Object.keys(store.estates);
+
+    // As in AreaIndex.between: from the first listing not below the low
+    // mark to the last one not above the high mark.
+    return estates
+        .filter((name) => name in store.estates)
+        .map((name) => {
+            const offsets = store.estates[name];
+            const start = offsets.bounds[0] + offsets.lower[low];
+            const end = offsets.bounds[0] + offsets.upper[high];
+            return [start, Math.max(start, end)];
+        });
+}
+
+function scatterTraces(store, slices) {
+    const columns = decodeColumns(store);
+    const counts = new Array(store.rooms.length).fill(0);
+    for (const [start, end] of slices) {
+        for (let row = start; row < end; row++) {
+            if (columns.rooms[row] >= 0) {
+                counts[columns.rooms[row]]++;
+            }
+        }
+    }
+
+    const total = counts.reduce((sum, count) => sum + count, 0);
+    const traces = store.rooms.map((room, code) => ({
+        room: room,
+        x: new columns.area.constructor(counts[code]),
+        y: new columns.price.constructor(counts[code]),
+        size: new columns.size.constructor(counts[code]),
+        filled: 0,
+    }));
+
+    let maxSize = 0;
+    for (const [start, end] of slices) {
+        for (let row = start; row < end; row++) {
+            // Listings without a room type are not drawn, as in the
+            // server-side figure.
+            if (columns.rooms[row] < 0) {
+                continue;
+            }
+            const trace = traces[columns.rooms[row]];
+            trace.x[trace.filled] = columns.area[row];
+            trace.y[trace.filled] = columns.price[row];
+            trace.size[trace.filled] = columns.size[row];
+            trace.filled++;
+            maxSize = Math.max(maxSize, columns.size[row]);
+        }
+    }
+
+    const type = total > store.webgl_points ? 'scattergl' : 'scatter';
+    return traces
+        .filter((trace) => trace.filled > 0)
+        .map((trace) => ({
+            type: type,
+            mode: 'markers',
+            name: trace.room,
+            legendgroup: trace.room,
+            showlegend: true,
+            x: trace.x,
+            y: trace.y,
+            marker: {
+                color: store.colors[trace.room],
+                size: trace.size,
+                sizemode: 'area',
+                sizeref: (2 * maxSize) / SIZE_MAX ** 2 || 1,
+                symbol: 'circle',
+            },
+            hovertemplate:
+                'roomsNumberNotation=' +
+                trace.room +
+                '<br>areaInSquareMeters=%{x}<br>totalPrice=%{y}' +
+                '<br>pricePerSquareMeter=%{marker.size}<extra></extra>',
+        }));
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    dashboard: {
+        scatter: function (store, estate, logAxis, areaMark) {
+            if (!store) {
+                return window.dash_clientside.no_update;
+            }
+
+            const layout = Object.assign({}, store.layout, {
+                xaxis: Object.assign({}, store.layout.xaxis, {
+                    type: logAxis.includes('log_x') ? 'log' : 'linear',
+                }),
+                yaxis: Object.assign({}, store.layout.yaxis, {
+                    type: logAxis.includes('log_y') ? 'log' : 'linear',
+                }),
+            });
+
+            return {
+                data: scatterTraces(store, areaSlices(store, estate, areaMark)),
+                layout: layout,
+            };
+        },
+
+        treemap: function (store, estate) {
+            if (!store) {
+                return window.dash_clientside.no_update;
+            }
+            return store[estate || ''] || store[''];
+        },
+    },
+});
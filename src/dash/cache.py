@@ -0,0 +1,128 @@
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Hashable
+
+from src.core.settings import settings
+
+
+def freeze(value) -> Hashable:
+    """
+    Turns callback inputs, which Dash passes as lists and dicts, into a
+    hashable cache key.
+    """
+
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+
+    if isinstance(value, dict):
+        return tuple(
+            sorted((key, freeze(item)) for key, item in value.items())
+        )
+
+    return value
+
+
+class FigureCache:
+    def __init__(self, maxsize: int | None = None) -> None:
+        """
+        A bounded LRU cache of the figures built by the dashboard callbacks,
+        keyed by the callback, the version of the data and the callback
+        inputs. Setting a new data version drops every figure, since they
+        were built from the previous data.
+
+        Args:
+            maxsize (int | None): Optional; How many figures to keep.
+            Defaults to `DASH_FIGURE_CACHE_SIZE` from the settings.
+        """
+
+        self.maxsize = maxsize or settings.DASH_FIGURE_CACHE_SIZE
+        self.version: str | None = None
+        self._lock = threading.Lock()
+        self._figures: OrderedDict[Hashable, object] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def set_version(self, version: str) -> None:
+        with self._lock:
+            if version != self.version:
+                self._figures.clear()
+                self.version = version
+
+    def clear(self) -> None:
+        with self._lock:
+            self._figures.clear()
+
+    def get_or_build(self, key: Hashable, build: Callable[[], object]):
+        """
+        Returns the cached figure for `key` of the current data version, or
+        builds and caches it, dropping the least recently used figure when
+        the cache is full.
+
+        Args:
+            key (Hashable): The callback and its inputs.
+            build (Callable[[], object]): Builds the figure.
+
+        Returns:
+            The figure.
+        """
+
+        with self._lock:
+            version = self.version
+            versioned_key = (version, key)
+            if versioned_key in self._figures:
+                self._figures.move_to_end(versioned_key)
+                self.hits += 1
+                return self._figures[versioned_key]
+            self.misses += 1
+
+        # Built outside the lock, so a slow figure does not block the other
+        # callbacks.
+        figure = build()
+
+        with self._lock:
+            if version == self.version:
+                self._figures[versioned_key] = figure
+                self._figures.move_to_end(versioned_key)
+                while len(self._figures) > self.maxsize:
+                    self._figures.popitem(last=False)
+
+        return figure
+
+    def memoize(self, func: Callable) -> Callable:
+        """
+        Caches the results of a callback by its inputs.
+        """
+
+        @wraps(func)
+        def wrapper(*args):
+            return self.get_or_build(
+                key=(func.__qualname__, freeze(args)),
+                build=lambda: func(*args),
+            )
+
+        return wrapper
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                'version': self.version,
+                'size': len(self._figures),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+figure_cache = FigureCache()
+response_cache = FigureCache(maxsize=settings.DASH_RESPONSE_CACHE_SIZE)
+
+
+def set_data_version(version: str) -> None:
+    """
+    Sets the data version of the figure and response caches, dropping what
+    was built from the previous data.
+    """
+
+    figure_cache.set_version(version)
+    response_cache.set_version(version)
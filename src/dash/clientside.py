@@ -0,0 +1,90 @@
+"""
+Compact columnar copies of the listings, sent once to the browser so the
+scatter plot filters run in clientside callbacks.
+
+With `DASH_CLIENTSIDE_FILTERING`, the listings of a district are sent to a
+`dcc.Store` as typed little-endian arrays, base64 encoded, grouped by
+estate type and sorted by area, with the offsets of the slider marks of
+`ListingIndex`. The estate, area and log axis filters are then slices of
+those arrays in `assets/clientside.js`, with no server round trip.
+"""
+
+import base64
+from pathlib import Path
+
+import numpy as np
+
+from src.core.settings import settings
+from src.dash.downsample import CATEGORY, SIZE, X, Y, stratified_sample
+from src.dash.index import AREA_MARKS, ESTATE, ESTATE_AREA, ListingIndex
+
+ASSETS_PATH = Path(__file__).parent / 'assets'
+
+# Clientside functions of `assets/clientside.js`.
+NAMESPACE = 'dashboard'
+
+COLUMNS = {X: 'area', Y: 'price', SIZE: 'size'}
+
+# JavaScript has no typed array of 64-bit integers that plots as numbers,
+# so they are sent as float64, exact up to 2**53.
+WIDE_INTEGERS = {np.dtype('int64'), np.dtype('uint64')}
+
+
+def encode_array(values: np.ndarray) -> dict[str, str]:
+    """
+    Encodes an array as the name of its JavaScript typed array and its
+    little-endian bytes in base64. 64-bit integers are encoded as float64.
+    """
+
+    if values.dtype in WIDE_INTEGERS:
+        values = values.astype('float64')
+    values = values.astype(values.dtype.newbyteorder('<'), copy=False)
+    return {
+        'dtype': values.dtype.name,
+        'data': base64.b64encode(values.tobytes()).decode('ascii'),
+    }
+
+
+def listing_store(index: ListingIndex, max_listings: int | None = None):
+    """
+    Builds the store of the listings of a district for the clientside
+    filters.
+
+    Args:
+        index (ListingIndex): The index of the listings.
+        max_listings (int | None): Optional; How many listings to send at
+        most, sampled by room type above it. Defaults to
+        `DASH_CLIENTSIDE_MAX_LISTINGS` from the settings.
+
+    Returns:
+        dict: The columns of the listings, grouped by estate type and
+        sorted by area, the room types of their codes, and the bounds and
+        slider mark offsets of each estate type in them.
+    """
+
+    max_listings = max_listings or settings.DASH_CLIENTSIDE_MAX_LISTINGS
+    if len(index.df) > max_listings:
+        index = ListingIndex(
+            stratified_sample(index.df, size=max_listings).reset_index(
+                drop=True
+            )
+        )
+
+    df = index.df.iloc[index.arrays[ESTATE_AREA]]
+    columns = {
+        name: encode_array(df[column].to_numpy())
+        for column, name in COLUMNS.items()
+    }
+    columns['rooms'] = encode_array(df[CATEGORY].array.codes)
+
+    return {
+        'columns': columns,
+        'rooms': df[CATEGORY].cat.categories.tolist(),
+        'estates': {
+            estate: offsets
+            for estate, offsets in index.offsets[ESTATE].items()
+            if offsets['bounds'][1] > offsets['bounds'][0]
+        },
+        'marks': list(AREA_MARKS),
+        'webgl_points': settings.DASH_SCATTER_WEBGL_POINTS,
+    }
@@ -1,8 +1,75 @@
+from pathlib import Path
+
 import dash_bootstrap_components as dbc
 from dash import Dash
 
-from src.dash.data import Data
+from src.dash.clientside import ASSETS_PATH
+from src.dash.components.body import explorer as ExplorerComponent
+from src.dash.components.body import heatmap as HeatmapComponent
+from src.dash.components.body import scatter as ScatterComponent
+from src.dash.components.body import table as TableComponent
+from src.dash.components.body import treemap as TreemapComponent
+from src.dash.components.body.body import Body
+from src.dash.components.head import head as HeadComponent
+from src.dash.components.head.head import Head
+from src.dash.data import Data, provider
+from src.dash.responses import install_responses
+
+COMPONENTS = [
+    HeadComponent,
+    ScatterComponent,
+    TreemapComponent,
+    HeatmapComponent,
+    TableComponent,
+    ExplorerComponent,
+]
+
+
+def layout(data: Data | None = None):
+    return dbc.Container(
+        [Head(data).component, Body().component],
+        fluid=True,
+        style={
+            'width': '100%',
+            'padding': '15px 25px 25px 25px',
+            'background-color': '#191c24',
+        },
+    )
+
+
+def create_app(
+    snapshot_path: str | Path | None = None, preload: bool = False
+) -> Dash:
+    """
+    Creates the dashboard app with the callbacks of every component. The
+    data is loaded once by the provider, on the first page load or right
+    away with `preload`.
+
+    Args:
+        snapshot_path (str | Path | None): Optional; The directory of the
+        snapshots. Defaults to `SNAPSHOT_PATH` from the settings.
+        preload (bool): Optional; Whether to load the data before
+        returning. Defaults to False.
+
+    Returns:
+        Dash: The dashboard app.
+    """
+
+    provider.configure(snapshot_path)
+    if preload:
+        provider.get()
 
-df = Data.get_data()
+    app = Dash(
+        assets_folder=str(ASSETS_PATH),
+        external_stylesheets=[dbc.themes.DARKLY],
+    )
+    # The callbacks are validated against a layout without data, and the
+    # layout is built with the data on every page load, so the district
+    # selector lists the districts of the version loaded by the refresher.
+    app.validation_layout = layout()
+    app.layout = lambda: layout(provider.get())
+    for component in COMPONENTS:
+        component.register_callbacks(app)
+    install_responses(app)
 
-app = Dash(external_stylesheets=[dbc.themes.DARKLY])
+    return app
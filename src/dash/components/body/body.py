@@ -1,6 +1,7 @@
 import dash_bootstrap_components as dbc
 from dash import html
 
+from src.dash.components.body import explorer as ExplorerComponent
 from src.dash.components.body import heatmap as HeatmapComponent
 from src.dash.components.body import scatter as ScatterComponent
 from src.dash.components.body import table as TableComponent
@@ -13,6 +14,7 @@ class Body:
         self.treemap_component = TreemapComponent.get_component()
         self.heatmap_component = HeatmapComponent.get_component()
         self.table_component = TableComponent.get_component()
+        self.explorer_component = ExplorerComponent.get_component()
         self._component = self.get_component()
 
     def get_component(self):
@@ -38,6 +40,7 @@ class Body:
                 ],
                 md=9,
             ),
+            dbc.Col([self.explorer_component], md=12),
         ])
 
         return component
@@ -0,0 +1,194 @@
+import math
+
+import dash_bootstrap_components as dbc
+from dash import Dash, Input, Output, State, dash_table, dcc, html
+
+from src.core.settings import settings
+from src.dash.cache import figure_cache
+from src.dash.data import provider
+from src.dash.explorer import DETAIL_FIELDS, ID, parse_query
+
+COLUMNS = {
+    'title': 'Title',
+    'location': 'Location',
+    'estate': 'Type',
+    'roomsNumberNotation': 'Rooms',
+    'areaInSquareMeters': 'Area (m²)',
+    'totalPrice': 'Price (€)',
+    'pricePerSquareMeter': 'Price per m² (€)',
+}
+NUMERIC_COLUMNS = ['areaInSquareMeters', 'totalPrice', 'pricePerSquareMeter']
+DETAIL_NOTE = 'Title and location cannot be sorted or filtered.'
+
+# The DataTable has no per-column sort or filter switch, so the sort arrows
+# of the detail columns are hidden and their filter cells locked.
+DETAIL_CSS = [
+    rule
+    for column in DETAIL_FIELDS
+    for rule in [
+        {
+            'selector': (
+                f'th.dash-header[data-dash-column="{column}"] '
+                '.column-header--sort'
+            ),
+            'rule': 'display: none',
+        },
+        {
+            'selector': f'th.dash-filter[data-dash-column="{column}"] input',
+            'rule': 'pointer-events: none',
+        },
+    ]
+]
+
+
+def get_component():
+    component = dbc.Row(
+        [
+            html.H3('Listings', style={'padding-bottom': '10px'}),
+            html.Small(DETAIL_NOTE, style={'padding-bottom': '10px'}),
+            dash_table.DataTable(
+                columns=[
+                    {
+                        'name': name,
+                        'id': column,
+                        'type': (
+                            'numeric' if column in NUMERIC_COLUMNS else 'text'
+                        ),
+                        **(
+                            {
+                                'filter_options': {
+                                    'placeholder_text': 'not filterable'
+                                }
+                            }
+                            if column in DETAIL_FIELDS
+                            else {}
+                        ),
+                    }
+                    for column, name in COLUMNS.items()
+                ],
+                id='listings-explorer',
+                page_current=0,
+                page_size=settings.DASH_EXPLORER_PAGE_SIZE,
+                page_action='custom',
+                sort_action='custom',
+                sort_mode='single',
+                sort_by=[],
+                filter_action='custom',
+                filter_query='',
+                style_header={
+                    'backgroundColor': '#222729',
+                    'fontWeight': 'bold',
+                    'border': '0px',
+                    'color': '#D3D6DF',
+                },
+                style_filter={
+                    'backgroundColor': '#222729',
+                    'color': '#D3D6DF',
+                },
+                style_cell={
+                    'textAlign': 'left',
+                    'padding': '8px',
+                    'backgroundColor': '#131516',
+                    'color': '#D3D6DF',
+                    'maxWidth': '320px',
+                    'overflow': 'hidden',
+                    'textOverflow': 'ellipsis',
+                },
+                style_data={'border': '0px'},
+                style_table={'overflowX': 'auto'},
+                css=DETAIL_CSS,
+            ),
+            html.Div(
+                id='listings-explorer-message',
+                style={'color': '#F28B82', 'padding-top': '10px'},
+            ),
+            dcc.Store(id='listings-explorer-cursors'),
+        ],
+        style={
+            'backgroundColor': '#2A3439',
+            'color': '#ffffff',
+            'padding': '20px',
+            'border-radius': '20px',
+            'margin': '10px 20px 10px 10px',
+        },
+    )
+
+    return component
+
+
+@figure_cache.memoize
+def listing_count(district, filter_query):
+    explorer = provider.district(district).explorer
+    return explorer.count(parse_query(None, filter_query, explorer.df))
+
+
+def listings_page(district, table, cursors):
+    """
+    Queries the listings of the visible page. The position of the last
+    listing of every page shown is kept in the browser, so the next page
+    starts after it, as long as the data version, the district and the
+    query are the same. A filter that cannot be applied shows no listings
+    and says why.
+    """
+
+    version = provider.get().current
+    district = version.district(district)
+    explorer = district.explorer
+    page_current = table['page_current'] or 0
+    page_size = table['page_size'] or settings.DASH_EXPLORER_PAGE_SIZE
+    sort_by, filter_query = table['sort_by'], table['filter_query']
+    try:
+        query = parse_query(sort_by, filter_query, explorer.df)
+    except ValueError as error:
+        return [], 1, None, str(error)
+
+    key = [version.version, district.name, page_size, sort_by, filter_query]
+    pages = cursors['pages'] if cursors and cursors['key'] == key else {}
+
+    previous = str(page_current - 1)
+    if page_current == 0 or previous in pages:
+        positions = explorer.page(query, page_size, after=pages.get(previous))
+    else:
+        positions = explorer.page_at(query, page_size, page_current)
+    if len(positions):
+        pages[str(page_current)] = int(positions[-1])
+
+    rows = explorer.rows(positions)
+    details = version.listing_details(district.name, rows[ID].tolist())
+    rows = rows.merge(details, on=ID, how='left')
+    rows = rows.astype(object).where(rows.notna(), None)
+
+    page_count = max(
+        math.ceil(listing_count(district.name, filter_query) / page_size), 1
+    )
+
+    return (
+        rows.to_dict('records'),
+        page_count,
+        {'key': key, 'pages': pages},
+        None,
+    )
+
+
+def register_callbacks(app: Dash) -> None:
+    app.callback(
+        output=[
+            Output('listings-explorer', 'data'),
+            Output('listings-explorer', 'page_count'),
+            Output('listings-explorer-cursors', 'data'),
+            Output('listings-explorer-message', 'children'),
+        ],
+        inputs={
+            'district': Input('district-selector', 'value'),
+            'table': {
+                prop: Input('listings-explorer', prop)
+                for prop in [
+                    'page_current',
+                    'page_size',
+                    'sort_by',
+                    'filter_query',
+                ]
+            },
+        },
+        state={'cursors': State('listings-explorer-cursors', 'data')},
+    )(listings_page)
@@ -1,17 +1,45 @@
 import dash_bootstrap_components as dbc
 import pandas as pd
 import plotly.graph_objects as go
-from dash import dcc, html
+from dash import Dash, Input, Output, dcc, html
 
-from src.dash.components.app import df
+from src.core.aggregates import select_segment
+from src.dash.cache import figure_cache
+from src.dash.data import TRANSACTION, provider
 
 
 def get_component():
-    pivot_df = df.pivot_table(
+    component = dbc.Row(
+        [
+            html.H3(
+                'Median Price per m² Based on Location and Number of Rooms',
+                style={'padding-bottom': '20px'},
+            ),
+            dcc.Graph(id='heatmap-figure'),
+        ],
+        style={
+            'backgroundColor': '#2A3439',
+            'color': '#ffffff',
+            'padding': '20px',
+            'border-radius': '20px',
+            'margin': '10px 20px 10px 10px',
+        },
+    )
+
+    return component
+
+
+@figure_cache.memoize
+def heatmap_plot(district):
+    heatmap_df = select_segment(
+        provider.district(district).aggregates['price_heatmap'],
+        transaction=TRANSACTION,
+    )
+
+    pivot_df = heatmap_df.pivot(
         index='location',
         columns='roomsNumberNotation',
         values='pricePerSquareMeter',
-        aggfunc='median',
     )
 
     pivot_df = pivot_df.apply(pd.to_numeric, errors='coerce')
@@ -49,21 +77,11 @@ def get_component():
         ),
     )
 
-    component = dbc.Row(
-        [
-            html.H3(
-                'Median Price per m² Based on Location and Number of Rooms',
-                style={'padding-bottom': '20px'},
-            ),
-            dcc.Graph(figure=heatmap),
-        ],
-        style={
-            'backgroundColor': '#2A3439',
-            'color': '#ffffff',
-            'padding': '20px',
-            'border-radius': '20px',
-            'margin': '10px 20px 10px 10px',
-        },
-    )
+    return heatmap
 
-    return component
+
+def register_callbacks(app: Dash) -> None:
+    app.callback(
+        Output('heatmap-figure', 'figure'),
+        Input('district-selector', 'value'),
+    )(heatmap_plot)
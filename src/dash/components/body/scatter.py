@@ -1,8 +1,19 @@
 import dash_bootstrap_components as dbc
 import plotly.express as px
-from dash import Input, Output, dcc, html
+from dash import (
+    ClientsideFunction,
+    Dash,
+    Input,
+    Output,
+    dcc,
+    html,
+)
 
-from src.dash.components.app import app, df
+from src.core.settings import settings
+from src.dash.cache import figure_cache
+from src.dash.clientside import NAMESPACE, listing_store
+from src.dash.data import provider
+from src.dash.downsample import COUNT, scatter_points
 
 AREA_MARKS_LABELS = {
     1: 'Min',
@@ -17,10 +28,12 @@ AREA_MARKS_LABELS = {
     10: 'Max',
 }
 
+COLOR_SCALE = px.colors.sequential.Viridis
+COLOR_MAP = {f'T{i}': COLOR_SCALE[i] for i in range(10)}
+COLOR_MAP['T9+'] = COLOR_SCALE[-1]
 
-def get_component():
-    dropdown_options = list(df['estate'].unique())
 
+def get_component():
     component = dbc.Row(
         [
             html.H3(
@@ -31,7 +44,7 @@ def get_component():
                 dbc.Col(
                     [
                         dcc.Dropdown(
-                            dropdown_options,
+                            [],
                             value=None,
                             id='estate-type-scatter',
                             placeholder='Select Type of Property',
@@ -72,6 +85,11 @@ def get_component():
                         id='area-mark',
                     ),
                 ]),
+                *(
+                    [dcc.Store(id='scatter-store')]
+                    if settings.DASH_CLIENTSIDE_FILTERING
+                    else []
+                ),
             ]),
         ],
         style={
@@ -86,58 +104,11 @@ def get_component():
     return component
 
 
-@app.callback(
-    Output('scatter-figure', 'figure'),
-    Input('estate-type-scatter', 'value'),
-    Input('log-axis', 'value'),
-    Input('area-mark', 'value'),
-)
-def scatter_plot(estate_type, log_axis, area_mark):
-    df_filtered = df.copy()
-
-    """ Area range filter"""
-    map_marks = {
-        1: df_filtered.areaInSquareMeters.min(),
-        2: 30,
-        3: 50,
-        4: 100,
-        5: 150,
-        6: 500,
-        7: 1000,
-        8: 10_000,
-        9: 100_000,
-        10: df_filtered.areaInSquareMeters.max(),
-    }
-
-    min_range_selected = area_mark[0]
-    max_range_selected = area_mark[1]
-
-    min_area = map_marks[min_range_selected]
-    max_area = map_marks[max_range_selected]
-
-    df_filtered = df[
-        (df.areaInSquareMeters >= min_area)
-        & (df.areaInSquareMeters <= max_area)
-    ]
-
-    """ Type of property filter (estate)"""
-    if estate_type:
-        df_filtered = df_filtered[df_filtered['estate'] == estate_type]
-
-    """Figure plot"""
-    color_scale = px.colors.sequential.Viridis
-    color_map = {f'T{i}': color_scale[i] for i in range(10)}
-    color_map['T9+'] = color_scale[-1]
+def scatter_estates(district):
+    return provider.district(district).index.values('estate')
 
-    fig = px.scatter(
-        df_filtered,
-        y='totalPrice',
-        x='areaInSquareMeters',
-        size='pricePerSquareMeter',
-        color='roomsNumberNotation',
-        color_discrete_map=color_map,
-    )
 
+def style_figure(fig, log_axis):
     """Log axis filter"""
     fig.update_xaxes(type='log' if 'log_x' in log_axis else 'linear')
     fig.update_yaxes(type='log' if 'log_y' in log_axis else 'linear')
@@ -153,3 +124,83 @@ def scatter_plot(estate_type, log_axis, area_mark):
     )
 
     return fig
+
+
+def scatter_plot(district, estate_type, log_axis, area_mark):
+    index = provider.district(district).index
+
+    """ Area range and type of property (estate) filters"""
+    df_filtered = index.area_range(
+        estate_type or None, area_mark[0], area_mark[1]
+    )
+
+    """Downsampling of large listings"""
+    points = scatter_points(df_filtered)
+    hover_data = (
+        [COUNT, 'pricePerSquareMeter'] if points.mode == 'bins' else None
+    )
+
+    """Figure plot"""
+    fig = px.scatter(
+        points.df,
+        y='totalPrice',
+        x='areaInSquareMeters',
+        size=points.size,
+        color='roomsNumberNotation',
+        color_discrete_map=COLOR_MAP,
+        hover_data=hover_data,
+        render_mode=points.render_mode,
+    )
+
+    return style_figure(fig, log_axis)
+
+
+def scatter_store(district):
+    """
+    The listings of a district for the clientside filters, with the
+    layout and colors of the figure, sent once per district.
+    """
+
+    index = provider.district(district).index
+    fig = px.scatter(
+        index.df.iloc[:0],
+        y='totalPrice',
+        x='areaInSquareMeters',
+        color='roomsNumberNotation',
+    )
+
+    return {
+        **listing_store(index),
+        'layout': style_figure(fig, log_axis=[]).to_plotly_json()['layout'],
+        'colors': COLOR_MAP,
+    }
+
+
+def register_callbacks(app: Dash) -> None:
+    app.callback(
+        Output('estate-type-scatter', 'options'),
+        Input('district-selector', 'value'),
+    )(scatter_estates)
+
+    if settings.DASH_CLIENTSIDE_FILTERING:
+        app.callback(
+            Output('scatter-store', 'data'),
+            Input('district-selector', 'value'),
+        )(scatter_store)
+
+        app.clientside_callback(
+            ClientsideFunction(namespace=NAMESPACE, function_name='scatter'),
+            Output('scatter-figure', 'figure'),
+            Input('scatter-store', 'data'),
+            Input('estate-type-scatter', 'value'),
+            Input('log-axis', 'value'),
+            Input('area-mark', 'value'),
+        )
+    else:
+        app.callback(
+            Output('scatter-figure', 'figure'),
+            Input('district-selector', 'value'),
+            Input('estate-type-scatter', 'value'),
+            Input('log-axis', 'value'),
+            Input('area-mark', 'value'),
+        )(figure_cache.memoize(scatter_plot))
@@ -1,27 +1,14 @@
-from dash import dash_table, html
+from dash import Dash, Input, Output, dash_table, html
 
-from src.dash.components.app import df
+from src.core.aggregates import select_segment
+from src.dash.data import TRANSACTION, provider
 
-
-def get_component():
-    df_agg = (
-        df.groupby('location')
-        .agg({
-            'totalPrice': ['mean', 'median'],
-        })
-        .round(0)
-    )
-
-    df_agg.columns = df_agg.columns.droplevel(0)
-    
-    df_agg = df_agg.reset_index()
-
-    df_agg.columns = ['Location', 'Mean (€)', 'Median (€)']
+COLUMNS = ['Location', 'Mean (€)', 'Median (€)']
 
 
+def get_component():
     component = dash_table.DataTable(
-        data=df_agg.to_dict('records'),
-        columns=[{'name': col, 'id': col} for col in df_agg.columns],
+        columns=[{'name': col, 'id': col} for col in COLUMNS],
         id='table-mask',
         style_header={
             'backgroundColor': '#222729',
@@ -46,4 +33,22 @@ def get_component():
         },
     )
 
-    return component
\ No newline at end of file
+    return component
+
+
+def location_prices_table(district):
+    df_agg = select_segment(
+        provider.district(district).aggregates['location_prices'],
+        transaction=TRANSACTION,
+    )
+
+    df_agg.columns = COLUMNS
+
+    return df_agg.to_dict('records')
+
+
+def register_callbacks(app: Dash) -> None:
+    app.callback(
+        Output('table-mask', 'data'),
+        Input('district-selector', 'value'),
+    )(location_prices_table)
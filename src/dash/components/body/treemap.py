@@ -1,13 +1,22 @@
 import dash_bootstrap_components as dbc
 import plotly.express as px
-from dash import Input, Output, dcc, html
+from dash import (
+    ClientsideFunction,
+    Dash,
+    Input,
+    Output,
+    dcc,
+    html,
+)
 
-from src.dash.components.app import app, df
+from src.core.aggregates import ALL_ESTATES, select_segment
+from src.core.settings import settings
+from src.dash.cache import figure_cache
+from src.dash.clientside import NAMESPACE
+from src.dash.data import TRANSACTION, District, provider
 
 
 def get_component():
-    dropdown_options = list(df['estate'].unique())
-
     component = dbc.Row(
         [
             html.H3(
@@ -18,7 +27,7 @@ def get_component():
                 dbc.Col(
                     [
                         dcc.Dropdown(
-                            dropdown_options,
+                            [],
                             value=None,
                             id='estate-type-treemap',
                             placeholder='Select Type of Property',
@@ -31,6 +40,11 @@ def get_component():
                     md=3,
                 ),
                 dcc.Graph(id='treemap-figure'),
+                *(
+                    [dcc.Store(id='treemap-store')]
+                    if settings.DASH_CLIENTSIDE_FILTERING
+                    else []
+                ),
             ]),
         ],
         style={
@@ -45,22 +59,32 @@ def get_component():
     return component
 
 
-@app.callback(
-    Output('treemap-figure', 'figure'),
-    Input('estate-type-treemap', 'value'),
-)
-def treemap_plot(estate_type):
-    df_filtered = df.copy()
+def treemap_estates(district):
+    return estate_options(provider.district(district))
 
-    if estate_type:
-        df_filtered = df_filtered[df_filtered['estate'] == estate_type]
 
-    proportion = (
-        df_filtered.value_counts(
-            ['roomsNumberNotation', 'location'], normalize=True
-        )
-        .to_frame()
-        .reset_index()
+def estate_options(district: District) -> list[str]:
+    breakdown = district.aggregates['room_breakdown']
+
+    return [
+        estate
+        for estate in breakdown.loc[
+            breakdown['transaction'] == TRANSACTION, 'estate'
+        ].unique()
+        if estate != ALL_ESTATES
+    ]
+
+
+@figure_cache.memoize
+def treemap_plot(district, estate_type):
+    return treemap_figure(provider.district(district), estate_type)
+
+
+def treemap_figure(district: District, estate_type):
+    proportion = select_segment(
+        district.aggregates['room_breakdown'],
+        transaction=TRANSACTION,
+        estate=estate_type,
     )
 
     fig = px.treemap(
@@ -89,3 +113,44 @@ def treemap_plot(estate_type):
     )
 
     return fig
+
+
+def treemap_store(district):
+    """
+    The treemap of a district for every estate type, keyed by it, or by an
+    empty string for all of them, so the clientside filter picks one. The
+    district is resolved once, so every treemap is built from the same data
+    version.
+    """
+
+    district = provider.district(district)
+    return {
+        estate or '': treemap_figure(district, estate)
+        for estate in [None, *estate_options(district)]
+    }
+
+
+def register_callbacks(app: Dash) -> None:
+    app.callback(
+        Output('estate-type-treemap', 'options'),
+        Input('district-selector', 'value'),
+    )(treemap_estates)
+
+    if settings.DASH_CLIENTSIDE_FILTERING:
+        app.callback(
+            Output('treemap-store', 'data'),
+            Input('district-selector', 'value'),
+        )(treemap_store)
+
+        app.clientside_callback(
+            ClientsideFunction(namespace=NAMESPACE, function_name='treemap'),
+            Output('treemap-figure', 'figure'),
+            Input('treemap-store', 'data'),
+            Input('estate-type-treemap', 'value'),
+        )
+    else:
+        app.callback(
+            Output('treemap-figure', 'figure'),
+            Input('district-selector', 'value'),
+            Input('estate-type-treemap', 'value'),
+        )(treemap_plot)
@@ -1,28 +1,45 @@
 import dash_bootstrap_components as dbc
+from dash import Dash, Input, Output, dcc, html
 
-from src.dash.components.app import df
+from src.core.aggregates import select_segment
 from src.dash.components.utils.card import card_component
+from src.dash.data import TRANSACTION, Data, district_label, provider
 
 
 class Head:
-    def __init__(self) -> None:
-        self._component = self.get_component()
+    def __init__(self, data: Data | None = None) -> None:
+        self._component = self.get_component(data)
 
     @staticmethod
-    def get_component():
+    def get_component(data: Data | None = None):
+        districts = data.districts if data is not None else []
         component = dbc.Row([
             dbc.Row(
-                [
-                    card_component('Total Listings', df.shape[0]),
-                    card_component(
-                        'Median Price', f'{df.totalPrice.median()} €'
-                    ),
-                    card_component(
-                        'Median Price per m²',
-                        f'{df.pricePerSquareMeter.median()} € / m²',
-                    ),
-                ],
-            )
+                dbc.Col(
+                    [
+                        html.P('District'),
+                        dcc.Dropdown(
+                            [
+                                {
+                                    'label': district_label(district),
+                                    'value': district,
+                                }
+                                for district in districts
+                            ],
+                            value=data.default_district if data else None,
+                            clearable=False,
+                            id='district-selector',
+                            style={
+                                'color': 'black',
+                                'backgroundColor': 'white',
+                            },
+                        ),
+                    ],
+                    md=3,
+                ),
+                style={'padding-bottom': '20px'},
+            ),
+            dbc.Row(id='headline-cards'),
         ])
 
         return component
@@ -30,3 +47,26 @@ class Head:
     @property
     def component(self):
         return self._component
+
+
+def headline_cards(district):
+    headline = select_segment(
+        provider.district(district).aggregates['headline'],
+        transaction=TRANSACTION,
+    ).reindex([0])
+
+    return [
+        card_component('Total Listings', int(headline.listings.fillna(0)[0])),
+        card_component('Median Price', f'{headline.median_price[0]} €'),
+        card_component(
+            'Median Price per m²',
+            f'{headline.median_price_per_m2[0]} € / m²',
+        ),
+    ]
+
+
+def register_callbacks(app: Dash) -> None:
+    app.callback(
+        Output('headline-cards', 'children'),
+        Input('district-selector', 'value'),
+    )(headline_cards)
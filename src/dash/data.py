@@ -1,26 +1,477 @@
+import threading
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
+from src.core.aggregates import (
+    AGGREGATES,
+    MAX_AREA,
+    MIN_AREA,
+    compute_aggregates,
+    dashboard_listings,
+)
+from src.core.columnar import compact_frame, memory_report, read_dataframe
 from src.core.mongodb import MongoConnection
 from src.core.settings import settings
+from src.core.snapshot import (
+    Snapshot,
+    latest_snapshot,
+    load_partition,
+    partition_table,
+    snapshot_partitions,
+)
+from src.dash.cache import set_data_version
+from src.dash.explorer import DETAIL_FIELDS, ID, ListingExplorer
+from src.dash.index import ListingIndex
+from src.dash.shared import SHARED_FILE, read_frame, write_frame
+from src.ingestion.dash_etl import watermark_key
 
-MIN_AREA = 10
-MAX_AREA = 500_000
+TRANSACTION = 'SELL'
 
+LISTING_FIELDS = [
+    'id',
+    'title',
+    'estate',
+    'transaction',
+    'district',
+    'location',
+    'city',
+    'totalPrice',
+    'pricePerSquareMeter',
+    'areaInSquareMeters',
+    'roomsNumber',
+    'roomsNumberNotation',
+]
 
-class Data:
-    def __init__(self) -> None:
-        self.df = self.get_data()
+# The listing columns used by the components, and how they are kept in
+# memory. The other columns are dropped once the aggregates are computed.
+FRAME_SCHEMA = {
+    'id': 'numeric',
+    'estate': 'category',
+    'roomsNumberNotation': 'category',
+    'totalPrice': 'numeric',
+    'pricePerSquareMeter': 'numeric',
+    'areaInSquareMeters': 'numeric',
+}
+
+
+@dataclass
+class District:
+    name: str
+    df: pd.DataFrame
+    aggregates: dict[str, pd.DataFrame]
+    index: ListingIndex
+
+    @cached_property
+    def explorer(self) -> ListingExplorer:
+        return ListingExplorer(self.index)
+
+
+def district_label(district: str) -> str:
+    return district.replace('-', ' ').title()
+
+
+class DataVersion:
+    def __init__(self, version: str, version_dir: Path | None) -> None:
+        """
+        One version of the dashboard data: the districts of a snapshot, or
+        of the dash collection if there is none, loaded lazily and kept
+        once loaded.
+
+        Args:
+            version (str): The name of the version.
+            version_dir (Path | None): The snapshot directory, or None to
+            load the data from MongoDB.
+        """
+
+        self.version = version
+        self.version_dir = version_dir
+        self.districts = self.get_districts(version_dir)
+        self.default_district = (
+            settings.DASH_DEFAULT_DISTRICT
+            if settings.DASH_DEFAULT_DISTRICT in self.districts
+            or not self.districts
+            else self.districts[0]
+        )
+        self._lock = threading.Lock()
+        self._district_locks: dict[str, threading.Lock] = {}
+        self._loaded: dict[str, District] = {}
+
+    @property
+    def loaded(self) -> list[str]:
+        return list(self._loaded)
+
+    def district(self, name: str | None = None) -> District:
+        """
+        Returns a district, loading it on first use. The loaded districts
+        are returned without a lock, and each district is loaded under its
+        own lock, so loading one does not hold up the callbacks of another.
+
+        Args:
+            name (str | None): Optional; The district. Defaults to the
+            default district, also used for unknown ones.
+
+        Returns:
+            District: The listings, aggregates and index of the district.
+        """
+
+        if not name or (self.districts and name not in self.districts):
+            name = self.default_district
+
+        district = self._loaded.get(name)
+        if district is not None:
+            return district
+
+        with self._district_lock(name):
+            if name not in self._loaded:
+                self._loaded[name] = self.load_district(name)
+            return self._loaded[name]
+
+    def _district_lock(self, name: str) -> threading.Lock:
+        with self._lock:
+            return self._district_locks.setdefault(name, threading.Lock())
+
+    def load_district(self, name: str) -> District:
+        shared_path = self.shared_path(name)
+        if shared_path is not None and shared_path.exists():
+            return self.load_shared(name, shared_path)
+
+        snapshot = (
+            load_partition(self.version_dir, name)
+            if self.version_dir is not None
+            else None
+        )
+        listings = self.get_data(name, snapshot)
+        df = self.compact(listings)
+        district = District(
+            name=name,
+            aggregates=self.get_aggregates(snapshot, listings),
+            df=df,
+            index=ListingIndex(df),
+        )
+
+        # The compact frame is only shared when the snapshot holds the
+        # aggregates, so the other workers do not need the listings.
+        if shared_path is not None and self.has_aggregates(snapshot):
+            write_frame(district.index, shared_path)
+            return self.load_shared(name, shared_path)
+
+        return district
+
+    def shared_path(self, name: str) -> Path | None:
+        """
+        Returns the file of the compact frame of a district shared by the
+        worker processes, or None if it is not shared.
+        """
+
+        if (
+            not settings.DASH_SHARED_FRAMES
+            or self.version_dir is None
+            or name not in self.districts
+        ):
+            return None
+
+        return self.version_dir / name / SHARED_FILE
+
+    def load_shared(self, name: str, shared_path: Path) -> District:
+        print(f'Mapping the shared "{name}" listings from {shared_path}.')
+        snapshot = load_partition(
+            self.version_dir, name, names=list(AGGREGATES)
+        )
+        index = read_frame(shared_path)
+        return District(
+            name=name,
+            aggregates=snapshot.tables,
+            df=index.df,
+            index=index,
+        )
+
+    def listing_details(self, name: str, ids: list[int]) -> pd.DataFrame:
+        """
+        Reads the fields of some listings of a district that are not kept
+        in memory: from the memory-mapped snapshot partition, or from the
+        dash collection by its unique id index if there is none.
+
+        Args:
+            name (str): The district.
+            ids (list[int]): The ids of the listings.
+
+        Returns:
+            pd.DataFrame: The id and `DETAIL_FIELDS` of the listings.
+        """
+
+        table = (
+            partition_table(self.version_dir, name)
+            if self.version_dir is not None
+            else None
+        )
+        if table is not None:
+            value_set = pa.array(ids).cast(table[ID].type)
+            return (
+                table
+                .filter(pc.is_in(table[ID], value_set=value_set))
+                .select([ID, *DETAIL_FIELDS])
+                .to_pandas()
+            )
+
+        return read_dataframe(
+            mongo_conn=MongoConnection(),
+            collection=settings.COLLECTION_DASH,
+            fields=[ID, *DETAIL_FIELDS],
+            filter={ID: {'$in': ids}},
+        )
 
     @staticmethod
-    def get_data() -> pd.DataFrame:
-        data = MongoConnection().get_data_from_collection(
-            collection=settings.COLLECTION_DASH
+    def get_districts(version_dir: Path | None = None) -> list[str]:
+        if version_dir is not None:
+            return sorted(snapshot_partitions(version_dir))
+
+        return sorted(
+            group['_id']
+            for batch in MongoConnection().aggregate_batches(
+                collection=settings.COLLECTION_DASH,
+                pipeline=[{'$group': {'_id': '$district'}}],
+            )
+            for group in batch
+            if group['_id']
         )
 
-        df = pd.DataFrame(data)
+    @staticmethod
+    def get_data(
+        district: str, snapshot: Snapshot | None = None
+    ) -> pd.DataFrame:
+        if snapshot is not None:
+            df = dashboard_listings(snapshot.listings)
+            return df[df['transaction'] == TRANSACTION].reset_index(drop=True)
+
+        print(
+            f'No snapshot found for "{district}". Loading the dashboard data '
+            'from MongoDB.'
+        )
+        return read_dataframe(
+            mongo_conn=MongoConnection(),
+            collection=settings.COLLECTION_DASH,
+            fields=LISTING_FIELDS,
+            filter={
+                'district': district,
+                'transaction': TRANSACTION,
+                'areaInSquareMeters': {'$gt': MIN_AREA, '$lt': MAX_AREA},
+            },
+        )
+
+    @staticmethod
+    def compact(df: pd.DataFrame) -> pd.DataFrame:
+        compact_df = compact_frame(df, FRAME_SCHEMA)
+        print(f'Listing frame memory:\n{memory_report(df, compact_df)}')
+        return compact_df
+
+    @staticmethod
+    def has_aggregates(snapshot: Snapshot | None) -> bool:
+        return snapshot is not None and set(AGGREGATES) <= set(snapshot.tables)
+
+    def get_aggregates(
+        self, snapshot: Snapshot | None, df: pd.DataFrame
+    ) -> dict[str, pd.DataFrame]:
+        if self.has_aggregates(snapshot):
+            return snapshot.tables
+
+        return compute_aggregates(df)
+
+
+class Data:
+    def __init__(self, snapshot_path: str | Path | None = None) -> None:
+        """
+        The dashboard data shared by the callbacks. The current version is
+        swapped for a new one by `refresh`, so a callback that takes one
+        `District` sees a single consistent version, even if the data is
+        reloaded while it runs.
+
+        Args:
+            snapshot_path (str | Path | None): Optional; The directory of
+            the snapshots. Defaults to `SNAPSHOT_PATH` from the settings.
+        """
+
+        self.snapshot_path = snapshot_path
+        version_dir, version = self.latest_version()
+        self.current = DataVersion(version, version_dir)
+        self.current.district()
+        set_data_version(version)
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher: threading.Thread | None = None
+
+    @property
+    def version(self) -> str:
+        return self.current.version
+
+    @property
+    def districts(self) -> list[str]:
+        return self.current.districts
+
+    @property
+    def default_district(self) -> str:
+        return self.current.default_district
+
+    def district(self, name: str | None = None) -> District:
+        return self.current.district(name)
+
+    def latest_version(self) -> tuple[Path | None, str]:
+        """
+        Returns the newest snapshot directory and its name or, if there is
+        no snapshot, None and a version taken from the watermark of the dash
+        collection, which changes on every run that loads new data.
+        """
+
+        version_dir = latest_snapshot(self.snapshot_path)
+        if version_dir is not None:
+            return version_dir, version_dir.name
+
+        watermark = MongoConnection().get_watermark(
+            watermark_key(settings.COLLECTION_DASH)
+        )
+        if watermark is None:
+            return None, 'mongo'
+
+        return None, f'mongo-{watermark:%Y%m%d%H%M%S%f}'
+
+    def refresh(self) -> bool:
+        """
+        Loads the newest version of the data, if it changed, and swaps it
+        in. The new version loads the districts already loaded by the
+        current one, with their aggregates, before the swap, so the
+        callbacks never wait for it.
+
+        Returns:
+            bool: Whether a new version was swapped in.
+        """
+
+        with self._refresh_lock:
+            version_dir, version = self.latest_version()
+            if version == self.current.version:
+                return False
+
+            print(f'Loading the dashboard data version "{version}".')
+            new = DataVersion(version, version_dir)
+            for name in [new.default_district, *self.current.loaded]:
+                new.district(name)
+
+            # The data is swapped before the cache version, so a figure
+            # built from the new data is never cached under the previous
+            # version.
+            self.current = new
+            set_data_version(version)
+            print(f'Dashboard data version "{version}" swapped in.')
+            return True
+
+    def start_refresher(self, interval: float | None = None) -> None:
+        """
+        Starts a background thread that calls `refresh` every `interval`
+        seconds.
+
+        Args:
+            interval (float | None): Optional; The seconds between checks.
+            Defaults to `DASH_REFRESH_INTERVAL` from the settings, where 0
+            disables the refresher.
+        """
+
+        if interval is None:
+            interval = settings.DASH_REFRESH_INTERVAL
+        if not interval or self._refresher is not None:
+            return
+
+        def refresh_loop() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f'Could not refresh the dashboard data: {e}')
+
+        self._stop.clear()
+        self._refresher = threading.Thread(
+            target=refresh_loop, name='data-refresher', daemon=True
+        )
+        self._refresher.start()
+
+    def stop_refresher(self) -> None:
+        self._stop.set()
+        if self._refresher is not None:
+            self._refresher.join()
+            self._refresher = None
+
+
+class DataProvider:
+    def __init__(self) -> None:
+        """
+        Provides the dashboard data to the layout and the callbacks. The
+        data is loaded once, on first use, so importing the dashboard has
+        no side effects and does not need MongoDB.
+        """
+
+        self.snapshot_path: str | Path | None = None
+        self._data: Data | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._data is not None
+
+    def configure(self, snapshot_path: str | Path | None = None) -> None:
+        """
+        Sets where the data is loaded from, dropping the data loaded from
+        anywhere else.
+
+        Args:
+            snapshot_path (str | Path | None): Optional; The directory of
+            the snapshots. Defaults to `SNAPSHOT_PATH` from the settings.
+        """
+
+        with self._lock:
+            if snapshot_path != self.snapshot_path:
+                self._data = None
+            self.snapshot_path = snapshot_path
+
+    def get(self) -> Data:
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    start = time.perf_counter()
+                    self._data = Data(self.snapshot_path)
+                    print(
+                        f'Dashboard data version "{self._data.version}" '
+                        f'loaded in {time.perf_counter() - start:.2f}s.'
+                    )
+        return self._data
+
+    def district(self, name: str | None = None) -> District:
+        return self.get().district(name)
+
+
+def preload_districts(snapshot_path: str | Path | None = None) -> None:
+    """
+    Loads every district of the newest snapshot once, so their shared
+    frames are written before the worker processes start and map them.
+
+    Args:
+        snapshot_path (str | Path | None): Optional; The directory of the
+        snapshots. Defaults to `SNAPSHOT_PATH` from the settings.
+    """
+
+    version_dir = latest_snapshot(snapshot_path)
+    if version_dir is None or not settings.DASH_SHARED_FRAMES:
+        print('There are no shared frames to preload.')
+        return
+
+    version = DataVersion(version_dir.name, version_dir)
+    for name in version.districts:
+        version.district(name)
+    print(
+        f'Preloaded {len(version.districts)} districts of "{version.version}".'
+    )
+
 
-        return df[
-            (df.transaction == 'SELL')
-            & (df.areaInSquareMeters > MIN_AREA)
-            & (df.areaInSquareMeters < MAX_AREA)
-        ]
+provider = DataProvider()
@@ -0,0 +1,166 @@
+"""
+Reduces the listings drawn by the price/area scatter plot, so the figure
+sent to the browser stops growing with the number of listings.
+
+Up to `DASH_SCATTER_WEBGL_POINTS` listings, every point is drawn as SVG.
+Above it, the points are drawn with WebGL, and above
+`DASH_SCATTER_MAX_POINTS` they are reduced, as set by
+`DASH_SCATTER_DOWNSAMPLE`, to either:
+
+- 'bins': the listings of each room type grouped into a grid of
+  `DASH_SCATTER_BINS` × `DASH_SCATTER_BINS` bins in log space, one point per
+  bin at the mean position of its listings, sized by their number;
+- 'sample': a sample of `DASH_SCATTER_MAX_POINTS` listings, stratified by
+  room type and keeping the most extreme listings of each axis.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.core.settings import settings
+
+X = 'areaInSquareMeters'
+Y = 'totalPrice'
+SIZE = 'pricePerSquareMeter'
+CATEGORY = 'roomsNumberNotation'
+COUNT = 'count'
+
+# Share of a sample kept for the most extreme listings of each axis.
+OUTLIER_SHARE = 0.1
+
+
+@dataclass
+class ScatterPoints:
+    """
+    The points to draw and how to draw them.
+
+    Attributes:
+        df (pd.DataFrame): The points.
+        size (str): The column that sizes the markers.
+        render_mode (str): 'svg' or 'webgl'.
+        mode (str): 'listings', 'bins' or 'sample'.
+    """
+
+    df: pd.DataFrame
+    size: str
+    render_mode: str
+    mode: str
+
+
+def bin_index(values: np.ndarray, bins: int) -> np.ndarray:
+    low, high = values.min(), values.max()
+    if high == low:
+        return np.zeros(len(values), dtype=np.int64)
+
+    index = ((values - low) / (high - low) * bins).astype(np.int64)
+    return np.minimum(index, bins - 1)
+
+
+def density_bins(df: pd.DataFrame, bins: int) -> pd.DataFrame:
+    """
+    Groups the listings of each room type into a grid of bins in log space.
+
+    Args:
+        df (pd.DataFrame): The listings.
+        bins (int): The number of bins of each axis.
+
+    Returns:
+        pd.DataFrame: One row per non-empty bin and room type, at the
+        geometric mean area and price of its listings, with their number
+        and median price per square meter.
+    """
+
+    df = df[(df[X] > 0) & (df[Y] > 0)]
+    log_x = np.log10(df[X].to_numpy(dtype='float64'))
+    log_y = np.log10(df[Y].to_numpy(dtype='float64'))
+
+    grid = pd.DataFrame({
+        CATEGORY: df[CATEGORY].to_numpy(),
+        'bin_x': bin_index(log_x, bins),
+        'bin_y': bin_index(log_y, bins),
+        'log_x': log_x,
+        'log_y': log_y,
+        SIZE: df[SIZE].to_numpy(),
+    })
+
+    binned = (
+        grid
+        .groupby([CATEGORY, 'bin_x', 'bin_y'], observed=True)
+        .agg(
+            log_x=('log_x', 'mean'),
+            log_y=('log_y', 'mean'),
+            count=('log_x', 'size'),
+            median=(SIZE, 'median'),
+        )
+        .reset_index()
+    )
+
+    return pd.DataFrame({
+        CATEGORY: binned[CATEGORY],
+        X: 10 ** binned['log_x'],
+        Y: 10 ** binned['log_y'],
+        COUNT: binned[COUNT],
+        SIZE: binned['median'],
+    })
+
+
+def stratified_sample(
+    df: pd.DataFrame, size: int, seed: int = 0
+) -> pd.DataFrame:
+    """
+    Samples at most `size` listings, keeping the most extreme ones of each
+    axis and sampling the rest in proportion to each room type.
+
+    Args:
+        df (pd.DataFrame): The listings.
+        size (int): The maximum number of listings to keep.
+        seed (int): Optional; The seed of the sample. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: The sampled listings.
+    """
+
+    if len(df) <= size:
+        return df
+
+    extremes = max(int(size * OUTLIER_SHARE / 6), 1)
+    outliers = pd.Index([])
+    for column in [X, Y, SIZE]:
+        outliers = outliers.union(df[column].nsmallest(extremes).index)
+        outliers = outliers.union(df[column].nlargest(extremes).index)
+
+    rest = df.drop(index=outliers)
+    fraction = (size - len(outliers)) / len(rest)
+    sample = rest.groupby(CATEGORY, observed=True).sample(
+        frac=fraction, random_state=seed
+    )
+
+    return pd.concat([df.loc[outliers], sample])
+
+
+def scatter_points(df: pd.DataFrame) -> ScatterPoints:
+    """
+    Chooses how to draw the listings of the scatter plot from their number.
+
+    Args:
+        df (pd.DataFrame): The filtered listings.
+
+    Returns:
+        ScatterPoints: The points to draw and how to draw them.
+    """
+
+    render_mode = (
+        'webgl' if len(df) > settings.DASH_SCATTER_WEBGL_POINTS else 'svg'
+    )
+
+    if len(df) <= settings.DASH_SCATTER_MAX_POINTS:
+        return ScatterPoints(df, SIZE, render_mode, 'listings')
+
+    if settings.DASH_SCATTER_DOWNSAMPLE == 'sample':
+        sample = stratified_sample(df, size=settings.DASH_SCATTER_MAX_POINTS)
+        return ScatterPoints(sample, SIZE, render_mode, 'sample')
+
+    bins = density_bins(df, bins=settings.DASH_SCATTER_BINS)
+    return ScatterPoints(bins, COUNT, render_mode, 'bins')
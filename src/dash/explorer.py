@@ -0,0 +1,329 @@
+"""
+Pages of the listings explorer, queried from the compact listings of a
+district with keyset pagination.
+
+Each sortable column is sorted once per district, keeping the listings
+with the same value in frame order, so the page after a given listing
+starts at a binary search of that listing instead of after every page
+before it. Filters are evaluated on the sorted listings from there, in
+growing chunks, until the page is full, so a page reads about as many
+listings as it shows, however many the district has.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.dash.index import AREA, ListingIndex, positions_dtype
+
+ID = 'id'
+SORTABLE = [
+    AREA,
+    'totalPrice',
+    'pricePerSquareMeter',
+    'estate',
+    'roomsNumberNotation',
+]
+# The listing fields that are not kept in memory, read for the rows of a
+# page only, so they are neither sorted nor filtered.
+DETAIL_FIELDS = ['title', 'location']
+
+FIRST_CHUNK = 1_024
+
+FILTER_PART = re.compile(
+    r'^\{(?P<column>[^}]+)\}\s+(?P<operator>\S+)\s+(?P<value>.+)$'
+)
+# DataTable prefixes the operators with 's' (sensitive) or 'i'
+# (insensitive), and also writes them as words.
+OPERATOR_PREFIX = re.compile(r'^[si](?=[=<>!]|contains)')
+OPERATORS = {
+    'eq': '=',
+    'ne': '!=',
+    'lt': '<',
+    'le': '<=',
+    'gt': '>',
+    'ge': '>=',
+}
+COMPARISONS = {
+    '=': np.equal,
+    '!=': np.not_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    'contains': np.equal,
+}
+
+
+@dataclass(frozen=True)
+class Condition:
+    column: str
+    operator: str
+    value: str | float
+
+
+@dataclass(frozen=True)
+class Query:
+    """
+    A sort order and filter of the explorer.
+
+    Attributes:
+        sort (str | None): The column sorted by, or None for frame order.
+        descending (bool): Whether the sort is descending.
+        conditions (tuple[Condition, ...]): The filters, all applied.
+    """
+
+    sort: str | None = None
+    descending: bool = False
+    conditions: tuple[Condition, ...] = ()
+
+
+def parse_value(value: str) -> str:
+    value = value.strip()
+    if len(value) > 1 and value[0] == value[-1] and value[0] in '"\'`':
+        return value[1:-1]
+    return value
+
+
+def parse_filter(
+    filter_query: str | None, df: pd.DataFrame
+) -> tuple[Condition, ...]:
+    """
+    Parses the filter query of a DataTable with custom filtering, such as
+    '{totalPrice} s> 100000 && {estate} contains FLAT', on the columns of
+    the frame.
+
+    Args:
+        filter_query (str | None): The filter query.
+        df (pd.DataFrame): The compact listings.
+
+    Returns:
+        tuple[Condition, ...]: The conditions.
+
+    Raises:
+        ValueError: If a condition is on a column that is not in the frame,
+        such as the `DETAIL_FIELDS`, or its operator or value is not
+        supported, so it is never ignored.
+    """
+
+    conditions = []
+    for part in (filter_query or '').split(' && '):
+        if not part.strip():
+            continue
+
+        match = FILTER_PART.match(part.strip())
+        if match is None or match['column'] not in df.columns:
+            raise ValueError(f'Cannot filter by "{part.strip()}".')
+
+        operator = OPERATOR_PREFIX.sub('', match['operator'])
+        operator = OPERATORS.get(operator, operator)
+        if operator not in COMPARISONS:
+            raise ValueError(f'Unsupported filter operator in "{part}".')
+
+        value = parse_value(match['value'])
+        if not isinstance(df[match['column']].dtype, pd.CategoricalDtype):
+            try:
+                value = float(value)
+            except ValueError:
+                raise ValueError(
+                    f'"{value}" is not a number in "{part.strip()}".'
+                ) from None
+
+        conditions.append(Condition(match['column'], operator, value))
+
+    return tuple(conditions)
+
+
+def parse_query(
+    sort_by: list[dict] | None, filter_query: str | None, df: pd.DataFrame
+) -> Query:
+    """
+    Builds the query of the sort order and filter of a DataTable with
+    custom sorting and filtering. Only the `SORTABLE` columns are sorted;
+    the table does not offer sorting by the others.
+    """
+
+    sort = next(
+        (item for item in sort_by or [] if item['column_id'] in SORTABLE),
+        None,
+    )
+    return Query(
+        sort=sort['column_id'] if sort else None,
+        descending=bool(sort) and sort['direction'] == 'desc',
+        conditions=parse_filter(filter_query, df),
+    )
+
+
+def category_codes(series: pd.Series, condition: Condition) -> np.ndarray:
+    """
+    Returns the codes of the categories of a column that meet a condition:
+    equal to its value, different, or containing it, ignoring case.
+    """
+
+    value = str(condition.value).lower()
+    categories = series.cat.categories.str.lower()
+    if condition.operator == 'contains':
+        matches = categories.str.contains(value, regex=False)
+    elif condition.operator == '!=':
+        matches = categories != value
+    else:
+        matches = categories == value
+
+    return np.flatnonzero(matches)
+
+
+def sort_keys(series: pd.Series) -> np.ndarray:
+    """
+    Returns the values a column is sorted by: its values, or for a
+    categorical column the alphabetical rank of each category, with the
+    missing values last.
+    """
+
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.to_numpy()
+
+    categories = series.cat.categories
+    ranks = np.empty(len(categories) + 1, dtype=np.int16)
+    ranks[np.argsort(categories.astype(str))] = np.arange(len(categories))
+    ranks[-1] = len(categories)
+    return ranks[series.array.codes]
+
+
+class ListingExplorer:
+    def __init__(self, index: ListingIndex) -> None:
+        """
+        Queries pages of the compact listings of a district, sorted and
+        filtered, keeping the sort order of each column once it is used.
+
+        Args:
+            index (ListingIndex): The index of the listings, whose area
+            order is reused.
+        """
+
+        self.df = index.df
+        self.index = index
+        self._lock = threading.Lock()
+        self._orders: dict[str | None, tuple[np.ndarray, ...]] = {}
+
+    def sorted_column(self, column: str | None) -> tuple[np.ndarray, ...]:
+        """
+        Returns the positions of the listings sorted by a column, the
+        listings with the same value in frame order, the sorted values, and
+        the values in frame order.
+        """
+
+        with self._lock:
+            if column not in self._orders:
+                size = len(self.df)
+                if column is None:
+                    positions = np.arange(size, dtype=positions_dtype(size))
+                    self._orders[column] = (positions, positions, positions)
+                else:
+                    keys = sort_keys(self.df[column])
+                    positions = (
+                        self.index.arrays[AREA]
+                        if column == AREA
+                        else np.argsort(keys, kind='stable').astype(
+                            positions_dtype(size)
+                        )
+                    )
+                    self._orders[column] = (positions, keys[positions], keys)
+            return self._orders[column]
+
+    def view(self, query: Query) -> np.ndarray:
+        positions = self.sorted_column(query.sort)[0]
+        return positions[::-1] if query.descending else positions
+
+    def start(self, query: Query, after: int | None) -> int:
+        """
+        Returns where the listings after the listing at position `after`
+        start in the sorted view of a query, with a binary search of its
+        value and position.
+        """
+
+        if after is None:
+            return 0
+
+        positions, values, keys = self.sorted_column(query.sort)
+        value = keys[after]
+        left = np.searchsorted(values, value, side='left')
+        right = np.searchsorted(values, value, side='right')
+        rank = int(left + np.searchsorted(positions[left:right], after))
+
+        return len(positions) - rank if query.descending else rank + 1
+
+    def mask(
+        self, positions: np.ndarray, conditions: tuple[Condition, ...]
+    ) -> np.ndarray:
+        keep = np.ones(len(positions), dtype=bool)
+        for condition in conditions:
+            series = self.df[condition.column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.array.codes[positions]
+                keep &= np.isin(codes, category_codes(series, condition))
+            else:
+                values = series.to_numpy()[positions]
+                keep &= COMPARISONS[condition.operator](
+                    values, condition.value
+                )
+        return keep
+
+    def page(
+        self, query: Query, size: int, after: int | None = None
+    ) -> np.ndarray:
+        """
+        Returns the positions of the listings of a page.
+
+        Args:
+            query (Query): The sort order and filters.
+            size (int): The number of listings of a page.
+            after (int | None): Optional; The position of the last listing
+            of the previous page. Defaults to the first page.
+
+        Returns:
+            np.ndarray: The positions of the listings, in order.
+        """
+
+        view = self.view(query)
+        start = self.start(query, after)
+        if not query.conditions:
+            return view[start : start + size]
+
+        found = []
+        missing = size
+        chunk = max(size, FIRST_CHUNK)
+        while start < len(view) and missing > 0:
+            candidates = view[start : start + chunk]
+            matched = candidates[self.mask(candidates, query.conditions)]
+            found.append(matched[:missing])
+            missing -= len(found[-1])
+            start += chunk
+            chunk *= 2
+
+        return np.concatenate(found) if found else view[:0]
+
+    def page_at(self, query: Query, size: int, number: int) -> np.ndarray:
+        """
+        Returns the positions of the listings of a page by its number, for
+        the pages reached without the one before them, such as the last
+        one. Without filters, it is a slice of the sorted view; with them,
+        every listing is filtered.
+        """
+
+        view = self.view(query)
+        if query.conditions:
+            view = view[self.mask(view, query.conditions)]
+        return view[number * size : (number + 1) * size]
+
+    def count(self, query: Query) -> int:
+        if not query.conditions:
+            return len(self.df)
+
+        positions = np.arange(len(self.df))
+        return int(self.mask(positions, query.conditions).sum())
+
+    def rows(self, positions: np.ndarray) -> pd.DataFrame:
+        return self.df.iloc[positions].reset_index(drop=True)
@@ -0,0 +1,236 @@
+"""
+In-memory indexes of the listings of a district, built once when the
+district is loaded, so the dashboard filters become slices of precomputed
+positions instead of masks over the whole frame.
+"""
+
+import numpy as np
+import pandas as pd
+
+AREA = 'areaInSquareMeters'
+ESTATE = 'estate'
+
+# The areas picked by the scatter plot slider marks. The first and last
+# marks stand for the smallest and largest areas of the district, set by
+# `mark_offsets`.
+AREA_MARKS = {
+    1: -np.inf,
+    2: 30,
+    3: 50,
+    4: 100,
+    5: 150,
+    6: 500,
+    7: 1000,
+    8: 10_000,
+    9: 100_000,
+    10: np.inf,
+}
+
+CATEGORY_COLUMNS = [ESTATE, 'roomsNumberNotation']
+
+# The positions of each estate type, sorted by area.
+ESTATE_AREA = 'estate_area'
+
+
+def positions_dtype(size: int) -> type:
+    return np.int32 if size < np.iinfo(np.int32).max else np.int64
+
+
+def group_positions(
+    series: pd.Series, positions: np.ndarray
+) -> tuple[np.ndarray, dict[str, list[int]]]:
+    """
+    Groups the positions of a categorical column by category with a single
+    stable sort of the category codes, keeping their order within each
+    category.
+
+    Args:
+        series (pd.Series): The categorical column.
+        positions (np.ndarray): The positions to group.
+
+    Returns:
+        tuple[np.ndarray, dict[str, list[int]]]: The grouped positions, and
+        the start and end of each category in them.
+    """
+
+    codes = series.array.codes[positions]
+    sorter = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(
+        codes[sorter], np.arange(len(series.cat.categories) + 1)
+    )
+
+    return positions[sorter], {
+        category: [int(start), int(end)]
+        for category, start, end in zip(
+            series.cat.categories, bounds[:-1], bounds[1:]
+        )
+    }
+
+
+def mark_offsets(
+    areas: np.ndarray, extremes: tuple[float, float]
+) -> dict[str, list[int]]:
+    """
+    Returns the offsets of every slider mark in sorted areas: the first
+    area not below the mark, and the first area above it.
+
+    Args:
+        areas (np.ndarray): The sorted areas.
+        extremes (tuple[float, float]): The smallest and largest areas of
+        the district, the areas of the first and last marks, so both
+        handles on one of them select the listings with that area.
+
+    Returns:
+        dict[str, list[int]]: The lower and upper offset of each mark.
+    """
+
+    marks = np.array(list(AREA_MARKS.values()), dtype='float64')
+    marks[[0, -1]] = extremes
+    return {
+        'lower': np.searchsorted(areas, marks, side='left').tolist(),
+        'upper': np.searchsorted(areas, marks, side='right').tolist(),
+    }
+
+
+class AreaIndex:
+    def __init__(
+        self, positions: np.ndarray, offsets: dict[str, list[int]]
+    ) -> None:
+        """
+        The positions of some listings sorted by area, with the offsets of
+        every slider mark, so an area range is a slice of the positions.
+
+        Args:
+            positions (np.ndarray): The positions of the listings in the
+            frame, sorted by area.
+            offsets (dict[str, list[int]]): The offsets of the slider marks,
+            as returned by `mark_offsets`.
+        """
+
+        self.positions = positions
+        self.lower = dict(zip(AREA_MARKS, offsets['lower']))
+        self.upper = dict(zip(AREA_MARKS, offsets['upper']))
+
+    def between(self, low_mark: int, high_mark: int) -> np.ndarray:
+        return self.positions[self.lower[low_mark] : self.upper[high_mark]]
+
+
+class ListingIndex:
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        arrays: dict[str, np.ndarray] | None = None,
+        offsets: dict | None = None,
+    ) -> None:
+        """
+        Indexes the listings of a district: their positions sorted by area,
+        for all of them and for each estate type, and their positions for
+        each value of the categorical columns.
+
+        The index is kept as a few position arrays, as long as the frame,
+        and their offsets, so it can be stored with the frame and read back
+        without being rebuilt.
+
+        Args:
+            df (pd.DataFrame): The compact listings of the district.
+            arrays (dict[str, np.ndarray] | None): Optional; The position
+            arrays of an index built before. Defaults to building them.
+            offsets (dict | None): Optional; The offsets of those arrays.
+        """
+
+        self.df = df
+        if arrays is None or offsets is None:
+            arrays, offsets = self.build(df)
+        self.arrays = arrays
+        self.offsets = offsets
+
+        self.categories = {
+            column: {
+                value: arrays[column][start:end]
+                for value, (start, end) in spans.items()
+            }
+            for column, spans in offsets['categories'].items()
+        }
+
+        self.areas: dict[str | None, AreaIndex] = {
+            None: AreaIndex(arrays[AREA], offsets[AREA])
+        }
+        for estate, estate_offsets in offsets[ESTATE].items():
+            start, end = estate_offsets['bounds']
+            self.areas[estate] = AreaIndex(
+                arrays[ESTATE_AREA][start:end], estate_offsets
+            )
+
+    @staticmethod
+    def build(df: pd.DataFrame) -> tuple[dict[str, np.ndarray], dict]:
+        dtype = positions_dtype(len(df))
+        areas = df[AREA].to_numpy(dtype='float64')
+        order = np.argsort(areas, kind='stable').astype(dtype)
+
+        sorted_areas = areas[order]
+        known = sorted_areas[~np.isnan(sorted_areas)]
+        extremes = (known[0], known[-1]) if len(known) else (-np.inf, np.inf)
+
+        arrays = {AREA: order}
+        offsets: dict = {
+            'categories': {},
+            AREA: mark_offsets(sorted_areas, extremes),
+        }
+
+        for column in CATEGORY_COLUMNS:
+            if column in df.columns:
+                arrays[column], offsets['categories'][column] = (
+                    group_positions(
+                        df[column], np.arange(len(df), dtype=dtype)
+                    )
+                )
+
+        # Grouped from the area order with a stable sort, so the positions
+        # of each estate type stay sorted by area.
+        arrays[ESTATE_AREA], spans = group_positions(df[ESTATE], order)
+        offsets[ESTATE] = {
+            estate: {
+                'bounds': [start, end],
+                **mark_offsets(
+                    areas[arrays[ESTATE_AREA][start:end]], extremes
+                ),
+            }
+            for estate, (start, end) in spans.items()
+        }
+
+        return arrays, offsets
+
+    def values(self, column: str) -> list:
+        """
+        The values of a categorical column that have listings.
+        """
+
+        return [
+            value
+            for value, positions in self.categories[column].items()
+            if len(positions)
+        ]
+
+    def positions(self, column: str, value) -> np.ndarray:
+        return self.categories[column].get(value, np.array([], dtype=int))
+
+    def area_range(
+        self, estate: str | None, low_mark: int, high_mark: int
+    ) -> pd.DataFrame:
+        """
+        Selects the listings of an estate type within the areas of two
+        slider marks.
+
+        Args:
+            estate (str | None): The estate type, or None for all of them.
+            low_mark (int): The slider mark of the smallest area.
+            high_mark (int): The slider mark of the largest area.
+
+        Returns:
+            pd.DataFrame: The listings, sorted by area.
+        """
+
+        if estate not in self.areas:
+            return self.df.iloc[:0]
+
+        return self.df.take(self.areas[estate].between(low_mark, high_mark))
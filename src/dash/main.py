@@ -1,22 +1,10 @@
-import dash_bootstrap_components as dbc
+from src.dash.components.app import create_app
+from src.dash.data import provider
 
-from src.dash.components.app import app
-from src.dash.components.body.body import Body
-from src.dash.components.head.head import Head
-
-head = Head()
-body = Body()
-
-app.layout = dbc.Container(
-    [head.component, body.component],
-    fluid=True,
-    style={
-        'width': '100%',
-        'padding': '15px 25px 25px 25px',
-        'background-color': '#191c24',
-    },
-)
+app = create_app()
+server = app.server
 
 
 if __name__ == '__main__':
+    provider.get().start_refresher()
     app.run_server(debug=True,  host='0.0.0.0', port=8051)
@@ -0,0 +1,216 @@
+"""
+Pre-serialized and compressed responses of the dashboard server.
+
+The layout and the callbacks of the components that only change with the
+data (the heatmap, the municipality table, the headline cards and the
+stores of the clientside filters) are serialized once per data version and
+kept in `response_cache`, along with their gzip and brotli encodings.
+Every other response is compressed as it is sent.
+"""
+
+import gzip
+from dataclasses import dataclass, field
+from functools import wraps
+from http import HTTPStatus
+from typing import Callable
+
+from dash import Dash
+from flask import Response, make_response, request
+
+from src.core.settings import settings
+from src.dash.cache import response_cache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+LAYOUT_ROUTE = '_dash-layout'
+CALLBACK_ROUTE = '_dash-update-component'
+
+# The callback outputs that only change with the data version.
+STATIC_OUTPUTS = {
+    'heatmap-figure.figure',
+    'table-mask.data',
+    'headline-cards.children',
+    'scatter-store.data',
+    'treemap-store.data',
+}
+
+COMPRESSED_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/javascript',
+}
+
+# Cached responses are compressed once, so at the highest level, and the
+# others on every request, at a level that keeps them fast.
+CACHED_LEVELS = {'br': 11, 'gzip': 9}
+DYNAMIC_LEVELS = {'br': 4, 'gzip': 6}
+
+
+def encodings() -> list[str]:
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=level)
+
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def compressible(response: Response) -> bool:
+    if (
+        response.direct_passthrough
+        or response.status_code != HTTPStatus.OK
+        or 'Content-Encoding' in response.headers
+    ):
+        return False
+
+    return (
+        response.mimetype in COMPRESSED_MIMETYPES
+        and response.content_length is not None
+        and response.content_length >= settings.DASH_COMPRESS_MIN_SIZE
+    )
+
+
+def accepted_encoding(response: Response) -> str | None:
+    """
+    Returns the encoding to compress a response with, from the ones the
+    client accepts, or None if it should be sent as it is.
+    """
+
+    if not settings.DASH_COMPRESS or not compressible(response):
+        return None
+
+    return request.accept_encodings.best_match(encodings())
+
+
+@dataclass
+class CachedResponse:
+    """
+    A serialized response and its encodings, built once.
+
+    Attributes:
+        body (bytes): The serialized response.
+        mimetype (str): Its mimetype.
+        encoded (dict[str, bytes]): The compressed body, by encoding.
+    """
+
+    body: bytes
+    mimetype: str
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+    def encode(self, encoding: str) -> bytes:
+        if encoding not in self.encoded:
+            self.encoded[encoding] = compress(
+                self.body, encoding, CACHED_LEVELS[encoding]
+            )
+        return self.encoded[encoding]
+
+    def sizes(self) -> dict[str, int]:
+        return {'raw': len(self.body)} | {
+            encoding: len(body) for encoding, body in self.encoded.items()
+        }
+
+
+def cache_key(route: str) -> tuple | None:
+    """
+    Returns the key of a cacheable request: the layout, or a callback of a
+    static output with its inputs, as sent in the request body.
+    """
+
+    if route == LAYOUT_ROUTE:
+        return (route,)
+
+    payload = request.get_json(silent=True) or {}
+    if payload.get('output') in STATIC_OUTPUTS:
+        return (route, request.get_data())
+
+    return None
+
+
+def serialize(route: str, view: Callable, **kwargs) -> CachedResponse:
+    """
+    Runs a Dash view and keeps its serialized response, compressed with
+    every encoding.
+    """
+
+    response = make_response(view(**kwargs))
+    cached = CachedResponse(
+        body=response.get_data(), mimetype=response.mimetype
+    )
+    for encoding in encodings():
+        cached.encode(encoding)
+
+    if route == LAYOUT_ROUTE:
+        sizes = ', '.join(
+            f'{encoding} {size / 1024:.1f} KiB'
+            for encoding, size in cached.sizes().items()
+        )
+        print(
+            f'Layout of the data version "{response_cache.version}" '
+            f'serialized: {sizes}.'
+        )
+
+    return cached
+
+
+def cached_view(route: str, view: Callable) -> Callable:
+    """
+    Serves a Dash route from `response_cache` when its request is
+    cacheable, with the encoding accepted by the client.
+    """
+
+    @wraps(view)
+    def wrapper(**kwargs):
+        key = cache_key(route)
+        if key is None:
+            return view(**kwargs)
+
+        cached = response_cache.get_or_build(
+            key, lambda: serialize(route, view, **kwargs)
+        )
+        response = Response(cached.body, mimetype=cached.mimetype)
+        response.vary.add('Accept-Encoding')
+
+        encoding = accepted_encoding(response)
+        if encoding is not None:
+            response.set_data(cached.encode(encoding))
+            response.headers['Content-Encoding'] = encoding
+
+        return response
+
+    return wrapper
+
+
+def compress_response(response: Response) -> Response:
+    encoding = accepted_encoding(response)
+    if encoding is None:
+        return response
+
+    response.set_data(
+        compress(response.get_data(), encoding, DYNAMIC_LEVELS[encoding])
+    )
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def install_responses(app: Dash) -> None:
+    """
+    Serves the layout and the static callbacks of a Dash app from the
+    response cache, and compresses the responses of its server.
+    """
+
+    prefix = app.config.routes_pathname_prefix
+    for route in [LAYOUT_ROUTE, CALLBACK_ROUTE]:
+        endpoint = f'{prefix}{route}'
+        app.server.view_functions[endpoint] = cached_view(
+            route, app.server.view_functions[endpoint]
+        )
+
+    app.server.after_request(compress_response)
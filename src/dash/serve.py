@@ -0,0 +1,28 @@
+"""
+Gunicorn settings to serve the dashboard with several worker processes:
+
+    gunicorn -c python:src.dash.serve src.dash.main:server
+
+Before the workers start, the master writes the shared frame of every
+district of the newest snapshot. Each worker then memory-maps those files,
+so adding a worker adds throughput without another copy of the listings.
+"""
+
+from src.core.settings import settings
+from src.dash.data import preload_districts, provider
+from src.dash.shared import format_memory, process_memory
+
+bind = settings.DASH_BIND
+workers = settings.DASH_WORKERS
+threads = 1
+timeout = 60
+
+
+def on_starting(server) -> None:
+    preload_districts()
+
+
+def post_worker_init(worker) -> None:
+    data = provider.get()
+    data.start_refresher()
+    print(f'Worker {worker.pid} memory: {format_memory(process_memory())}.')
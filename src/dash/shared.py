@@ -0,0 +1,161 @@
+"""
+Shares the compact listings of the dashboard between worker processes.
+
+The compact frame of a district and the position arrays of its index are
+written once, next to the district partition of the snapshot, as a single
+Arrow file. Every worker memory-maps that file and wraps its columns in
+pandas without copying them, so the listings are held once in the page
+cache, however many workers serve them.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.core.profiling import peak_rss_bytes
+from src.core.snapshot import read_table, write_table
+from src.dash.index import ListingIndex
+
+# Bumped when the columns of the compact frame or its index change, so the
+# frames written next to existing snapshots by the previous version are not
+# mapped.
+FRAME_VERSION = 3
+SHARED_FILE = f'frame.v{FRAME_VERSION}.arrow'
+INDEX_PREFIX = 'index.'
+
+# The fields of /proc/self/smaps_rollup reported for each worker.
+MEMORY_FIELDS = {
+    'Rss': 'rss',
+    'Pss': 'pss',
+    'Shared_Clean': 'shared',
+    'Shared_Dirty': 'shared',
+    'Private_Clean': 'private',
+    'Private_Dirty': 'private',
+}
+
+
+def to_shared_table(index: ListingIndex) -> pa.Table:
+    """
+    Builds the Arrow table of a compact frame and its index: the numeric
+    columns as they are, the categorical columns as their codes, and the
+    index arrays as extra columns, with the categories and the index
+    offsets kept in the schema metadata.
+    """
+
+    columns = {}
+    categories = {}
+    for column in index.df.columns:
+        series = index.df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            columns[column] = pa.array(series.array.codes)
+            categories[column] = series.cat.categories.tolist()
+        else:
+            columns[column] = pa.array(series.to_numpy())
+
+    for name, positions in index.arrays.items():
+        columns[f'{INDEX_PREFIX}{name}'] = pa.array(positions)
+
+    return pa.table(
+        columns,
+        metadata={
+            'categories': json.dumps(categories),
+            'index': json.dumps(index.offsets),
+        },
+    )
+
+
+def write_frame(index: ListingIndex, file_path: Path) -> None:
+    """
+    Writes a compact frame and its index to `file_path`, unless another
+    process already did. The file is written aside and linked into place,
+    so a reader never sees it half written and every worker maps the same
+    file.
+    """
+
+    temp_path = file_path.with_name(f'.{file_path.name}.{os.getpid()}')
+    write_table(to_shared_table(index), temp_path)
+    try:
+        os.link(temp_path, file_path)
+    except FileExistsError:
+        pass
+    finally:
+        temp_path.unlink()
+
+
+def column_values(table: pa.Table, name: str) -> np.ndarray:
+    chunks = table.column(name).chunks
+    if len(chunks) == 1:
+        return chunks[0].to_numpy(zero_copy_only=True)
+
+    return table.column(name).to_numpy()
+
+
+def read_frame(file_path: Path) -> ListingIndex:
+    """
+    Memory-maps a compact frame and its index written by `write_frame`.
+    The columns, and the codes of the categorical columns, are read-only
+    views of the mapped file. `Series.cat.codes` returns a copy of the
+    codes, so they are read with `Series.array.codes` instead.
+
+    Args:
+        file_path (Path): The shared file.
+
+    Returns:
+        ListingIndex: The index, with the frame as its `df`.
+    """
+
+    table = read_table(file_path)
+    metadata = table.schema.metadata
+    categories = json.loads(metadata[b'categories'])
+
+    columns = {}
+    arrays = {}
+    for name in table.column_names:
+        values = column_values(table, name)
+        if name.startswith(INDEX_PREFIX):
+            arrays[name.removeprefix(INDEX_PREFIX)] = values
+        elif name in categories:
+            columns[name] = pd.Categorical.from_codes(
+                values,
+                dtype=pd.CategoricalDtype(categories[name]),
+                validate=False,
+            )
+        else:
+            columns[name] = values
+
+    return ListingIndex(
+        df=pd.DataFrame(columns, copy=False),
+        arrays=arrays,
+        offsets=json.loads(metadata[b'index']),
+    )
+
+
+def process_memory(pid: int | str = 'self') -> dict[str, int]:
+    """
+    Returns the memory of a process in bytes, the current one by default:
+    its resident set, its proportional share of the pages it shares with
+    other processes (PSS), and its shared and private pages. Only the peak
+    resident set of the current process is known outside Linux.
+    """
+
+    rollup = Path(f'/proc/{pid}/smaps_rollup')
+    if not rollup.exists():
+        return {'peak_rss': peak_rss_bytes() or 0} if pid == 'self' else {}
+
+    memory = dict.fromkeys(MEMORY_FIELDS.values(), 0)
+    for line in rollup.read_text(encoding='utf-8').splitlines():
+        field, _, value = line.partition(':')
+        if field in MEMORY_FIELDS:
+            memory[MEMORY_FIELDS[field]] += int(value.split()[0]) * 1024
+
+    return memory
+
+
+def format_memory(memory: dict[str, int]) -> str:
+    return ', '.join(
+        f'{name} {value / 1024**2:.1f} MiB' for name, value in memory.items()
+    )
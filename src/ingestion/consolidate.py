@@ -1,4 +1,10 @@
+from datetime import datetime, timezone
+
+from src.core.bulk_writer import BulkWriteResult
 from src.core.mongodb import MongoConnection
+from src.core.profiling import profiler
+from src.core.settings import settings
+from src.ingestion.known_ids import KnownIdIndex
 
 
 class Consolidate:
@@ -9,7 +15,11 @@ class Consolidate:
     ) -> None:
         """
         Initializes the Consolidate class with MongoDB connections and loads
-        data from the raw and consolidated collections.
+        data from the raw and consolidated collections. Only the `id` and
+        `is_available` fields are read from the consolidated collection,
+        since nothing else is needed to compare it with the raw data. Once
+        the known-id index has been filled, only the available ads are read
+        from it, since the new ads are found in the index instead.
 
         Parameters:
         ----------
@@ -27,13 +37,19 @@ class Consolidate:
         self.raw_filtered: list[dict] = []
         self.to_update_availability: list[str] = []
         self.ads_to_insert: list[dict] = []
+        self.insert_result = BulkWriteResult()
+        self.known_ids = KnownIdIndex() if settings.LOCAL_BACKUP_PATH else None
 
-        self.raw_data = self.mongo.get_data_from_collection(
-            collection=self.raw_collection
-        )
-        self.consolidated_data = self.mongo.get_data_from_collection(
-            collection=self.consolidated_collection
-        )
+        with profiler.stage('read') as stage:
+            self.raw_data = self.mongo.get_data_from_collection(
+                collection=self.raw_collection
+            )
+            self.consolidated_data = self.mongo.get_data_from_collection(
+                collection=self.consolidated_collection,
+                filter=({'is_available': True} if self.known_ids else None),
+                fields=['id', 'is_available'],
+            )
+            stage.records += len(self.raw_data) + len(self.consolidated_data)
 
     def consolidate(self) -> None:
         """
@@ -42,12 +58,15 @@ class Consolidate:
         collection.
         """
 
-        self.filtered_data: list[dict] = (
-            self.filter_unique_and_add_availability(self.raw_data)
-        )
+        with profiler.stage('diff') as stage:
+            self.filtered_data: list[dict] = (
+                self.filter_unique_and_add_availability(self.raw_data)
+            )
+            stage.records += len(self.raw_data)
 
         self.update_availability()
         self.insert_new_ads()
+        self.update_known_ids()
 
     def update_availability(self) -> None:
         """
@@ -56,32 +75,76 @@ class Consolidate:
         which ads' availability needs to be updated.
         """
 
-        ids_to_update = self.ads_to_update_availability(
-            consolidated_data=self.consolidated_data,
-            filtered_data=self.filtered_data,
-        )
+        with profiler.stage('diff') as stage:
+            ids_to_update = self.ads_to_update_availability(
+                consolidated_data=self.consolidated_data,
+                filtered_data=self.filtered_data,
+            )
+            stage.records += len(self.consolidated_data)
 
-        self.mongo.update_is_available(
-            collection=self.consolidated_collection,
-            unique_index='id',
-            ids=ids_to_update,
-        )
+        with profiler.stage('update') as stage:
+            self.mongo.update_is_available(
+                collection=self.consolidated_collection,
+                unique_index='id',
+                ids=ids_to_update,
+            )
+            stage.records += len(ids_to_update)
 
     def insert_new_ads(self) -> None:
         """
         Inserts new ads that are not present in the consolidated collection.
-        Compares the consolidated data with filtered data and saves
-        new entries into the collection.
+        Compares the consolidated data and the known-id index with filtered
+        data and saves new entries into the collection, stamped with the
+        `updated_at` time so incremental pipelines pick them up.
         """
 
-        new_ads = self.new_ads_to_insert(
-            consolidated_data=self.consolidated_data,
-            filtered_data=self.filtered_data,
-        )
+        with profiler.stage('diff') as stage:
+            new_ads = self.new_ads_to_insert(
+                consolidated_data=self.consolidated_data,
+                filtered_data=self.filtered_data,
+                known_ids=self.known_ids,
+            )
+            stage.records += len(self.filtered_data)
 
-        self.mongo.save_data(
-            collection=self.consolidated_collection, data=new_ads
-        )
+        updated_at = datetime.now(timezone.utc)
+        for ad in new_ads:
+            ad['updated_at'] = updated_at
+
+        with profiler.stage('save') as stage:
+            self.insert_result = self.mongo.save_data(
+                collection=self.consolidated_collection, data=new_ads
+            )
+            stage.records += len(new_ads)
+        self.ads_to_insert = new_ads
+
+    def update_known_ids(self) -> None:
+        """
+        Adds the ids of the newly inserted ads to the known-id index stored
+        in `LOCAL_BACKUP_PATH`, leaving out the ads the write reported as
+        failed. If the index is still empty, it is first filled with the ids
+        already in the consolidated collection.
+        """
+
+        if self.known_ids is None:
+            print(
+                'The known-id index was not updated because '
+                'LOCAL_BACKUP_PATH is not set.'
+            )
+            return
+
+        index = self.known_ids
+        failed_ids = set(self.insert_result.failed_ids)
+
+        ids = [
+            item.get('id')
+            for item in self.ads_to_insert
+            if item.get('id') not in failed_ids
+        ]
+        if not len(index):
+            ids.extend(item.get('id') for item in self.consolidated_data)
+
+        added = index.add(ad_id for ad_id in ids if ad_id is not None)
+        print(f'Added {added} ids to the known-id index in "{index.path}".')
 
     @staticmethod
     def ads_to_update_availability(
@@ -103,7 +166,7 @@ class Consolidate:
             A list of ad IDs whose availability status needs to be updated.
         """
 
-        filtered_ids = [item.get('id') for item in filtered_data]
+        filtered_ids = {item.get('id') for item in filtered_data}
 
         ids_to_update: list[str] = [
             item.get('id')
@@ -118,7 +181,9 @@ class Consolidate:
 
     @staticmethod
     def new_ads_to_insert(
-        consolidated_data: list[dict], filtered_data: list[dict]
+        consolidated_data: list[dict],
+        filtered_data: list[dict],
+        known_ids: KnownIdIndex | None = None,
     ) -> list[dict]:
         """
         Identifies new ads that need to be inserted into the consolidated
@@ -130,13 +195,17 @@ class Consolidate:
             The list of ads from the consolidated collection.
         filtered_data : list[dict]
             The filtered list of ads from the raw data.
+        known_ids : KnownIdIndex | None, optional
+            The index of the ids already consolidated. When it is not empty,
+            the ads it knows are left out too, so `consolidated_data` only
+            needs the available ads (default is None).
 
         Returns:
         -------
         list[dict]
             A list of new ads to be inserted into the consolidated collection.
         """
-        consolidated_ids = [item.get('id') for item in consolidated_data]
+        consolidated_ids = {item.get('id') for item in consolidated_data}
 
         ads_to_insert: list = [
             item
@@ -144,6 +213,14 @@ class Consolidate:
             if item.get('id') not in consolidated_ids
         ]
 
+        if known_ids:
+            unknown_ids = set(
+                known_ids.unknown(item.get('id') for item in ads_to_insert)
+            )
+            ads_to_insert = [
+                item for item in ads_to_insert if item.get('id') in unknown_ids
+            ]
+
         return ads_to_insert
 
     @staticmethod
@@ -176,6 +253,15 @@ class Consolidate:
 
 
 if __name__ == '__main__':
-    consolidate = Consolidate(raw_collection='raw_imovirtual')
+    from src.core.monitoring import mongo_stats
+
+    with profiler.stage('consolidate'):
+        consolidate = Consolidate(raw_collection='raw_imovirtual')
+
+        consolidate.consolidate()
+
+    print(mongo_stats.summary())
+    mongo_stats.dump(settings.METRICS_PATH)
 
-    consolidate.consolidate()
+    print(profiler.summary())
+    profiler.dump(settings.METRICS_PATH)
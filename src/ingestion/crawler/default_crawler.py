@@ -4,6 +4,7 @@ from datetime import datetime
 from pathlib import Path
 
 from src.core.mongodb import MongoConnection
+from src.core.profiling import profiler
 from src.core.s3_client import S3Client
 from src.core.settings import Settings
 
@@ -35,6 +36,7 @@ class AbstractCrawler(ABC):
 
         day_extracted = datetime.now().strftime('%d_%m_%Y')
         self.file_name = f'raw_{self.site_name}_{day_extracted}'
+        self.crawl_run_id = datetime.now().strftime('%Y%m%d%H%M%S')
 
     @abstractmethod
     def crawl(self):
@@ -105,8 +107,12 @@ class AbstractCrawler(ABC):
         path_to_save = f'{self.output_path}/{self.file_name}.json'
 
         try:
-            with open(path_to_save, 'w', encoding='utf-8') as json_file:
+            with (
+                profiler.stage('save') as stage,
+                open(path_to_save, 'w', encoding='utf-8') as json_file,
+            ):
                 json.dump(self.data, json_file, indent=4)
+                stage.records += len(self.data)
             print(
                 f'Json file saved in "{self.output_path}"'
                 f' as "{self.file_name}".'
@@ -114,24 +120,6 @@ class AbstractCrawler(ABC):
         except Exception as e:
             print('Error exporting the file:', str(e))
 
-    def save_json_to_mongodb(self) -> None:
-        """
-        Save the crawled data to MongoDB.
-
-        The data is saved in a collection named with the site name
-        and a 'raw_' prefix.
-
-        Raises:
-            Exception: If there is an error while saving the data to MongoDB.
-        """
-
-        collection_name = f'raw_{self.site_name}'
-
-        try:
-            self.mongo.save_data(data=self.data, collection=collection_name)
-        except Exception:
-            raise ('It was not possible to save the data in MongoDB')
-
     def save_json_to_s3(self):
         """
         Uploads the crawled data to the AWS S3 bucket specified in the .env
@@ -141,4 +129,8 @@ class AbstractCrawler(ABC):
             Exception: Any exceptions related to connection issues with AWS S3.
         """
 
-        self.s3_client.upload_file(data=self.data, file_name=self.file_name)
+        with profiler.stage('save') as stage:
+            self.s3_client.upload_file(
+                data=self.data, file_name=self.file_name
+            )
+            stage.records += len(self.data)
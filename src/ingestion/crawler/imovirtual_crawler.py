@@ -32,6 +32,7 @@ Json response guide:
 """
 
 import asyncio
+import contextlib
 import itertools
 import json
 from http import HTTPStatus
@@ -41,6 +42,8 @@ from bs4 import BeautifulSoup
 from httpx import AsyncClient, AsyncHTTPTransport
 from requests.models import Response
 
+from src.core.async_mongodb import AsyncMongoConnection
+from src.core.profiling import profiler
 from src.ingestion.crawler.default_crawler import AbstractCrawler
 
 
@@ -98,8 +101,7 @@ class ImovirtualCrawler(AbstractCrawler):
                 self.url = f'{self.url}/{sub_location}'
 
             total_pages = self.get_number_of_pages()
-            responses = asyncio.run(self.fetch_all(total_pages=total_pages))
-            list_ads = self.extract_ads(responses=responses)
+            list_ads = asyncio.run(self.fetch_all(total_pages=total_pages))
 
             print(f'Ads extracted: {len(list_ads)}')
 
@@ -110,9 +112,6 @@ class ImovirtualCrawler(AbstractCrawler):
         if self.local_storage:
             self.save_json_locally()
 
-        if self.mongo_storage:
-            self.save_json_to_mongodb()
-
         if self.aws_s3_storage:
             self.save_json_to_s3()
 
@@ -129,9 +128,11 @@ class ImovirtualCrawler(AbstractCrawler):
             SystemExit: If the HTTP response status code is not 200 (OK).
         """
 
-        response = requests.get(
-            self.url, params=self.params, headers=self.headers
-        )
+        with profiler.stage('fetch') as stage:
+            response = requests.get(
+                self.url, params=self.params, headers=self.headers
+            )
+            stage.records += 1
         if response.status_code != HTTPStatus.OK:
             raise SystemExit(
                 f'Error: Received status code != 200 ({response.status_code})'
@@ -160,18 +161,22 @@ class ImovirtualCrawler(AbstractCrawler):
 
         return total_pages
 
-    async def fetch_all(self, total_pages: int) -> list[Response]:
+    async def fetch_all(self, total_pages: int) -> list[dict]:
         """
-        Asynchronously fetch all pages for the URL query combination.
+        Asynchronously fetch all pages for the URL query combination and
+        extract their ads.
 
         Args:
             total_pages (int): The total number of pages to fetch.
 
         Returns:
-            list[Response]: A list of HTTP responses for each page.
+            list[dict]: The ads extracted from all the pages.
 
-        This method creates asynchronous HTTP requests for all pages
-        and returns the list of responses.
+        Ads are extracted from each page as soon as its response arrives.
+        When MongoDB storage is enabled, the ads of each page are saved to
+        the raw collection from inside the event loop, so the writes run
+        while the remaining pages are still being fetched. Otherwise, no
+        MongoDB connection is opened.
         """
 
         print('Starting async requests...')
@@ -179,19 +184,76 @@ class ImovirtualCrawler(AbstractCrawler):
         params_list = [
             {'limit': 72, 'page': page} for page in range(1, total_pages + 1)
         ]
+        collection_name = f'raw_{self.site_name}'
+
+        all_ads: list = []
+        save_tasks: list[asyncio.Task] = []
 
         transport = AsyncHTTPTransport(retries=3)
-        async with AsyncClient(
-            follow_redirects=True, timeout=15, transport=transport
-        ) as client:
+        async with (
+            AsyncClient(
+                follow_redirects=True, timeout=15, transport=transport
+            ) as client,
+            (
+                AsyncMongoConnection()
+                if self.mongo_storage
+                else contextlib.nullcontext()
+            ) as mongo,
+        ):
             tasks = [
                 client.get(url=self.url, params=params, headers=self.headers)
                 for params in params_list
             ]
-            responses = await asyncio.gather(*tasks)
+
+            for next_response in asyncio.as_completed(tasks):
+                with profiler.stage('fetch') as stage:
+                    response = await next_response
+                    stage.records += 1
+
+                with profiler.stage('parse') as stage:
+                    page_ads = self.extract_ads(responses=[response])
+                    stage.records += len(page_ads)
+                all_ads.extend(page_ads)
+
+                if mongo is not None and page_ads:
+                    # Copies, since inserting adds an ObjectId `_id` that
+                    # the local JSON backup can not serialize.
+                    mongo_ads = [
+                        {**ad, 'crawl_run_id': self.crawl_run_id}
+                        for ad in page_ads
+                    ]
+                    save_tasks.append(
+                        asyncio.create_task(
+                            self.save_page(
+                                mongo=mongo,
+                                collection=collection_name,
+                                data=mongo_ads,
+                            )
+                        )
+                    )
+
+            await asyncio.gather(*save_tasks)
 
         print('All requests have been completed!')
-        return responses
+        return all_ads
+
+    @staticmethod
+    async def save_page(
+        mongo: AsyncMongoConnection, collection: str, data: list[dict]
+    ) -> None:
+        """
+        Saves the ads of a page to the raw collection, recorded as a run of
+        the 'save' stage. The saves of several pages run concurrently.
+
+        Args:
+            mongo (AsyncMongoConnection): An open async MongoDB connection.
+            collection (str): The name of the raw collection.
+            data (list[dict]): The ads of the page.
+        """
+
+        with profiler.stage('save') as stage:
+            await mongo.save_data(collection=collection, data=data)
+            stage.records += len(data)
 
     @staticmethod
     def extract_ads(responses: list[Response]) -> list[dict]:
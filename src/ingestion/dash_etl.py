@@ -1,6 +1,24 @@
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Iterator
+
 import pandas as pd
 
+from src.core.aggregates import compute_aggregates
+from src.core.columnar import read_dataframe
 from src.core.mongodb import MongoConnection
+from src.core.profiling import profiler
+from src.core.settings import settings
+from src.core.snapshot import (
+    LISTINGS,
+    SNAPSHOT_SCHEMA,
+    latest_snapshot,
+    write_snapshot,
+)
 
 FIELDS = [
     'id',
@@ -13,9 +31,43 @@ FIELDS = [
     'pricePerSquareMeter.value',
     'areaInSquareMeters',
     'roomsNumber',
+    'is_available',
+    'updated_at',
 ]
 
 UNIQUE_INDEX = 'id'
+WATERMARK_FIELD = 'updated_at'
+# Bumped when the transformation changes, so the watermark saved by the
+# previous version is not used and the next run reloads every document.
+TRANSFORM_VERSION = 3
+# Location ids are paths such as 'lisboa/alvalade', whose first part is the
+# district.
+DISTRICT_SEPARATOR = '/'
+# Numeric columns are always stored as floats, so their type does not
+# depend on whether a batch happened to contain missing values.
+FLOAT_COLUMNS = ['totalPrice', 'pricePerSquareMeter', 'areaInSquareMeters']
+LOCATIONS_FIELD = 'location.reverseGeocoding.locations'
+LOCATION_ID_FIELD = f'{LOCATIONS_FIELD}.1.id'
+
+# Fields copied as they are by the aggregation projection, and the ones it
+# flattens from nested documents.
+PROJECTED_FIELDS = [
+    'id',
+    'title',
+    'estate',
+    'transaction',
+    'areaInSquareMeters',
+    'roomsNumber',
+    'is_available',
+]
+FLATTENED_FIELDS = {
+    'pricePerSquareMeter': '$pricePerSquareMeter.value',
+    'totalPrice': '$totalPrice.value',
+    'city': '$location.address.city.name',
+}
+# The columns every loaded document has; documents missing any of them are
+# dropped.
+REQUIRED_COLUMNS = ['location', *PROJECTED_FIELDS, *FLATTENED_FIELDS]
 
 VALUES_TO_MAP = {
     'ONE': 'T0',
@@ -32,11 +84,144 @@ VALUES_TO_MAP = {
 }
 
 
+@dataclass(frozen=True)
+class PartitionJob:
+    """
+    The work of transforming one district of the consolidated collection,
+    sent as it is to a worker process.
+
+    Attributes:
+        district (str): The district, e.g. 'lisboa'.
+        extract_from (str): The collection to extract data from.
+        load_to (str): The collection to load the transformed data into.
+        batch_size (int | None): The number of documents per batch.
+        since (datetime | None): Only the documents changed after this
+        watermark are processed.
+    """
+
+    district: str
+    extract_from: str
+    load_to: str
+    batch_size: int | None = None
+    since: datetime | None = None
+
+
+def watermark_key(load_to: str) -> str:
+    return f'{load_to}:v{TRANSFORM_VERSION}'
+
+
+def district_filter(district: str, since: datetime | None = None) -> dict:
+    """
+    Builds the query filter of the consolidated documents of a district,
+    matched by the prefix of their location id, optionally changed after
+    the `since` watermark.
+    """
+
+    filter = {
+        LOCATION_ID_FIELD: {
+            '$regex': f'^{re.escape(district + DISTRICT_SEPARATOR)}'
+        }
+    }
+    if since:
+        filter[WATERMARK_FIELD] = {'$gt': since}
+
+    return filter
+
+
+def district_pipeline(since: datetime | None = None) -> list[dict]:
+    """
+    Builds the aggregation pipeline that lists the districts of the
+    consolidated collection, taken from the first part of the location id,
+    with their number of ads, largest first.
+
+    Parameters:
+    ----------
+    since : datetime | None, optional
+        Only count documents whose `updated_at` is later than this
+        watermark (default is None, which counts every document).
+
+    Returns:
+    -------
+    list[dict]
+        The aggregation stages.
+    """
+
+    match = {LOCATION_ID_FIELD: {'$regex': DISTRICT_SEPARATOR}}
+    if since:
+        match[WATERMARK_FIELD] = {'$gt': since}
+
+    return [
+        {'$match': match},
+        {
+            '$project': {
+                'location': {'$arrayElemAt': [f'${LOCATIONS_FIELD}', 1]}
+            }
+        },
+        {
+            '$group': {
+                '_id': {
+                    '$arrayElemAt': [
+                        {'$split': ['$location.id', DISTRICT_SEPARATOR]},
+                        0,
+                    ]
+                },
+                'ads': {'$sum': 1},
+            }
+        },
+        {'$sort': {'ads': -1, '_id': 1}},
+    ]
+
+
+def extract_districts(
+    mongo_conn: MongoConnection,
+    collection_name: str,
+    since: datetime | None = None,
+) -> list[str]:
+    """
+    Lists the districts with documents to process, largest first.
+
+    Parameters:
+    ----------
+    mongo_conn : MongoConnection
+        An active MongoDB connection.
+    collection_name : str
+        The name of the MongoDB collection to extract data from.
+    since : datetime | None, optional
+        Only consider documents whose `updated_at` is later than this
+        watermark (default is None, which considers every document).
+
+    Returns:
+    -------
+    list[str]
+        The districts.
+
+    Raises:
+    -------
+    SystemExit
+        If the MongoDB connection cannot be established.
+    """
+
+    if not mongo_conn.ping():
+        raise SystemExit()
+
+    return [
+        group['_id']
+        for batch in mongo_conn.aggregate_batches(
+            collection=collection_name, pipeline=district_pipeline(since)
+        )
+        for group in batch
+    ]
+
+
 def extract_data(
-    mongo_conn: MongoConnection, collection_name: str
-) -> list[dict]:
+    mongo_conn: MongoConnection,
+    collection_name: str,
+    batch_size: int | None = None,
+    since: datetime | None = None,
+    district: str | None = None,
+) -> Iterator[list[dict]]:
     """
-    Extracts data from a MongoDB collection.
+    Extracts data from a MongoDB collection, streaming it in batches.
 
     Parameters:
     ----------
@@ -44,11 +229,20 @@ def extract_data(
         An active MongoDB connection.
     collection_name : str
         The name of the MongoDB collection to extract data from.
+    batch_size : int | None, optional
+        The number of documents per batch (default is `MONGO_BATCH_SIZE`
+        from the settings).
+    since : datetime | None, optional
+        Only extract documents whose `updated_at` is later than this
+        watermark (default is None, which extracts every document).
+    district : str | None, optional
+        Only extract the documents of this district (default is None, which
+        extracts every district).
 
     Returns:
     -------
-    list[dict]
-        A list of documents (as dictionaries) retrieved from the specified
+    Iterator[list[dict]]
+        Batches of documents (as dictionaries) retrieved from the specified
         collection.
 
     Raises:
@@ -60,11 +254,134 @@ def extract_data(
     if not mongo_conn.ping():
         raise SystemExit()
 
-    data = mongo_conn.get_data_from_collection(
-        collection=collection_name, fields=FIELDS
+    if district:
+        filter = district_filter(district, since=since)
+    else:
+        filter = {WATERMARK_FIELD: {'$gt': since}} if since else None
+
+    yield from mongo_conn.iter_batches(
+        collection=collection_name,
+        filter=filter,
+        fields=FIELDS,
+        batch_size=batch_size,
     )
 
-    return data
+
+def pop_watermark(data: list[dict]) -> datetime | None:
+    """
+    Removes the `updated_at` field from the documents, so it does not reach
+    the dashboard collection, and returns the latest value found.
+
+    Parameters:
+    ----------
+    data : list[dict]
+        A batch of extracted documents.
+
+    Returns:
+    -------
+    datetime | None
+        The latest `updated_at` of the batch, or None if no document has
+        one.
+    """
+
+    updated_at = [
+        value
+        for item in data
+        if (value := item.pop(WATERMARK_FIELD, None)) is not None
+    ]
+
+    return max(updated_at, default=None)
+
+
+def projection_pipeline(
+    district: str, since: datetime | None = None
+) -> list[dict]:
+    """
+    Builds the aggregation pipeline that does the work of `filter_data` and
+    the filtering part of `transform_data` on the server: it keeps the ads
+    of the district, flattens the nested fields and drops the documents
+    with missing values, so only the final flat columns are transferred.
+
+    Parameters:
+    ----------
+    district : str
+        The district whose ads are kept, e.g. 'lisboa'.
+    since : datetime | None, optional
+        Only keep documents whose `updated_at` is later than this watermark
+        (default is None, which keeps every document).
+
+    Returns:
+    -------
+    list[dict]
+        The aggregation stages.
+    """
+
+    return [
+        {'$match': district_filter(district, since=since)},
+        {
+            '$project': {
+                **dict.fromkeys([*PROJECTED_FIELDS, WATERMARK_FIELD], 1),
+                **FLATTENED_FIELDS,
+                'location': {'$arrayElemAt': [f'${LOCATIONS_FIELD}', 1]},
+            }
+        },
+        {'$set': {'location': '$location.id'}},
+        {
+            '$match': {
+                column: {'$nin': [None, float('nan')]}
+                for column in REQUIRED_COLUMNS
+            }
+        },
+    ]
+
+
+def extract_projected_data(
+    mongo_conn: MongoConnection,
+    collection_name: str,
+    district: str,
+    batch_size: int | None = None,
+    since: datetime | None = None,
+) -> Iterator[list[dict]]:
+    """
+    Extracts the flat dashboard columns of a district from a MongoDB
+    collection with the `projection_pipeline` aggregation, streaming them
+    in batches. The batches are already filtered and flattened, so they
+    skip `filter_data`.
+
+    Parameters:
+    ----------
+    mongo_conn : MongoConnection
+        An active MongoDB connection.
+    collection_name : str
+        The name of the MongoDB collection to extract data from.
+    district : str
+        The district whose documents are extracted, e.g. 'lisboa'.
+    batch_size : int | None, optional
+        The number of documents per batch (default is `MONGO_BATCH_SIZE`
+        from the settings).
+    since : datetime | None, optional
+        Only extract documents whose `updated_at` is later than this
+        watermark (default is None, which extracts every document).
+
+    Returns:
+    -------
+    Iterator[list[dict]]
+        Batches of flat documents (as dictionaries).
+
+    Raises:
+    -------
+    SystemExit
+        If the MongoDB connection cannot be established.
+    """
+
+    if not mongo_conn.ping():
+        raise SystemExit()
+
+    yield from mongo_conn.aggregate_batches(
+        collection=collection_name,
+        pipeline=projection_pipeline(district=district, since=since),
+        batch_size=batch_size,
+    )
 
 
 def filter_data(data: list[dict]) -> list[dict]:
@@ -86,7 +403,8 @@ def filter_data(data: list[dict]) -> list[dict]:
 
     for item in data:
         location = (
-            item.get('location', {})
+            item
+            .get('location', {})
             .get('reverseGeocoding', {})
             .get('locations')
         )
@@ -96,7 +414,8 @@ def filter_data(data: list[dict]) -> list[dict]:
         price_square_meter = item.get('pricePerSquareMeter', {}).get('value')
         total_price = item.get('totalPrice', {}).get('value')
         city = (
-            item.get('location', {})
+            item
+            .get('location', {})
             .get('address', {})
             .get('city', {})
             .get('name')
@@ -114,16 +433,27 @@ def filter_data(data: list[dict]) -> list[dict]:
     return data
 
 
-def transform_data(data: list[dict]) -> list[dict]:
+def transform_data(
+    data: list[dict] | pd.DataFrame, district: str
+) -> list[dict]:
     """
     Transforms the filtered data by cleaning, mapping values, and
     restructuring location information to a consistent format.
-    Filters the data to only include entries from Lisbon.
+    Filters the data to only include entries from the district, which is
+    added to every document.
+
+    Every step works row by row, and the `REQUIRED_COLUMNS` missing from
+    the data are added empty, so transforming the data in batches gives
+    the same documents as transforming all of it at once, even when no
+    document of a batch has one of them.
 
     Parameters:
     ----------
-    data : list[dict]
-        A list of filtered documents (as dictionaries) to be transformed.
+    data : list[dict] | pd.DataFrame
+        The filtered documents to be transformed, as dictionaries or as a
+        DataFrame.
+    district : str
+        The district of the documents, e.g. 'lisboa'.
 
     Returns:
     -------
@@ -132,19 +462,26 @@ def transform_data(data: list[dict]) -> list[dict]:
     """
 
     df = pd.DataFrame(data)
+    for column in REQUIRED_COLUMNS:
+        if column not in df:
+            df[column] = pd.Series(None, index=df.index, dtype=object)
 
     df.dropna(inplace=True)
 
+    df = df.astype(dict.fromkeys(FLOAT_COLUMNS, 'float64'))
+
     df['roomsNumberNotation'] = df['roomsNumber'].map(VALUES_TO_MAP)
 
-    df = df[df.location.str.startswith('lisboa/')]
+    prefix = f'{district}{DISTRICT_SEPARATOR}'
+    df = df[df.location.str.startswith(prefix)]
 
     df['location'] = (
         df['location']
-        .str.replace('lisboa/', '')
+        .str.removeprefix(prefix)
         .str.replace('-', ' ')
         .str.title()
     )
+    df['district'] = district
 
     return df.to_dict(orient='records')
 
@@ -154,6 +491,8 @@ def load_data(
 ) -> None:
     """
     Loads the transformed data into a specified MongoDB collection.
+    Documents whose `id` is already in the collection are replaced, so the
+    pipeline can run again over a collection that already has data.
 
     Parameters:
     ----------
@@ -166,17 +505,264 @@ def load_data(
     """
 
     mongo_conn.save_data(
-        collection=collection_name, data=data, unique_index=UNIQUE_INDEX
+        collection=collection_name,
+        data=data,
+        unique_index=UNIQUE_INDEX,
+        on_duplicate='upsert',
+    )
+
+
+def snapshot_districts(
+    mongo_conn: MongoConnection, collection_name: str
+) -> list[str]:
+    """
+    Lists the districts of the dashboard collection, in alphabetical order.
+    """
+
+    return [
+        group['_id']
+        for batch in mongo_conn.aggregate_batches(
+            collection=collection_name,
+            pipeline=[
+                {'$group': {'_id': '$district'}},
+                {'$sort': {'_id': 1}},
+            ],
+        )
+        for group in batch
+    ]
+
+
+def export_snapshot(
+    mongo_conn: MongoConnection, collection_name: str
+) -> Path | None:
+    """
+    Writes the dashboard collection as a new columnar snapshot in
+    `SNAPSHOT_PATH`, partitioned by district, together with the summary
+    tables of every dashboard widget computed for each district, for the
+    dashboard to load without querying MongoDB.
+
+    The districts are read, summarized and written one at a time, so the
+    peak memory depends on the largest district and not on the size of
+    the collection.
+
+    Parameters:
+    ----------
+    mongo_conn : MongoConnection
+        An active MongoDB connection.
+    collection_name : str
+        The name of the dashboard collection.
+
+    Returns:
+    -------
+    Path | None
+        The directory of the new snapshot version, or None if
+        `SNAPSHOT_PATH` is not set.
+    """
+
+    if not settings.SNAPSHOT_PATH:
+        print('The snapshot was not written because SNAPSHOT_PATH is not set.')
+        return None
+
+    with profiler.stage('snapshot') as stage:
+
+        def partitions() -> Iterator[tuple[str, dict[str, pd.DataFrame]]]:
+            for district in snapshot_districts(mongo_conn, collection_name):
+                listings = read_dataframe(
+                    mongo_conn=mongo_conn,
+                    collection=collection_name,
+                    fields=SNAPSHOT_SCHEMA.names,
+                    filter={'district': district},
+                )
+                stage.records += len(listings)
+                yield (
+                    district,
+                    {
+                        LISTINGS: listings,
+                        **compute_aggregates(listings),
+                    },
+                )
+                # Released before the next district is read.
+                del listings
+
+        return write_snapshot(partitions())
+
+
+def transform_partition(
+    mongo_conn: MongoConnection, job: PartitionJob
+) -> datetime | None:
+    """
+    Extracts, transforms and loads the documents of one district.
+
+    Documents are extracted in batches and each batch is flattened and
+    turned into columns before the next one is read, so the raw nested
+    documents are never all in memory at once. With `DASH_ETL_CHUNKED` on
+    in the settings, each batch is also transformed and loaded before the
+    next one is read, so the peak memory depends on `batch_size` and not
+    on the size of the district. Otherwise, the batches are concatenated
+    and transformed and loaded at once. Both modes load the same
+    documents.
+
+    With `DASH_ETL_EXTRACTION` set to 'aggregation' in the settings, the
+    documents are flattened and filtered by MongoDB with
+    `extract_projected_data`; with 'python', the nested documents are read
+    and flattened by `filter_data`.
+
+    Parameters:
+    ----------
+    mongo_conn : MongoConnection
+        An active MongoDB connection.
+    job : PartitionJob
+        The district to process and where to extract it from and load it
+        to.
+
+    Returns:
+    -------
+    datetime | None
+        The latest `updated_at` processed, or None if no document has one.
+    """
+
+    projected = settings.DASH_ETL_EXTRACTION == 'aggregation'
+    extract = extract_projected_data if projected else extract_data
+
+    watermark = None
+    loaded = 0
+    filtered_frames = []
+    batches = extract(
+        mongo_conn=mongo_conn,
+        collection_name=job.extract_from,
+        district=job.district,
+        batch_size=job.batch_size,
+        since=job.since,
     )
+    for batch in profiler.profile_batches('extract', batches):
+        batch_watermark = pop_watermark(data=batch)
+        if batch_watermark is not None:
+            watermark = max(watermark or batch_watermark, batch_watermark)
+
+        with profiler.stage('transform') as stage:
+            filtered_data = pd.DataFrame(
+                batch if projected else filter_data(data=batch)
+            )
+            del batch
+
+            if settings.DASH_ETL_CHUNKED:
+                transformed_data = transform_data(
+                    data=filtered_data, district=job.district
+                )
+                stage.records += len(transformed_data)
+
+        if settings.DASH_ETL_CHUNKED:
+            with profiler.stage('load') as stage:
+                load_data(
+                    mongo_conn=mongo_conn,
+                    collection_name=job.load_to,
+                    data=transformed_data,
+                )
+                stage.records += len(transformed_data)
+            loaded += len(transformed_data)
+        else:
+            filtered_frames.append(filtered_data)
+
+    if filtered_frames:
+        with profiler.stage('transform') as stage:
+            filtered_data = pd.concat(filtered_frames, ignore_index=True)
+
+            transformed_data = transform_data(
+                data=filtered_data, district=job.district
+            )
+            stage.records += len(transformed_data)
+
+        with profiler.stage('load') as stage:
+            load_data(
+                mongo_conn=mongo_conn,
+                collection_name=job.load_to,
+                data=transformed_data,
+            )
+            stage.records += len(transformed_data)
+        loaded += len(transformed_data)
+
+    print(f'Loaded {loaded} ads of the "{job.district}" district.')
+
+    return watermark
+
+
+def run_partition(job: PartitionJob) -> tuple[datetime | None, dict]:
+    """
+    Runs `transform_partition` in a worker process, with a MongoDB
+    connection of its own, and returns its watermark with the stages it
+    recorded, for the main process to merge into its profile.
+    """
+
+    watermark = transform_partition(mongo_conn=MongoConnection(), job=job)
+    return watermark, profiler.collect()
+
+
+def run_partitions(
+    mongo_conn: MongoConnection, jobs: list[PartitionJob]
+) -> list[datetime | None]:
+    """
+    Runs the partition jobs in `DASH_ETL_WORKERS` processes, or one after
+    the other in this process if there is a single worker or job.
+
+    The worker processes are started with the 'spawn' method, so each one
+    opens its own MongoDB connection instead of inheriting the client of
+    this process, which is not fork-safe.
+
+    Parameters:
+    ----------
+    mongo_conn : MongoConnection
+        An active MongoDB connection, used when the jobs run in this
+        process.
+    jobs : list[PartitionJob]
+        The districts to process.
+
+    Returns:
+    -------
+    list[datetime | None]
+        The watermark of each job, in the order of the jobs.
+    """
+
+    workers = min(settings.DASH_ETL_WORKERS, len(jobs))
+    if workers <= 1:
+        return [transform_partition(mongo_conn, job) for job in jobs]
+
+    print(f'Processing {len(jobs)} districts with {workers} workers.')
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=get_context('spawn')
+    ) as executor:
+        results = list(executor.map(run_partition, jobs))
+
+    for _, stages in results:
+        profiler.merge(stages)
+
+    return [watermark for watermark, _ in results]
 
 
 def dash_pipeline(
-    mongo_conn: MongoConnection, extract_from: str, load_to: str
+    mongo_conn: MongoConnection,
+    extract_from: str,
+    load_to: str,
+    batch_size: int | None = None,
+    incremental: bool = False,
 ) -> None:
     """
     Orchestrates the end-to-end pipeline of extracting, filtering,
     transforming, and loading data into MongoDB for a dashboard.
 
+    The consolidated documents are partitioned by district, taken from the
+    reverse-geocoding location id, and each district is processed by
+    `transform_partition` as a separate job. The jobs run in parallel
+    worker processes, as set by `DASH_ETL_WORKERS`.
+
+    Every run saves the latest `updated_at` it processed as the watermark
+    of `load_to`. In incremental mode, only the districts and documents
+    changed after the saved watermark are extracted and upserted, so ads
+    that are no longer available are updated in the dashboard collection
+    with their `is_available` flag set to False.
+
+    After loading, the dashboard collection is exported as a columnar
+    snapshot partitioned by district with `export_snapshot`.
+
     Parameters:
     ----------
     mongo_conn : MongoConnection
@@ -185,20 +771,55 @@ def dash_pipeline(
         The name of the MongoDB collection to extract data from.
     load_to : str
         The name of the MongoDB collection to load transformed data into.
+    batch_size : int | None, optional
+        The number of documents extracted per batch (default is
+        `MONGO_BATCH_SIZE` from the settings).
+    incremental : bool, optional
+        Whether to process only the documents changed since the last run
+        (default is False, which processes the whole collection).
     """
 
-    data = extract_data(mongo_conn=mongo_conn, collection_name=extract_from)
+    pipeline = watermark_key(load_to)
+    since = mongo_conn.get_watermark(pipeline) if incremental else None
+    if incremental:
+        print(f'Extracting the documents changed since {since}.')
 
-    filtered_data = filter_data(data=data)
+    with profiler.stage('districts') as stage:
+        districts = extract_districts(
+            mongo_conn=mongo_conn, collection_name=extract_from, since=since
+        )
+        stage.records += len(districts)
+
+    if not districts:
+        print(f'There are no changes to load into "{load_to}" collection.')
+        if settings.SNAPSHOT_PATH and latest_snapshot() is None:
+            export_snapshot(mongo_conn=mongo_conn, collection_name=load_to)
+        return
+
+    jobs = [
+        PartitionJob(
+            district=district,
+            extract_from=extract_from,
+            load_to=load_to,
+            batch_size=batch_size,
+            since=since,
+        )
+        for district in districts
+    ]
+    watermarks = [
+        watermark
+        for watermark in run_partitions(mongo_conn=mongo_conn, jobs=jobs)
+        if watermark is not None
+    ]
 
-    transformed_data = transform_data(data=filtered_data)
+    if watermarks:
+        mongo_conn.set_watermark(pipeline, max(watermarks))
 
-    load_data(
-        mongo_conn=mongo_conn, collection_name=load_to, data=transformed_data
-    )
+    export_snapshot(mongo_conn=mongo_conn, collection_name=load_to)
 
 
 if __name__ == '__main__':
+    from src.core.monitoring import mongo_stats
     from src.core.settings import settings
 
     consolidated_collection = settings.COLLECTION_CONSOLIDATE
@@ -206,8 +827,16 @@ if __name__ == '__main__':
 
     mongo = MongoConnection()
 
-    dash_pipeline(
-        mongo_conn=mongo,
-        extract_from=consolidated_collection,
-        load_to=dash_collection,
-    )
+    with profiler.stage('dash'):
+        dash_pipeline(
+            mongo_conn=mongo,
+            extract_from=consolidated_collection,
+            load_to=dash_collection,
+            incremental=True,
+        )
+
+    print(mongo_stats.summary())
+    mongo_stats.dump(settings.METRICS_PATH)
+
+    print(profiler.summary())
+    profiler.dump(settings.METRICS_PATH)
@@ -0,0 +1,282 @@
+"""
+Persistent index of the ad ids that are already known.
+
+The index is stored as a sorted array of ids plus a Bloom filter over the
+same ids, both saved as `.npy` files so they can be memory-mapped when the
+index is loaded. Membership tests go through the Bloom filter first, and
+only the ids it reports as "maybe" are confirmed with a binary search on the
+sorted array, so lookups never return false positives.
+
+Files inside the index directory:
+    - ids.npy: sorted and unique int64 ids
+    - bloom.npy: the Bloom filter bits, packed as uint8
+    - meta.json: the Bloom filter parameters and the number of ids
+"""
+
+import json
+import math
+import os
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from src.core.settings import settings
+
+IDS_FILE = 'ids.npy'
+BLOOM_FILE = 'bloom.npy'
+META_FILE = 'meta.json'
+
+MIN_CAPACITY = 1_000_000
+
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def default_index_path() -> Path:
+    return Path(settings.LOCAL_BACKUP_PATH) / 'known_ids'
+
+
+def _as_ids(ids: Iterable[int]) -> np.ndarray:
+    if not isinstance(ids, np.ndarray):
+        ids = list(ids)
+
+    return np.asarray(ids, dtype=np.int64)
+
+
+def _sorted_unique(ids: np.ndarray) -> np.ndarray:
+    ids = np.sort(ids)
+    if not len(ids):
+        return ids
+
+    return ids[np.concatenate(([True], ids[1:] != ids[:-1]))]
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """
+    SplitMix64 finalizer, used to spread the ids over the Bloom filter.
+    """
+
+    z = values + GOLDEN_GAMMA
+    z = (z ^ (z >> np.uint64(30))) * MIX_1
+    z = (z ^ (z >> np.uint64(27))) * MIX_2
+    return z ^ (z >> np.uint64(31))
+
+
+class KnownIdIndex:
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        false_positive_rate: float = 0.01,
+    ) -> None:
+        """
+        Loads the index stored in `path`, memory-mapping its arrays. If the
+        directory has no index yet, the index starts empty.
+
+        Parameters:
+        ----------
+        path : str | Path | None, optional
+            The directory of the index (default is a `known_ids` folder
+            inside `LOCAL_BACKUP_PATH`).
+        false_positive_rate : float, optional
+            The Bloom filter false positive rate used when it is (re)built
+            (default is 0.01).
+        """
+
+        self.path = Path(path) if path is not None else default_index_path()
+        self.false_positive_rate = false_positive_rate
+
+        self.ids = np.empty(0, dtype=np.int64)
+        self.bloom = np.empty(0, dtype=np.uint8)
+        self.num_bits = 0
+        self.num_hashes = 0
+        self.capacity = 0
+
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, ad_id: int) -> bool:
+        return bool(self.contains([ad_id])[0])
+
+    def load(self) -> None:
+        """
+        Memory-maps the index files, if they exist.
+        """
+
+        meta_path = self.path / META_FILE
+        if not meta_path.is_file():
+            return
+
+        with open(meta_path, 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+
+        self.ids = np.load(self.path / IDS_FILE, mmap_mode='r')
+        self.bloom = np.load(self.path / BLOOM_FILE, mmap_mode='r')
+        self.num_bits = meta['num_bits']
+        self.num_hashes = meta['num_hashes']
+        self.capacity = meta['capacity']
+
+    def contains(self, ids: Iterable[int]) -> np.ndarray:
+        """
+        Checks which of the given ids are in the index.
+
+        Parameters:
+        ----------
+        ids : Iterable[int]
+            The ids to look up.
+
+        Returns:
+        -------
+        np.ndarray
+            A boolean array, True where the id is known.
+        """
+
+        ids = _as_ids(ids)
+        found = np.zeros(len(ids), dtype=bool)
+
+        if not len(self.ids) or not len(ids):
+            return found
+
+        maybe = self._bloom_check(ids)
+        candidates = ids[maybe]
+
+        positions = np.searchsorted(self.ids, candidates)
+        positions[positions == len(self.ids)] = 0
+        found[maybe] = self.ids[positions] == candidates
+
+        return found
+
+    def unknown(self, ids: Iterable[int]) -> list[int]:
+        """
+        Returns the ids that are not in the index, keeping their order.
+        """
+
+        ids = list(ids)
+        known = self.contains(ids)
+
+        return [ad_id for ad_id, is_known in zip(ids, known) if not is_known]
+
+    def add(self, ids: Iterable[int]) -> int:
+        """
+        Adds ids to the index and saves it.
+
+        The new ids are merged into the sorted array and their bits set in
+        the existing Bloom filter. The filter is only rebuilt, with twice the
+        needed capacity, once the number of ids goes above its capacity.
+
+        Parameters:
+        ----------
+        ids : Iterable[int]
+            The ids to add. Ids already known are ignored.
+
+        Returns:
+        -------
+        int
+            How many ids were new to the index.
+        """
+
+        new_ids = _sorted_unique(_as_ids(ids))
+        new_ids = new_ids[~self.contains(new_ids)]
+
+        if not len(new_ids):
+            return 0
+
+        merged_ids = np.insert(
+            self.ids, np.searchsorted(self.ids, new_ids), new_ids
+        )
+
+        if len(merged_ids) > self.capacity:
+            self._build_bloom(capacity=max(2 * len(merged_ids), MIN_CAPACITY))
+            self._bloom_add(merged_ids)
+        else:
+            self.bloom = np.array(self.bloom)
+            self._bloom_add(new_ids)
+
+        self.ids = merged_ids
+        self.save()
+
+        return len(new_ids)
+
+    def rebuild(self, ids: Iterable[int]) -> None:
+        """
+        Replaces the whole index with the given ids.
+        """
+
+        self.ids = np.empty(0, dtype=np.int64)
+        self.capacity = 0
+        self.add(ids)
+
+    def save(self) -> None:
+        """
+        Writes the index files and memory-maps them again.
+
+        Each file is written to a temporary path first and then moved over
+        the previous one, so readers never see a half written array.
+        """
+
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self._replace(IDS_FILE, lambda file: np.save(file, self.ids))
+        self._replace(BLOOM_FILE, lambda file: np.save(file, self.bloom))
+
+        meta = {
+            'count': len(self.ids),
+            'num_bits': self.num_bits,
+            'num_hashes': self.num_hashes,
+            'capacity': self.capacity,
+            'false_positive_rate': self.false_positive_rate,
+        }
+        self._replace(
+            META_FILE, lambda file: file.write(json.dumps(meta).encode())
+        )
+
+        self.load()
+
+    def _replace(self, file_name: str, write) -> None:
+        tmp_path = self.path / f'{file_name}.tmp'
+        with open(tmp_path, 'wb') as file:
+            write(file)
+        os.replace(tmp_path, self.path / file_name)
+
+    def _build_bloom(self, capacity: int) -> None:
+        num_bits = -capacity * math.log(self.false_positive_rate)
+        num_bits = int(math.ceil(num_bits / math.log(2) ** 2 / 8)) * 8
+
+        self.num_bits = num_bits
+        self.num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        self.capacity = capacity
+        self.bloom = np.zeros(num_bits // 8, dtype=np.uint8)
+
+    def _bit_positions(self, ids: np.ndarray, seed: int) -> np.ndarray:
+        first_hash = _mix(ids.astype(np.uint64))
+        second_hash = _mix(first_hash) | np.uint64(1)
+        positions = first_hash + np.uint64(seed) * second_hash
+
+        return positions % np.uint64(self.num_bits)
+
+    def _bloom_add(self, ids: np.ndarray) -> None:
+        for seed in range(self.num_hashes):
+            positions = self._bit_positions(ids, seed)
+            byte_index = positions >> np.uint64(3)
+            bit_offset = positions & np.uint64(7)
+
+            # Repeated bytes are fine here: within one pass every write to a
+            # byte sets the same bit.
+            for bit in range(8):
+                selected = byte_index[bit_offset == bit]
+                self.bloom[selected] |= np.uint8(1 << bit)
+
+    def _bloom_check(self, ids: np.ndarray) -> np.ndarray:
+        maybe = np.ones(len(ids), dtype=bool)
+
+        for seed in range(self.num_hashes):
+            positions = self._bit_positions(ids[maybe], seed)
+            bits = self.bloom[positions >> np.uint64(3)] >> (
+                positions & np.uint64(7)
+            ).astype(np.uint8)
+            maybe[maybe] = (bits & 1).astype(bool)
+
+        return maybe
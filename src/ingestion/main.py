@@ -6,6 +6,8 @@ Crawl Data -> Consolidate Data -> Create Dashboard Collection
 """
 
 from src.core.mongodb import MongoConnection
+from src.core.monitoring import mongo_stats
+from src.core.profiling import profiler
 from src.core.settings import settings
 from src.ingestion.consolidate import Consolidate
 from src.ingestion.crawler.imovirtual_crawler import ImovirtualCrawler
@@ -22,18 +24,27 @@ dash_collection = settings.COLLECTION_DASH
 
 mongo = MongoConnection()
 
-ImovirtualCrawler().crawl(
-    offer_types=offer_types_search,
-    property_types=property_types_search,
-    locations=location_search,
-    sub_locations=sub_location_search,
-)
-
-Consolidate(raw_collection='raw_imovirtual').consolidate()
-
-
-dash_pipeline(
-    mongo_conn=mongo,
-    extract_from=consolidated_collection,
-    load_to=dash_collection,
-)
+with profiler.stage('crawl'):
+    ImovirtualCrawler().crawl(
+        offer_types=offer_types_search,
+        property_types=property_types_search,
+        locations=location_search,
+        sub_locations=sub_location_search,
+    )
+
+with profiler.stage('consolidate'):
+    Consolidate(raw_collection='raw_imovirtual').consolidate()
+
+with profiler.stage('dash'):
+    dash_pipeline(
+        mongo_conn=mongo,
+        extract_from=consolidated_collection,
+        load_to=dash_collection,
+        incremental=True,
+    )
+
+print(mongo_stats.summary())
+mongo_stats.dump(settings.METRICS_PATH)
+
+print(profiler.summary())
+profiler.dump(settings.METRICS_PATH)
@@ -0,0 +1,75 @@
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+@pytest.fixture(scope='session')
+def benchmark_config(pytestconfig):
+    sizes = [
+        int(size)
+        for size in pytestconfig.getoption('--benchmark-sizes').split(',')
+    ]
+
+    return {
+        'sizes': sorted(sizes),
+        'churn_rate': pytestconfig.getoption('--benchmark-churn-rate'),
+        'duplicate_rate': pytestconfig.getoption('--benchmark-duplicate-rate'),
+        'tolerance': pytestconfig.getoption('--benchmark-tolerance'),
+        'clients': [
+            int(clients)
+            for clients in pytestconfig.getoption('--benchmark-clients').split(
+                ','
+            )
+        ],
+        'workers': pytestconfig.getoption('--benchmark-workers'),
+        'results_path': Path(pytestconfig.getoption('--benchmark-results')),
+    }
+
+
+@pytest.fixture(scope='session')
+def save_benchmark(benchmark_config):
+    """
+    Appends a benchmark run to `<results>/<name>.jsonl`, one JSON object per
+    line, so runs from different commits can be compared.
+    """
+
+    def save(name: str, results: dict) -> Path:
+        results_path = benchmark_config['results_path']
+        results_path.mkdir(parents=True, exist_ok=True)
+        file_path = results_path / f'{name}.jsonl'
+
+        record = {
+            'benchmark': name,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'config': {
+                key: value
+                for key, value in benchmark_config.items()
+                if key != 'results_path'
+            },
+            'results': results,
+        }
+
+        with open(file_path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(record) + '\n')
+
+        return file_path
+
+    return save
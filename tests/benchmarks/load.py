@@ -0,0 +1,315 @@
+"""
+Helpers to load test the dashboard: a gunicorn server started on a
+snapshot, and simulated users replaying the callbacks a browser sends
+through the HTTP callback endpoint.
+"""
+
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from src.dash.shared import process_memory
+
+ROOT = Path(__file__).parents[2]
+CALLBACK_PATH = '/_dash-update-component'
+HEADERS = {'Content-Type': 'application/json', 'Accept-Encoding': 'gzip'}
+
+# The initial values of the component properties that callbacks read.
+INITIAL_STATE = {
+    'estate-type-scatter.value': None,
+    'log-axis.value': ['log_x', 'log_y'],
+    'area-mark.value': [1, 10],
+    'estate-type-treemap.value': None,
+    'listings-explorer.page_current': 0,
+    'listings-explorer.page_size': 20,
+    'listings-explorer.sort_by': [],
+    'listings-explorer.filter_query': '',
+    'listings-explorer-cursors.data': None,
+}
+SORTED_COLUMNS = ['areaInSquareMeters', 'totalPrice', 'pricePerSquareMeter']
+
+STARTUP_SECONDS = 60
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class DashServer:
+    def __init__(self, snapshot_path: Path, workers: int) -> None:
+        """
+        The dashboard served by gunicorn, as in production, on a free local
+        port and the snapshots of `snapshot_path`.
+
+        Args:
+            snapshot_path (Path): The directory of the snapshots.
+            workers (int): The number of worker processes.
+        """
+
+        self.port = free_port()
+        self.log_path = snapshot_path / 'gunicorn.log'
+        self.env = os.environ | {
+            'SNAPSHOT_PATH': str(snapshot_path),
+            'DASH_BIND': f'127.0.0.1:{self.port}',
+            'DASH_WORKERS': str(workers),
+        }
+        self.process: subprocess.Popen | None = None
+
+    def __enter__(self) -> 'DashServer':
+        with self.log_path.open('w', encoding='utf-8') as log:
+            self.process = subprocess.Popen(
+                [
+                    sys.executable,
+                    '-m',
+                    'gunicorn',
+                    '-c',
+                    'python:src.dash.serve',
+                    'src.dash.main:server',
+                ],
+                cwd=ROOT,
+                env=self.env,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+        self.wait_until_ready()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.process.terminate()
+        self.process.wait(timeout=STARTUP_SECONDS)
+
+    def wait_until_ready(self) -> None:
+        deadline = time.monotonic() + STARTUP_SECONDS
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(self.log_path.read_text(encoding='utf-8'))
+            try:
+                self.get('/_dash-layout')
+                return
+            except OSError:
+                time.sleep(0.2)
+
+        raise TimeoutError(f'gunicorn did not start in {STARTUP_SECONDS}s')
+
+    def get(self, path: str) -> bytes:
+        connection = http.client.HTTPConnection('127.0.0.1', self.port)
+        try:
+            connection.request('GET', path)
+            return connection.getresponse().read()
+        finally:
+            connection.close()
+
+    def json(self, path: str):
+        return json.loads(self.get(path))
+
+    def pids(self) -> list[int]:
+        children = Path(
+            f'/proc/{self.process.pid}/task/{self.process.pid}/children'
+        )
+        if not children.exists():
+            return [self.process.pid]
+
+        return [self.process.pid] + [
+            int(pid) for pid in children.read_text(encoding='utf-8').split()
+        ]
+
+    def memory(self) -> dict[str, int]:
+        """
+        Returns the memory of the master and its workers, summed.
+        """
+
+        total: dict[str, int] = {}
+        for pid in self.pids():
+            for field, value in process_memory(pid).items():
+                total[field] = total.get(field, 0) + value
+        return total
+
+
+def callback_outputs(output: str) -> dict | list[dict]:
+    """
+    Returns the outputs of a callback request from the output of its
+    dependency, which joins multiple outputs as '..a.x...b.y..'.
+    """
+
+    outputs = [
+        dict(zip(['id', 'property'], item.split('.')))
+        for item in output.strip('.').split('...')
+    ]
+    return outputs if len(outputs) > 1 else outputs[0]
+
+
+def callback_payload(dependency: dict, state: dict) -> dict:
+    """
+    Builds the request of a callback from the dependencies of the app and
+    the current values of the components, as the browser does.
+    """
+
+    def values(items: list[dict]) -> list[dict]:
+        return [
+            {**item, 'value': state.get(f'{item["id"]}.{item["property"]}')}
+            for item in items
+        ]
+
+    return {
+        'output': dependency['output'],
+        'outputs': callback_outputs(dependency['output']),
+        'inputs': values(dependency['inputs']),
+        'changedPropIds': [],
+        'state': values(dependency['state']),
+    }
+
+
+def user_session(
+    dependencies: list[dict],
+    districts: list[str],
+    estates: list[str],
+    rng: random.Random,
+) -> list[dict]:
+    """
+    Returns the callback requests of a user: the first page load, an
+    estate change and a drag of the area slider on the scatter plot, a log
+    axis toggle, the estate types of the treemap, a few pages of the
+    listings sorted by a column, and a district change. Only the server
+    callbacks are requested, as the clientside ones never reach the server.
+
+    Args:
+        dependencies (list[dict]): The dependencies of the app, as served
+        by `/_dash-dependencies`.
+        districts (list[str]): The districts of the snapshot.
+        estates (list[str]): The estate types of the listings.
+        rng (random.Random): The random source of the session.
+
+    Returns:
+        list[dict]: The callback requests, in order.
+    """
+
+    server = [item for item in dependencies if not item['clientside_function']]
+    state = INITIAL_STATE | {'district-selector.value': rng.choice(districts)}
+    requests = [callback_payload(item, state) for item in server]
+
+    def change(prop: str, value) -> None:
+        state[prop] = value
+        requests.extend(
+            callback_payload(item, state)
+            for item in server
+            if prop
+            in {
+                f'{entry["id"]}.{entry["property"]}'
+                for entry in item['inputs']
+            }
+        )
+
+    change('estate-type-scatter.value', rng.choice(estates))
+    low, high = sorted(rng.sample(range(1, 11), 2))
+    for mark in range(2, low + 1):
+        change('area-mark.value', [mark, 10])
+    for mark in range(9, high - 1, -1):
+        change('area-mark.value', [low, mark])
+    change('log-axis.value', ['log_x'])
+    for estate in [*estates, None]:
+        change('estate-type-treemap.value', estate)
+    change(
+        'listings-explorer.sort_by',
+        [
+            {
+                'column_id': rng.choice(SORTED_COLUMNS),
+                'direction': rng.choice(['asc', 'desc']),
+            }
+        ],
+    )
+    for page in range(1, 4):
+        change('listings-explorer.page_current', page)
+    change('district-selector.value', rng.choice(districts))
+
+    return requests
+
+
+def replay(port: int, sessions: list[list[dict]]) -> list[dict]:
+    """
+    Sends the requests of some sessions in order through one connection,
+    reopened when the server closes it, and returns the output, status,
+    seconds and bytes received of each.
+    """
+
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    timings = []
+    try:
+        for payload in (item for session in sessions for item in session):
+            start = time.perf_counter()
+            connection.request(
+                'POST', CALLBACK_PATH, json.dumps(payload), HEADERS
+            )
+            response = connection.getresponse()
+            body = response.read()
+            timings.append({
+                'output': payload['output'],
+                'status': response.status,
+                'seconds': time.perf_counter() - start,
+                'bytes': len(body),
+            })
+    finally:
+        connection.close()
+
+    return timings
+
+
+def run_load(port: int, clients: list[list[list[dict]]]) -> dict:
+    """
+    Replays the sessions of every client at once, each in its own thread,
+    and summarizes them.
+
+    Args:
+        port (int): The port of the server.
+        clients (list[list[list[dict]]]): The sessions of each client.
+
+    Returns:
+        dict: The throughput in requests per second, the failed requests,
+        and the latency percentiles and mean payload of every request and
+        of each callback output.
+    """
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+        timings = [
+            item
+            for client in executor.map(replay, [port] * len(clients), clients)
+            for item in client
+        ]
+    elapsed = time.perf_counter() - start
+
+    outputs = sorted({item['output'] for item in timings})
+    return {
+        'clients': len(clients),
+        'requests': len(timings),
+        'failed': sum(item['status'] != http.client.OK for item in timings),
+        'throughput': len(timings) / elapsed,
+        **summarize(timings),
+        'outputs': {
+            output: summarize([
+                item for item in timings if item['output'] == output
+            ])
+            for output in outputs
+        },
+    }
+
+
+def summarize(timings: list[dict]) -> dict:
+    seconds = np.array([item['seconds'] for item in timings])
+    p50, p95, p99 = np.percentile(seconds, [50, 95, 99])
+    return {
+        'p50': float(p50),
+        'p95': float(p95),
+        'p99': float(p99),
+        'mean_bytes': float(np.mean([item['bytes'] for item in timings])),
+    }
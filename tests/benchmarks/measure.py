@@ -0,0 +1,78 @@
+"""
+Helpers to time a call, record its peak memory and estimate how the
+measurements grow with the input size.
+"""
+
+import math
+import time
+import tracemalloc
+from typing import Any, Callable
+
+
+def measure(
+    func: Callable, *args: Any, repeats: int = 1, **kwargs: Any
+) -> dict:
+    """
+    Runs `func` and returns its best wall time and its peak traced memory.
+
+    The timing runs happen without tracemalloc, which would inflate them, and
+    the memory is measured on a separate run.
+
+    Parameters:
+    ----------
+    func : Callable
+        The function to benchmark.
+    repeats : int, optional
+        How many timed runs to make; the fastest one is kept (default is 1).
+
+    Returns:
+    -------
+    dict
+        The `seconds` and `peak_bytes` of the call.
+    """
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds': min(timings), 'peak_bytes': peak_bytes}
+
+
+def scaling_exponent(sizes: list[int], values: list[float]) -> float:
+    """
+    Least squares slope of log(value) against log(size).
+
+    An exponent close to 1 means linear growth, close to 2 means quadratic.
+
+    Parameters:
+    ----------
+    sizes : list[int]
+        The input sizes, at least two distinct ones.
+    values : list[float]
+        The measurement taken at each size.
+
+    Returns:
+    -------
+    float
+        The estimated growth exponent.
+    """
+
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(value, 1e-9)) for value in values]
+
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    variance = sum((x - mean_x) ** 2 for x in xs)
+
+    return covariance / variance
@@ -0,0 +1,191 @@
+"""
+Synthetic ads used by the benchmark suite.
+
+The generated documents mimic the shape that matters for consolidation: an
+integer `id`, a few payload fields and, for the consolidated collection, the
+`is_available` flag. Churn and duplicate rates control how much the raw crawl
+differs from what is already consolidated.
+
+Listings mimic the nested consolidated documents read by the dashboard
+pipeline, spread over a few districts and with some missing values. Dash
+frames mimic the flat listings the pipeline loads for the dashboard.
+"""
+
+import random
+
+import pandas as pd
+
+ESTATES = ['FLAT', 'HOUSE']
+TRANSACTIONS = ['SELL', 'RENT']
+DISTRICTS = [
+    'lisboa/alvalade',
+    'lisboa/sao-domingos-de-benfica',
+    'porto/foz-do-douro',
+    'setubal/almada',
+]
+ROOMS = ['ONE', 'TWO', 'THREE', 'FOUR', 'FIVE', 'MORE']
+NULLABLE_FIELDS = ['title', 'roomsNumber', 'totalPrice', 'city']
+AVAILABLE_RATE = 0.9
+
+
+def make_ad(ad_id: int, rng: random.Random) -> dict:
+    return {
+        'id': ad_id,
+        'title': f'Ad {ad_id}',
+        'estate': rng.choice(ESTATES),
+        'transaction': rng.choice(TRANSACTIONS),
+        'totalPrice': {'value': rng.randint(50_000, 2_000_000)},
+        'areaInSquareMeters': rng.randint(20, 500),
+    }
+
+
+def make_datasets(
+    size: int,
+    churn_rate: float = 0.1,
+    duplicate_rate: float = 0.05,
+    seed: int = 0,
+) -> tuple[list[dict], list[dict]]:
+    """
+    Builds a raw crawl and a consolidated collection with `size` ads each.
+
+    Parameters:
+    ----------
+    size : int
+        Number of unique ads in each dataset.
+    churn_rate : float, optional
+        Fraction of consolidated ads missing from the raw crawl, replaced by
+        the same number of new ads (default is 0.1).
+    duplicate_rate : float, optional
+        Fraction of raw ads crawled twice, as happens with promoted ads
+        (default is 0.05).
+    seed : int, optional
+        Seed for the random generator (default is 0).
+
+    Returns:
+    -------
+    tuple[list[dict], list[dict]]
+        The raw data and the consolidated data.
+    """
+
+    rng = random.Random(seed)
+
+    consolidated_data = [
+        {**make_ad(ad_id, rng), 'is_available': rng.random() > churn_rate}
+        for ad_id in range(size)
+    ]
+
+    churned = int(size * churn_rate)
+    raw_ids = list(range(churned, size + churned))
+    raw_data = [make_ad(ad_id, rng) for ad_id in raw_ids]
+
+    duplicated = rng.sample(raw_ids, int(size * duplicate_rate))
+    raw_data.extend(make_ad(ad_id, rng) for ad_id in duplicated)
+    rng.shuffle(raw_data)
+
+    return raw_data, consolidated_data
+
+
+def make_listing(ad_id: int, rng: random.Random, missing_rate: float) -> dict:
+    ad = make_ad(ad_id, rng)
+    location = rng.choice(DISTRICTS)
+    listing = {
+        **ad,
+        'location': {
+            'address': {'city': {'name': 'Lisboa'}},
+            'reverseGeocoding': {
+                'locations': [
+                    {'id': location.split('/')[0]},
+                    {'id': location},
+                ]
+            },
+        },
+        'pricePerSquareMeter': {'value': rng.randint(1_000, 10_000)},
+        'roomsNumber': rng.choice(ROOMS),
+        'is_available': rng.random() > missing_rate,
+        'description': 'x' * rng.randint(200, 2_000),
+    }
+
+    if rng.random() < missing_rate:
+        field = rng.choice(NULLABLE_FIELDS)
+        if field == 'city':
+            listing['location']['address']['city']['name'] = None
+        elif field == 'totalPrice':
+            listing['totalPrice']['value'] = None
+        else:
+            del listing[field]
+
+    return listing
+
+
+def location_id(listing: dict) -> str:
+    return listing['location']['reverseGeocoding']['locations'][1]['id']
+
+
+def make_listings(
+    size: int, missing_rate: float = 0.05, seed: int = 0
+) -> list[dict]:
+    """
+    Builds `size` consolidated listings, as read by the dashboard pipeline.
+
+    Parameters:
+    ----------
+    size : int
+        Number of listings.
+    missing_rate : float, optional
+        Fraction of listings with a missing value (default is 0.05).
+    seed : int, optional
+        Seed for the random generator (default is 0).
+
+    Returns:
+    -------
+    list[dict]
+        The listings.
+    """
+
+    rng = random.Random(seed)
+
+    return [make_listing(ad_id, rng, missing_rate) for ad_id in range(size)]
+
+
+def make_dash_frame(size: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Builds `size` flat dashboard listings, as loaded by the dashboard
+    pipeline.
+
+    Parameters:
+    ----------
+    size : int
+        Number of listings.
+    seed : int, optional
+        Seed for the random generator (default is 0).
+
+    Returns:
+    -------
+    pd.DataFrame
+        The listings, one column per dashboard field.
+    """
+
+    rng = random.Random(seed)
+    rooms = [rng.choice(ROOMS) for _ in range(size)]
+    districts = [rng.choice(DISTRICTS) for _ in range(size)]
+
+    return pd.DataFrame({
+        'id': range(size),
+        'title': [f'Ad {ad_id}' for ad_id in range(size)],
+        'estate': [rng.choice(ESTATES) for _ in range(size)],
+        'transaction': [rng.choice(TRANSACTIONS) for _ in range(size)],
+        'district': [district.split('/')[0] for district in districts],
+        'location': [
+            district.split('/')[1].replace('-', ' ').title()
+            for district in districts
+        ],
+        'city': 'Lisboa',
+        'totalPrice': [rng.randint(50_000, 2_000_000) for _ in range(size)],
+        'pricePerSquareMeter': [
+            rng.randint(1_000, 10_000) for _ in range(size)
+        ],
+        'areaInSquareMeters': [rng.randint(20, 500) for _ in range(size)],
+        'roomsNumber': rooms,
+        'roomsNumberNotation': rooms,
+        'is_available': [rng.random() < AVAILABLE_RATE for _ in range(size)],
+    })
@@ -0,0 +1,126 @@
+import gzip
+import json
+import shutil
+import subprocess
+
+import plotly.express as px
+import pytest
+
+from src.core.columnar import compact_frame
+from src.dash.clientside import ASSETS_PATH, listing_store
+from src.dash.data import FRAME_SCHEMA
+from src.dash.downsample import scatter_points
+from src.dash.index import ListingIndex
+from tests.benchmarks.measure import measure
+from tests.benchmarks.synthetic import make_dash_frame
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.skipif(shutil.which('node') is None, reason='node is needed'),
+]
+
+FRAME_SECONDS = 1 / 60
+REPEATS = 20
+
+# The interactions of a user: estate type, log axes and area range.
+INTERACTIONS = [
+    (None, ['log_x', 'log_y'], [1, 10]),
+    ('FLAT', ['log_x', 'log_y'], [1, 10]),
+    ('FLAT', ['log_x'], [1, 10]),
+    ('FLAT', [], [3, 7]),
+    (None, [], [2, 9]),
+]
+
+TIME_INTERACTIONS = f"""
+const fs = require('fs');
+global.window = {{}};
+eval(fs.readFileSync(process.argv[1], 'utf8'));
+const [store, interactions] = JSON.parse(fs.readFileSync(0, 'utf8'));
+const scatter = window.dash_clientside.dashboard.scatter;
+scatter(store, ...interactions[0]);
+
+let best = Infinity;
+for (let repeat = 0; repeat < {REPEATS}; repeat++) {{
+    const start = performance.now();
+    for (const interaction of interactions) {{
+        scatter(store, ...interaction);
+    }}
+    best = Math.min(best, performance.now() - start);
+}}
+console.log(JSON.stringify(best / 1000 / interactions.length));
+"""
+
+
+def clientside_seconds(store: dict) -> float:
+    """
+    Returns the time of an interaction filtered in the browser, as run by
+    node on the store, once it is decoded.
+    """
+
+    process = subprocess.run(
+        ['node', '-e', TIME_INTERACTIONS, str(ASSETS_PATH / 'clientside.js')],
+        input=json.dumps([store, INTERACTIONS]),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(process.stdout)
+
+
+def server_interactions(index: ListingIndex) -> None:
+    for estate, log_axis, area_mark in INTERACTIONS:
+        points = scatter_points(index.area_range(estate, *area_mark))
+        fig = px.scatter(
+            points.df,
+            y='totalPrice',
+            x='areaInSquareMeters',
+            size=points.size,
+            color='roomsNumberNotation',
+            render_mode=points.render_mode,
+        )
+        fig.update_xaxes(type='log' if 'log_x' in log_axis else 'linear')
+        fig.to_json()
+
+
+@pytest.fixture(scope='module')
+def clientside_results(benchmark_config, save_benchmark):
+    results: dict[str, list[dict]] = {'clientside': [], 'server': []}
+
+    for size in benchmark_config['sizes']:
+        index = ListingIndex(
+            compact_frame(make_dash_frame(size=size), FRAME_SCHEMA)
+        )
+        store = {**listing_store(index), 'layout': {}, 'colors': {}}
+        payload = json.dumps(store).encode()
+
+        clientside = {
+            'size': size,
+            'seconds': clientside_seconds(store),
+            'store_bytes': len(payload),
+            'store_gzip_bytes': len(gzip.compress(payload)),
+        }
+        results['clientside'].append(clientside)
+
+        server = measure(server_interactions, index, repeats=3)
+        server['seconds'] /= len(INTERACTIONS)
+        results['server'].append({'size': size, **server})
+
+        print(
+            f'interaction ({size} ads): '
+            f'clientside {clientside["seconds"] * 1000:.2f}ms, '
+            f'server {server["seconds"] * 1000:.2f}ms, store '
+            f'{clientside["store_gzip_bytes"] / 1024:.1f} KiB compressed'
+        )
+
+    file_path = save_benchmark('clientside', results)
+    print(f'Benchmark results appended to "{file_path}"')
+
+    return results
+
+
+def test_clientside_interactions_take_a_frame(clientside_results):
+    for measurement in clientside_results['clientside']:
+        assert measurement['seconds'] < FRAME_SECONDS, (
+            f'filtering {measurement["size"]} ads in the browser took '
+            f'{measurement["seconds"] * 1000:.2f}ms'
+        )
@@ -0,0 +1,82 @@
+import pytest
+
+from src.ingestion.consolidate import Consolidate
+from tests.benchmarks.measure import measure, scaling_exponent
+from tests.benchmarks.synthetic import make_datasets
+
+pytestmark = pytest.mark.benchmark
+
+STEPS = [
+    'filter_unique_and_add_availability',
+    'ads_to_update_availability',
+    'new_ads_to_insert',
+]
+REPEAT_UP_TO_SIZE = 100_000
+MIN_SIZES = 2
+
+
+@pytest.fixture(scope='module')
+def consolidation_results(benchmark_config, save_benchmark):
+    results: dict[str, list[dict]] = {step: [] for step in STEPS}
+
+    for size in benchmark_config['sizes']:
+        raw_data, consolidated_data = make_datasets(
+            size=size,
+            churn_rate=benchmark_config['churn_rate'],
+            duplicate_rate=benchmark_config['duplicate_rate'],
+        )
+        repeats = 3 if size <= REPEAT_UP_TO_SIZE else 1
+
+        filter_step = measure(
+            Consolidate.filter_unique_and_add_availability,
+            raw_data,
+            repeats=repeats,
+        )
+        filtered_data = Consolidate.filter_unique_and_add_availability(
+            raw_data
+        )
+        update_step = measure(
+            Consolidate.ads_to_update_availability,
+            consolidated_data=consolidated_data,
+            filtered_data=filtered_data,
+            repeats=repeats,
+        )
+        insert_step = measure(
+            Consolidate.new_ads_to_insert,
+            consolidated_data=consolidated_data,
+            filtered_data=filtered_data,
+            repeats=repeats,
+        )
+
+        for step, measurement in zip(
+            STEPS, [filter_step, update_step, insert_step]
+        ):
+            results[step].append({'size': size, **measurement})
+            print(
+                f'{step} ({size} ads): {measurement["seconds"]:.4f}s, '
+                f'peak {measurement["peak_bytes"] / 1024**2:.1f} MiB'
+            )
+
+    file_path = save_benchmark('consolidation', results)
+    print(f'Benchmark results appended to "{file_path}"')
+
+    return results
+
+
+@pytest.mark.parametrize('metric', ['seconds', 'peak_bytes'])
+@pytest.mark.parametrize('step', STEPS)
+def test_consolidation_step_scales_linearly(
+    consolidation_results, benchmark_config, step, metric
+):
+    measurements = consolidation_results[step]
+    sizes = [item['size'] for item in measurements]
+    if len(set(sizes)) < MIN_SIZES:
+        pytest.skip('at least two dataset sizes are needed')
+
+    exponent = scaling_exponent(
+        sizes=sizes, values=[item[metric] for item in measurements]
+    )
+
+    assert exponent <= 1 + benchmark_config['tolerance'], (
+        f'{step} {metric} grows as n^{exponent:.2f}'
+    )
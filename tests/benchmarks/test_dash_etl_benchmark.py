@@ -0,0 +1,109 @@
+import random
+import re
+
+import pytest
+
+from src.core.settings import settings
+from src.ingestion.dash_etl import LOCATION_ID_FIELD, dash_pipeline
+from tests.benchmarks.measure import measure, scaling_exponent
+from tests.benchmarks.synthetic import DISTRICTS, location_id, make_listing
+
+pytestmark = pytest.mark.benchmark
+
+MODES = {'chunked': True, 'one-shot': False}
+BATCH_SIZE = 1_000
+MIN_SIZES = 2
+
+
+class StreamingMongo:
+    """
+    Generates the consolidated listings of a district batch by batch and
+    discards what is loaded, so the measured memory is only the pipeline's
+    own.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.loaded = 0
+
+    @staticmethod
+    def ping():
+        return True
+
+    @staticmethod
+    def aggregate_batches(collection, pipeline, batch_size=None):
+        districts = {location.split('/')[0] for location in DISTRICTS}
+        yield [{'_id': district} for district in sorted(districts)]
+
+    def iter_batches(self, collection, filter, fields, batch_size):
+        pattern = re.compile(filter[LOCATION_ID_FIELD]['$regex'])
+        rng = random.Random(0)
+        for start in range(0, self.size, batch_size):
+            stop = min(start + batch_size, self.size)
+            listings = [
+                make_listing(ad_id, rng, missing_rate=0.05)
+                for ad_id in range(start, stop)
+            ]
+            yield [
+                listing
+                for listing in listings
+                if pattern.match(location_id(listing))
+            ]
+
+    def save_data(self, collection, data, unique_index, on_duplicate):
+        self.loaded += len(data)
+
+    @staticmethod
+    def get_watermark(pipeline):
+        return None
+
+    def set_watermark(self, pipeline, watermark): ...
+
+
+@pytest.fixture(scope='module')
+def etl_results(benchmark_config, save_benchmark):
+    patch = pytest.MonkeyPatch()
+    patch.setattr(settings, 'DASH_ETL_EXTRACTION', 'python')
+    patch.setattr(settings, 'SNAPSHOT_PATH', '')
+    patch.setattr(settings, 'DASH_ETL_WORKERS', 1)
+
+    results: dict[str, list[dict]] = {mode: [] for mode in MODES}
+
+    for size in benchmark_config['sizes']:
+        for mode, chunked in MODES.items():
+            patch.setattr(settings, 'DASH_ETL_CHUNKED', chunked)
+            measurement = measure(
+                dash_pipeline,
+                mongo_conn=StreamingMongo(size),
+                extract_from='consolidated',
+                load_to='dash',
+                batch_size=BATCH_SIZE,
+            )
+            results[mode].append({'size': size, **measurement})
+            print(
+                f'{mode} dash ETL ({size} ads): '
+                f'{measurement["seconds"]:.4f}s, '
+                f'peak {measurement["peak_bytes"] / 1024**2:.1f} MiB'
+            )
+
+    patch.undo()
+
+    file_path = save_benchmark('dash_etl', results)
+    print(f'Benchmark results appended to "{file_path}"')
+
+    return results
+
+
+def test_chunked_peak_memory_does_not_grow(etl_results, benchmark_config):
+    measurements = etl_results['chunked']
+    sizes = [item['size'] for item in measurements]
+    if len(set(sizes)) < MIN_SIZES:
+        pytest.skip('at least two dataset sizes are needed')
+
+    exponent = scaling_exponent(
+        sizes=sizes, values=[item['peak_bytes'] for item in measurements]
+    )
+
+    assert exponent <= benchmark_config['tolerance'], (
+        f'chunked peak memory grows as n^{exponent:.2f}'
+    )
@@ -0,0 +1,113 @@
+import pytest
+from pymongo import MongoClient
+
+from src.core.mongodb import batched, build_projection, client_options
+from src.core.monitoring import CommandMetricsListener, mongo_stats
+from src.core.settings import settings
+from src.ingestion.dash_etl import (
+    FIELDS,
+    district_filter,
+    filter_data,
+    projection_pipeline,
+    transform_data,
+)
+from tests.benchmarks.measure import measure
+from tests.benchmarks.synthetic import make_listings
+from tests.conftest import TEST_DATABASE
+
+pytestmark = pytest.mark.benchmark
+
+COLLECTION = 'dash_extraction_benchmark'
+PATHS = ['python', 'aggregation']
+INSERT_CHUNK = 10_000
+DISTRICT = 'lisboa'
+
+
+def python_path(collection) -> list[dict]:
+    records = []
+    for batch in batched(
+        collection.find(
+            district_filter(DISTRICT), projection=build_projection(FIELDS)
+        ),
+        settings.MONGO_BATCH_SIZE,
+    ):
+        records.extend(filter_data(data=batch))
+    return transform_data(data=records, district=DISTRICT)
+
+
+def aggregation_path(collection) -> list[dict]:
+    return transform_data(
+        data=list(
+            collection.aggregate(
+                projection_pipeline(district=DISTRICT),
+                batchSize=settings.MONGO_BATCH_SIZE,
+            )
+        ),
+        district=DISTRICT,
+    )
+
+
+def bytes_received(path, collection) -> int:
+    mongo_stats.reset()
+    path(collection)
+    commands = mongo_stats.stats()['commands']
+    return sum(stats['bytes_received'] for stats in commands.values())
+
+
+@pytest.fixture(scope='module')
+def extraction_results(mongo_database, benchmark_config, save_benchmark):
+    client = MongoClient(
+        settings.MONGO_HOST,
+        settings.MONGO_PORT,
+        **client_options()
+        | {'event_listeners': [CommandMetricsListener(measure_bytes=True)]},
+    )
+    collection = client[TEST_DATABASE][COLLECTION]
+    results: dict[str, list[dict]] = {path: [] for path in PATHS}
+
+    for size in benchmark_config['sizes']:
+        collection.drop()
+        listings = make_listings(size=size)
+        for start in range(0, size, INSERT_CHUNK):
+            collection.insert_many(listings[start : start + INSERT_CHUNK])
+        del listings
+
+        for name, path in zip(PATHS, [python_path, aggregation_path]):
+            measurement = {
+                **measure(path, collection),
+                'bytes_received': bytes_received(path, collection),
+            }
+            results[name].append({'size': size, **measurement})
+            print(
+                f'{name} extraction ({size} ads): '
+                f'{measurement["seconds"]:.4f}s, '
+                f'peak {measurement["peak_bytes"] / 1024**2:.1f} MiB, '
+                f'{measurement["bytes_received"] / 1024**2:.1f} MiB received'
+            )
+
+    collection.drop()
+    client.close()
+
+    file_path = save_benchmark('dash_extraction', results)
+    print(f'Benchmark results appended to "{file_path}"')
+
+    return results
+
+
+@pytest.mark.parametrize('metric', ['seconds', 'peak_bytes'])
+def test_aggregation_is_not_slower(
+    extraction_results, benchmark_config, metric
+):
+    for python, aggregation in zip(
+        extraction_results['python'], extraction_results['aggregation']
+    ):
+        assert aggregation[metric] <= python[metric] * (
+            1 + benchmark_config['tolerance']
+        ), f'{metric} of {python["size"]} ads'
+
+
+def test_aggregation_transfers_less(extraction_results):
+    for python, aggregation in zip(
+        extraction_results['python'], extraction_results['aggregation']
+    ):
+        assert aggregation['bytes_received'] < python['bytes_received']
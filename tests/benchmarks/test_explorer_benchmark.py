@@ -0,0 +1,79 @@
+import pytest
+
+from src.core.columnar import compact_frame
+from src.dash.data import FRAME_SCHEMA
+from src.dash.explorer import ListingExplorer, parse_query
+from src.dash.index import ListingIndex
+from tests.benchmarks.measure import measure, scaling_exponent
+from tests.benchmarks.synthetic import make_dash_frame
+
+pytestmark = pytest.mark.benchmark
+
+MIN_SIZES = 2
+PAGE_SIZE = 20
+PAGES = 10
+SORT_BY = [{'column_id': 'totalPrice', 'direction': 'desc'}]
+FILTER_QUERY = '{totalPrice} s> 100000 && {estate} contains FLAT'
+
+
+def turn_pages(explorer: ListingExplorer, query, after: int) -> int:
+    """
+    Turns `PAGES` pages from the listing at position `after`, each from the
+    last listing of the previous one, as the explorer callback does.
+    """
+
+    for _ in range(PAGES):
+        after = int(explorer.page(query, PAGE_SIZE, after=after)[-1])
+    return after
+
+
+def jump_pages(explorer: ListingExplorer, query, number: int) -> None:
+    for page in range(number, number + PAGES):
+        explorer.page_at(query, PAGE_SIZE, page)
+
+
+@pytest.fixture(scope='module')
+def explorer_results(benchmark_config, save_benchmark):
+    results: dict[str, list[dict]] = {'keyset': [], 'offset': []}
+
+    for size in benchmark_config['sizes']:
+        listings = compact_frame(make_dash_frame(size=size), FRAME_SCHEMA)
+        explorer = ListingExplorer(ListingIndex(listings))
+        query = parse_query(SORT_BY, FILTER_QUERY, explorer.df)
+
+        # Pages from the middle of the listings, after sorting once.
+        number = explorer.count(query) // PAGE_SIZE // 2
+        after = int(explorer.page_at(query, PAGE_SIZE, number - 1)[-1])
+
+        steps = [
+            ('keyset', measure(turn_pages, explorer, query, after, repeats=5)),
+            ('offset', measure(jump_pages, explorer, query, number)),
+        ]
+        for step, measurement in steps:
+            results[step].append({'size': size, **measurement})
+            print(
+                f'listing explorer {PAGES} {step} pages ({size} ads): '
+                f'{measurement["seconds"]:.6f}s, '
+                f'peak {measurement["peak_bytes"] / 1024**2:.1f} MiB'
+            )
+
+    file_path = save_benchmark('listing_explorer', results)
+    print(f'Benchmark results appended to "{file_path}"')
+
+    return results
+
+
+def test_keyset_page_cost_does_not_grow(explorer_results, benchmark_config):
+    measurements = explorer_results['keyset']
+    sizes = [item['size'] for item in measurements]
+    if len(set(sizes)) < MIN_SIZES:
+        pytest.skip('at least two dataset sizes are needed')
+
+    exponent = scaling_exponent(
+        sizes=sizes, values=[item['seconds'] for item in measurements]
+    )
+
+    assert exponent <= benchmark_config['tolerance'], (
+        f'turning a page of sorted and filtered listings grows as '
+        f'n^{exponent:.2f}'
+    )
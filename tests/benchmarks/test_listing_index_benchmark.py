@@ -0,0 +1,63 @@
+import pytest
+
+from src.core.columnar import compact_frame
+from src.dash.data import FRAME_SCHEMA
+from src.dash.index import AREA_MARKS, ListingIndex
+from tests.benchmarks.measure import measure, scaling_exponent
+from tests.benchmarks.synthetic import make_dash_frame
+
+pytestmark = pytest.mark.benchmark
+
+MIN_SIZES = 2
+ESTATES = [None, 'FLAT', 'HOUSE']
+
+
+def slice_every_range(index: ListingIndex) -> int:
+    marks = list(AREA_MARKS)
+    return sum(
+        len(index.areas[estate].between(low, high))
+        for estate in ESTATES
+        for low in marks
+        for high in marks[marks.index(low) :]
+    )
+
+
+@pytest.fixture(scope='module')
+def index_results(benchmark_config, save_benchmark):
+    results: dict[str, list[dict]] = {'build': [], 'filter': []}
+
+    for size in benchmark_config['sizes']:
+        listings = compact_frame(make_dash_frame(size=size), FRAME_SCHEMA)
+        index = ListingIndex(listings)
+
+        steps = [
+            ('build', measure(ListingIndex, listings)),
+            ('filter', measure(slice_every_range, index, repeats=5)),
+        ]
+        for step, measurement in steps:
+            results[step].append({'size': size, **measurement})
+            print(
+                f'listing index {step} ({size} ads): '
+                f'{measurement["seconds"]:.6f}s, '
+                f'peak {measurement["peak_bytes"] / 1024**2:.1f} MiB'
+            )
+
+    file_path = save_benchmark('listing_index', results)
+    print(f'Benchmark results appended to "{file_path}"')
+
+    return results
+
+
+def test_filter_cost_does_not_grow(index_results, benchmark_config):
+    measurements = index_results['filter']
+    sizes = [item['size'] for item in measurements]
+    if len(set(sizes)) < MIN_SIZES:
+        pytest.skip('at least two dataset sizes are needed')
+
+    exponent = scaling_exponent(
+        sizes=sizes, values=[item['seconds'] for item in measurements]
+    )
+
+    assert exponent <= benchmark_config['tolerance'], (
+        f'filtering by area range grows as n^{exponent:.2f}'
+    )
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from src.core.aggregates import compute_aggregates
+from src.core.snapshot import LISTINGS, write_snapshot
+from src.dash.shared import format_memory
+from tests.benchmarks.load import DashServer, run_load, user_session
+from tests.benchmarks.synthetic import make_dash_frame
+
+pytestmark = pytest.mark.benchmark
+
+SESSIONS_PER_CLIENT = 2
+# The slowest callbacks a single user should wait for, at the 95th
+# percentile.
+SINGLE_USER_P95_SECONDS = 1.0
+
+
+@pytest.fixture(scope='module')
+def load_results(benchmark_config, save_benchmark, tmp_path_factory):
+    results: list[dict] = []
+
+    for size in benchmark_config['sizes']:
+        listings = make_dash_frame(size=size)
+        path = tmp_path_factory.mktemp(f'load_{size}')
+        write_snapshot(
+            {
+                district: {LISTINGS: frame, **compute_aggregates(frame)}
+                for district, frame in listings.groupby('district')
+            },
+            path=path,
+        )
+        districts = sorted(listings['district'].unique())
+        estates = sorted(listings['estate'].unique())
+
+        with DashServer(path, workers=benchmark_config['workers']) as server:
+            dependencies = server.json('/_dash-dependencies')
+            rng = random.Random(size)
+
+            for clients in benchmark_config['clients']:
+                sessions = [
+                    [
+                        user_session(dependencies, districts, estates, rng)
+                        for _ in range(SESSIONS_PER_CLIENT)
+                    ]
+                    for _ in range(clients)
+                ]
+                load = run_load(server.port, sessions)
+                memory = server.memory()
+                results.append({'size': size, **load, 'memory': memory})
+
+                print(
+                    f'load ({size} ads, {clients} users): '
+                    f'{load["throughput"]:.1f} requests/s, '
+                    f'p50 {load["p50"] * 1000:.0f}ms, '
+                    f'p95 {load["p95"] * 1000:.0f}ms, '
+                    f'p99 {load["p99"] * 1000:.0f}ms, '
+                    f'{load["mean_bytes"] / 1024:.1f} KiB per response, '
+                    f'{load["failed"]} failed; server '
+                    f'{format_memory(memory)}'
+                )
+                for output, summary in load['outputs'].items():
+                    print(
+                        f'    {output}: p50 {summary["p50"] * 1000:.0f}ms, '
+                        f'p95 {summary["p95"] * 1000:.0f}ms, '
+                        f'{summary["mean_bytes"] / 1024:.1f} KiB'
+                    )
+
+    file_path = save_benchmark(
+        'load', {'workers': benchmark_config['workers'], 'runs': results}
+    )
+    print(f'Benchmark results appended to "{file_path}"')
+
+    return results
+
+
+def test_no_request_fails_under_load(load_results):
+    for run in load_results:
+        assert run['failed'] == 0, (
+            f'{run["failed"]} of {run["requests"]} requests failed with '
+            f'{run["clients"]} users and {run["size"]} ads'
+        )
+
+
+def test_single_user_latency(load_results):
+    lowest = min(run['clients'] for run in load_results)
+
+    for run in load_results:
+        if run['clients'] == lowest:
+            assert run['p95'] < SINGLE_USER_P95_SECONDS, (
+                f'p95 of {run["p95"]:.2f}s with {run["size"]} ads'
+            )
@@ -0,0 +1,145 @@
+import time
+
+import pytest
+
+from src.core.aggregates import compute_aggregates
+from src.core.snapshot import LISTINGS, write_snapshot
+from src.dash.cache import response_cache
+from src.dash.components.app import create_app
+from src.dash.data import provider
+from src.dash.responses import encodings
+from tests.benchmarks.load import callback_outputs
+from tests.benchmarks.synthetic import make_dash_frame
+
+pytestmark = pytest.mark.benchmark
+
+
+def component_values(component) -> dict[str, object]:
+    """
+    Returns the initial properties of every component of a serialized
+    layout with an id, by id.
+    """
+
+    if isinstance(component, list):
+        return {
+            key: value
+            for child in component
+            for key, value in component_values(child).items()
+        }
+
+    if not isinstance(component, dict):
+        return {}
+
+    props = component.get('props', {})
+    values = component_values(props.get('children'))
+    if 'id' in props:
+        values[props['id']] = props
+    return values
+
+
+def initial_callbacks(client) -> list[dict]:
+    """
+    Returns the requests of the callbacks the browser fires on the first
+    render, with the initial values of the layout.
+    """
+
+    values = component_values(client.get('/_dash-layout').get_json())
+
+    def with_values(items: list[dict]) -> list[dict]:
+        return [
+            {**item, 'value': values.get(item['id'], {}).get(item['property'])}
+            for item in items
+        ]
+
+    return [
+        {
+            'output': dependency['output'],
+            'outputs': callback_outputs(dependency['output']),
+            'inputs': with_values(dependency['inputs']),
+            'changedPropIds': [],
+            'state': with_values(dependency['state']),
+        }
+        for dependency in client.get('/_dash-dependencies').get_json()
+    ]
+
+
+def first_render(client, callbacks: list[dict], encoding: str) -> int:
+    """
+    Requests the page, its layout and its initial callbacks, as a browser
+    does on the first render, and returns the bytes received.
+    """
+
+    headers = {'Accept-Encoding': encoding}
+    responses = [
+        client.get('/', headers=headers),
+        client.get('/_dash-layout', headers=headers),
+    ] + [
+        client.post('/_dash-update-component', json=payload, headers=headers)
+        for payload in callbacks
+    ]
+    return sum(len(response.data) for response in responses)
+
+
+@pytest.fixture(scope='module')
+def page_results(benchmark_config, save_benchmark, tmp_path_factory):
+    results: dict[str, list[dict]] = {'payload': [], 'render': []}
+
+    for size in benchmark_config['sizes']:
+        path = tmp_path_factory.mktemp(f'page_load_{size}')
+        write_snapshot(
+            {
+                district: {LISTINGS: listings, **compute_aggregates(listings)}
+                for district, listings in make_dash_frame(size=size).groupby(
+                    'district'
+                )
+            },
+            path=path,
+        )
+        provider.configure(None)
+        app = create_app(snapshot_path=path, preload=True)
+        client = app.server.test_client()
+        callbacks = initial_callbacks(client)
+        response_cache.clear()
+
+        render: dict[str, float] = {'size': size}
+        for step in ['cold', 'warm']:
+            start = time.perf_counter()
+            first_render(client, callbacks, 'identity')
+            render[step] = time.perf_counter() - start
+        results['render'].append(render)
+
+        payload = {'size': size} | {
+            encoding: first_render(client, callbacks, encoding)
+            for encoding in ['identity', *encodings()]
+        }
+        results['payload'].append(payload)
+
+        print(
+            f'first render ({size} ads): cold {render["cold"]:.4f}s, '
+            f'warm {render["warm"]:.4f}s, payload '
+            + ', '.join(
+                f'{encoding} {payload[encoding] / 1024:.1f} KiB'
+                for encoding in ['identity', *encodings()]
+            )
+        )
+
+    provider.configure(None)
+
+    file_path = save_benchmark('page_load', results)
+    print(f'Benchmark results appended to "{file_path}"')
+
+    return results
+
+
+def test_cached_page_renders_faster(page_results):
+    for render in page_results['render']:
+        assert render['warm'] < render['cold'], (
+            f'the cached first render of {render["size"]} ads took '
+            f'{render["warm"]:.4f}s, {render["cold"]:.4f}s without the cache'
+        )
+
+
+def test_page_payload_is_compressed(page_results):
+    for payload in page_results['payload']:
+        for encoding in encodings():
+            assert payload[encoding] < payload['identity']
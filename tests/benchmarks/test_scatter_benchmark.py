@@ -0,0 +1,77 @@
+import plotly.express as px
+import pytest
+
+from src.core.settings import settings
+from src.dash.downsample import scatter_points
+from tests.benchmarks.measure import measure, scaling_exponent
+from tests.benchmarks.synthetic import make_dash_frame
+
+pytestmark = pytest.mark.benchmark
+
+MIN_SIZES = 2
+
+
+def scatter_figure(df):
+    points = scatter_points(df)
+    return px.scatter(
+        points.df,
+        y='totalPrice',
+        x='areaInSquareMeters',
+        size=points.size,
+        color='roomsNumberNotation',
+        render_mode=points.render_mode,
+    )
+
+
+@pytest.fixture(scope='module')
+def scatter_results(benchmark_config, save_benchmark):
+    results: dict[str, list[dict]] = {'bins': [], 'sample': []}
+    patch = pytest.MonkeyPatch()
+
+    for size in benchmark_config['sizes']:
+        listings = make_dash_frame(size=size)
+
+        for mode, measurements in results.items():
+            patch.setattr(settings, 'DASH_SCATTER_DOWNSAMPLE', mode)
+            measurement = measure(scatter_figure, listings, repeats=3)
+            payload = len(scatter_figure(listings).to_json())
+
+            measurements.append({
+                'size': size,
+                'payload_bytes': payload,
+                **measurement,
+            })
+            print(
+                f'scatter {mode} ({size} ads): '
+                f'{measurement["seconds"]:.4f}s, '
+                f'payload {payload / 1024**2:.2f} MiB'
+            )
+
+    patch.undo()
+
+    file_path = save_benchmark('scatter', results)
+    print(f'Benchmark results appended to "{file_path}"')
+
+    return results
+
+
+@pytest.mark.parametrize('mode', ['bins', 'sample'])
+def test_payload_does_not_grow_past_the_threshold(
+    scatter_results, benchmark_config, mode
+):
+    measurements = [
+        item
+        for item in scatter_results[mode]
+        if item['size'] > settings.DASH_SCATTER_MAX_POINTS
+    ]
+    sizes = [item['size'] for item in measurements]
+    if len(set(sizes)) < MIN_SIZES:
+        pytest.skip('at least two sizes above the point threshold needed')
+
+    exponent = scaling_exponent(
+        sizes=sizes, values=[item['payload_bytes'] for item in measurements]
+    )
+
+    assert exponent <= benchmark_config['tolerance'], (
+        f'{mode} scatter payload grows as n^{exponent:.2f}'
+    )
@@ -0,0 +1,55 @@
+import pytest
+
+from src.core.columnar import compact_frame
+from src.dash.data import FRAME_SCHEMA
+from src.dash.index import ListingIndex
+from src.dash.shared import SHARED_FILE, read_frame, write_frame
+from tests.benchmarks.measure import measure, scaling_exponent
+from tests.benchmarks.synthetic import make_dash_frame
+
+pytestmark = pytest.mark.benchmark
+
+MIN_SIZES = 2
+
+
+@pytest.fixture(scope='module')
+def shared_results(benchmark_config, save_benchmark, tmp_path_factory):
+    results: dict[str, list[dict]] = {'write': [], 'map': []}
+
+    for size in benchmark_config['sizes']:
+        file_path = tmp_path_factory.mktemp(f'shared_{size}') / SHARED_FILE
+        index = ListingIndex(
+            compact_frame(make_dash_frame(size=size), FRAME_SCHEMA)
+        )
+
+        steps = [
+            ('write', measure(write_frame, index, file_path)),
+            ('map', measure(read_frame, file_path, repeats=3)),
+        ]
+        for step, measurement in steps:
+            results[step].append({'size': size, **measurement})
+            print(
+                f'shared frame {step} ({size} ads): '
+                f'{measurement["seconds"]:.4f}s, '
+                f'peak {measurement["peak_bytes"] / 1024**2:.2f} MiB'
+            )
+
+    file_path = save_benchmark('shared_frames', results)
+    print(f'Benchmark results appended to "{file_path}"')
+
+    return results
+
+
+def test_mapping_does_not_copy_the_frame(shared_results, benchmark_config):
+    measurements = shared_results['map']
+    sizes = [item['size'] for item in measurements]
+    if len(set(sizes)) < MIN_SIZES:
+        pytest.skip('at least two dataset sizes are needed')
+
+    exponent = scaling_exponent(
+        sizes=sizes, values=[item['peak_bytes'] for item in measurements]
+    )
+
+    assert exponent <= benchmark_config['tolerance'], (
+        f'mapping a shared frame allocates n^{exponent:.2f} bytes'
+    )
@@ -0,0 +1,51 @@
+import pytest
+
+from src.core.snapshot import LISTINGS, read_snapshot, write_snapshot
+from tests.benchmarks.measure import measure
+from tests.benchmarks.synthetic import make_dash_frame
+
+pytestmark = pytest.mark.benchmark
+
+COLD_START_SECONDS = 1.0
+DISTRICT = 'lisboa'
+
+
+@pytest.fixture(scope='module')
+def snapshot_results(benchmark_config, save_benchmark, tmp_path_factory):
+    results: dict[str, list[dict]] = {'write': [], 'read': []}
+
+    for size in benchmark_config['sizes']:
+        path = tmp_path_factory.mktemp(f'snapshot_{size}')
+        partitions = {
+            district: {LISTINGS: listings}
+            for district, listings in make_dash_frame(size=size).groupby(
+                'district'
+            )
+        }
+
+        write_step = measure(write_snapshot, partitions, path=path, keep=1)
+        del partitions
+        read_step = measure(
+            read_snapshot, path=path, partition=DISTRICT, repeats=3
+        )
+
+        for step, measurement in [('write', write_step), ('read', read_step)]:
+            results[step].append({'size': size, **measurement})
+            print(
+                f'snapshot {step} ({size} ads): '
+                f'{measurement["seconds"]:.4f}s, '
+                f'peak {measurement["peak_bytes"] / 1024**2:.1f} MiB'
+            )
+
+    file_path = save_benchmark('snapshot', results)
+    print(f'Benchmark results appended to "{file_path}"')
+
+    return results
+
+
+def test_snapshot_cold_start_is_under_a_second(snapshot_results):
+    for measurement in snapshot_results['read']:
+        assert measurement['seconds'] < COLD_START_SECONDS, (
+            f'reading {measurement["size"]} ads took '
+            f'{measurement["seconds"]:.2f}s'
+        )
@@ -0,0 +1,96 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.core.snapshot import LISTINGS, write_snapshot
+from src.dash.components.app import create_app
+from src.dash.data import provider
+from tests.benchmarks.measure import measure
+from tests.benchmarks.synthetic import make_dash_frame
+
+pytestmark = pytest.mark.benchmark
+
+COLD_START_SECONDS = 1.0
+IMPORT_SECONDS = 5.0
+ROOT = Path(__file__).parents[2]
+
+IMPORT_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import src.dash.main
+from src.dash.data import provider
+print(json.dumps({
+    'seconds': time.perf_counter() - start,
+    'loaded': provider.loaded,
+}))
+"""
+
+
+def import_dashboard() -> dict:
+    process = subprocess.run(
+        [sys.executable, '-c', IMPORT_SCRIPT],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(process.stdout.splitlines()[-1])
+
+
+def start_dashboard(snapshot_path: Path) -> None:
+    provider.configure(None)
+    create_app(snapshot_path=snapshot_path, preload=True)
+
+
+@pytest.fixture(scope='module')
+def startup_results(benchmark_config, save_benchmark, tmp_path_factory):
+    results: dict[str, list[dict]] = {'import': [], 'startup': []}
+
+    dashboard_import = import_dashboard()
+    results['import'].append(dashboard_import)
+    print(f'dashboard import: {dashboard_import["seconds"]:.4f}s')
+
+    for size in benchmark_config['sizes']:
+        path = tmp_path_factory.mktemp(f'startup_{size}')
+        write_snapshot(
+            {
+                district: {LISTINGS: listings}
+                for district, listings in make_dash_frame(size=size).groupby(
+                    'district'
+                )
+            },
+            path=path,
+        )
+
+        measurement = measure(start_dashboard, path)
+        results['startup'].append({'size': size, **measurement})
+        print(
+            f'dashboard startup ({size} ads): '
+            f'{measurement["seconds"]:.4f}s, '
+            f'peak {measurement["peak_bytes"] / 1024**2:.1f} MiB'
+        )
+
+    provider.configure(None)
+
+    file_path = save_benchmark('startup', results)
+    print(f'Benchmark results appended to "{file_path}"')
+
+    return results
+
+
+def test_import_has_no_side_effects(startup_results):
+    dashboard_import = startup_results['import'][0]
+
+    assert not dashboard_import['loaded']
+    assert dashboard_import['seconds'] < IMPORT_SECONDS
+
+
+def test_startup_from_snapshot_is_under_a_second(startup_results):
+    for measurement in startup_results['startup']:
+        assert measurement['seconds'] < COLD_START_SECONDS, (
+            f'starting with {measurement["size"]} ads took '
+            f'{measurement["seconds"]:.2f}s'
+        )
@@ -1,4 +1,84 @@
 import pytest
+from pymongo import MongoClient, errors
+
+from src.core.settings import settings
+
+TEST_DATABASE = f'{settings.MONGO_DATABASE}_test'
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks')
+    group.addoption(
+        '--run-benchmarks',
+        action='store_true',
+        default=False,
+        help='run the tests marked as benchmark',
+    )
+    group.addoption(
+        '--benchmark-sizes',
+        default='10000,100000,1000000',
+        help='comma separated dataset sizes used by the benchmarks',
+    )
+    group.addoption(
+        '--benchmark-churn-rate',
+        type=float,
+        default=0.1,
+        help='fraction of ads that change between two crawls',
+    )
+    group.addoption(
+        '--benchmark-duplicate-rate',
+        type=float,
+        default=0.05,
+        help='fraction of raw ads crawled more than once',
+    )
+    group.addoption(
+        '--benchmark-tolerance',
+        type=float,
+        default=0.4,
+        help='accepted growth exponent above linear',
+    )
+    group.addoption(
+        '--benchmark-clients',
+        default='1,8,32',
+        help='comma separated numbers of concurrent users of the load test',
+    )
+    group.addoption(
+        '--benchmark-workers',
+        type=int,
+        default=4,
+        help='gunicorn workers serving the dashboard in the load test',
+    )
+    group.addoption(
+        '--benchmark-results',
+        default='.benchmarks',
+        help='directory where benchmark results are appended',
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--run-benchmarks'):
+        return
+
+    skip_benchmark = pytest.mark.skip(reason='needs --run-benchmarks to run')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip_benchmark)
+
+
+@pytest.fixture(scope='module')
+def mongo_database():
+    client = MongoClient(
+        settings.MONGO_HOST, settings.MONGO_PORT, serverSelectionTimeoutMS=500
+    )
+    try:
+        client.admin.command('ping')
+    except errors.PyMongoError:
+        pytest.skip('needs a local mongod')
+
+    yield client[TEST_DATABASE]
+
+    client.drop_database(TEST_DATABASE)
+    client.close()
 
 
 @pytest.fixture
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from src.core.aggregates import (
+    ALL_ESTATES,
+    MAX_AREA,
+    compute_aggregates,
+    select_segment,
+)
+
+
+@pytest.fixture
+def listings():
+    return pd.DataFrame({
+        'id': range(6),
+        'transaction': ['SELL'] * 5 + ['RENT'],
+        'estate': ['FLAT', 'FLAT', 'HOUSE', 'HOUSE', 'FLAT', 'FLAT'],
+        'location': [
+            'Alvalade',
+            'Alvalade',
+            'Alvalade',
+            'Belem',
+            'Belem',
+            'Belem',
+        ],
+        'totalPrice': [100.0, 300.0, 500.0, 700.0, 900.0, 1.0],
+        'pricePerSquareMeter': [10.0, 20.0, 30.0, 40.0, 50.0, 1.0],
+        'areaInSquareMeters': [50.0, 60.0, 70.0, 80.0, MAX_AREA, 50.0],
+        'roomsNumberNotation': ['T1', 'T1', 'T2', 'T2', 'T1', 'T0'],
+    })
+
+
+def test_segments_include_all_estates(listings):
+    expected_median = 300.0
+    aggregates = compute_aggregates(listings)
+
+    prices = select_segment(aggregates['location_prices'], 'SELL')
+    flat_prices = select_segment(aggregates['location_prices'], 'SELL', 'FLAT')
+
+    assert prices['location'].tolist() == ['Alvalade', 'Belem']
+    assert prices['median'][0] == expected_median
+    assert flat_prices['location'].tolist() == ['Alvalade']
+    assert ALL_ESTATES in set(aggregates['headline']['estate'])
+
+
+def test_headline_skips_implausible_areas(listings):
+    expected_listings = 4
+    headline = select_segment(compute_aggregates(listings)['headline'], 'SELL')
+
+    assert headline['listings'][0] == expected_listings
+    assert headline['median_price'][0] == listings['totalPrice'][:4].median()
+
+
+def test_room_breakdown_proportions(listings):
+    breakdown = compute_aggregates(listings)['room_breakdown']
+
+    for estate in [None, 'FLAT', 'HOUSE']:
+        proportion = select_segment(breakdown, 'SELL', estate)['proportion']
+        assert proportion.sum() == pytest.approx(1)
@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+import pytest
+
+from src.core.settings import settings
+from src.core.snapshot import LISTINGS, write_snapshot
+from src.dash import data as data_module
+from src.dash.components.app import create_app
+from src.dash.data import provider
+from tests.benchmarks.synthetic import make_dash_frame
+
+
+class UnreachableMongo:
+    def __init__(self, *args, **kwargs):
+        raise AssertionError('the dashboard should not connect to MongoDB')
+
+
+@pytest.fixture
+def snapshot_path(monkeypatch, tmp_path):
+    monkeypatch.setattr(data_module, 'MongoConnection', UnreachableMongo)
+    write_snapshot(
+        {
+            district: {LISTINGS: listings}
+            for district, listings in make_dash_frame(size=500).groupby(
+                'district'
+            )
+        },
+        path=tmp_path,
+    )
+    yield tmp_path
+    provider.configure(None)
+
+
+def test_app_is_created_without_loading_data(snapshot_path):
+    app = create_app(snapshot_path=snapshot_path)
+
+    assert not provider.loaded
+    assert app.validation_layout is not None
+
+    response = app.server.test_client().get('/_dash-layout')
+
+    assert response.status_code == HTTPStatus.OK
+    assert provider.loaded
+    assert 'lisboa' in response.get_data(as_text=True)
+
+
+def test_data_is_loaded_once_from_the_snapshot(snapshot_path):
+    create_app(snapshot_path=snapshot_path, preload=True)
+    data = provider.get()
+    create_app(snapshot_path=snapshot_path)
+
+    assert provider.get() is data
+    assert data.current.version_dir.parent == snapshot_path
+    assert set(data.districts) == {'lisboa', 'porto', 'setubal'}
+
+
+@pytest.mark.parametrize('clientside', [False, True])
+def test_every_app_gets_the_callbacks(snapshot_path, monkeypatch, clientside):
+    monkeypatch.setattr(settings, 'DASH_CLIENTSIDE_FILTERING', clientside)
+    first = create_app(snapshot_path=snapshot_path)
+    second = create_app(snapshot_path=snapshot_path)
+
+    assert 'treemap-figure.figure' in first.callback_map
+    assert first.callback_map.keys() == second.callback_map.keys()
+    for app in [first, second]:
+        response = app.server.test_client().get('/_dash-dependencies')
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.get_json()) == len(app.callback_map)
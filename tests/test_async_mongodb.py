@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from src.core.async_mongodb import AsyncMongoConnection
+from tests.conftest import TEST_DATABASE
+
+COLLECTION = 'async_test'
+
+
+@pytest.fixture
+def async_test_collection(mongo_database):
+    mongo_database.drop_collection(COLLECTION)
+    return mongo_database[COLLECTION]
+
+
+def test_save_and_get_data(async_test_collection, raw_data):
+    async def save_and_get():
+        async with AsyncMongoConnection(database=TEST_DATABASE) as mongo:
+            assert await mongo.ping()
+            await mongo.save_data(
+                collection=COLLECTION, data=raw_data, unique_index='id'
+            )
+            return await mongo.get_data_from_collection(
+                collection=COLLECTION, fields=['id']
+            )
+
+    documents = asyncio.run(save_and_get())
+
+    assert sorted(document['id'] for document in documents) == list(
+        range(1, 11)
+    )
+    assert 'id_1' in async_test_collection.index_information()
+
+
+def test_update_is_available(async_test_collection, filtered_data):
+    async_test_collection.insert_many(filtered_data)
+
+    async def update():
+        async with AsyncMongoConnection(database=TEST_DATABASE) as mongo:
+            await mongo.update_is_available(
+                collection=COLLECTION, unique_index='id', ids=[1, 2]
+            )
+
+    asyncio.run(update())
+
+    unavailable = async_test_collection.find({'is_available': False})
+    assert sorted(document['id'] for document in unavailable) == [1, 2]
+
+
+def test_iter_batches(async_test_collection, raw_data):
+    expected_batches = 4
+    async_test_collection.insert_many(raw_data)
+
+    async def read():
+        async with AsyncMongoConnection(database=TEST_DATABASE) as mongo:
+            return [
+                batch
+                async for batch in mongo.iter_batches(
+                    collection=COLLECTION, batch_size=3
+                )
+            ]
+
+    batches = asyncio.run(read())
+
+    assert len(batches) == expected_batches
+    assert sum(len(batch) for batch in batches) == len(raw_data)
@@ -0,0 +1,107 @@
+import asyncio
+
+from pymongo import errors
+
+from src.core.bulk_writer import BulkWriter, split_chunks
+
+
+class FakeCollection:
+    """
+    Keeps inserted documents by `id` and answers `bulk_write` the way
+    MongoDB does for unordered inserts into a unique index.
+    """
+
+    def __init__(self, fail_times: int = 0):
+        self.documents: dict = {}
+        self.fail_times = fail_times
+        self.calls = 0
+
+    def bulk_write(self, requests, ordered):
+        self.calls += 1
+        if self.fail_times:
+            self.fail_times -= 1
+            raise errors.AutoReconnect('connection reset')
+
+        inserted = 0
+        write_errors = []
+        for index, request in enumerate(requests):
+            document = request._doc
+            if document['id'] in self.documents:
+                write_errors.append({
+                    'index': index,
+                    'code': 11000,
+                    'errmsg': 'E11000 duplicate key error',
+                })
+            else:
+                self.documents[document['id']] = document
+                inserted += 1
+
+        if write_errors:
+            raise errors.BulkWriteError({
+                'nInserted': inserted,
+                'writeErrors': write_errors,
+            })
+
+        return type('Result', (), {'bulk_api_result': {'nInserted': inserted}})
+
+
+class FakeAsyncCollection(FakeCollection):
+    async def bulk_write(self, requests, ordered):
+        return super().bulk_write(requests, ordered)
+
+
+def test_split_chunks_by_size_and_bytes(raw_data):
+    expected_chunks = 4
+
+    by_size = split_chunks(raw_data, chunk_size=3, chunk_bytes=1024**2)
+    by_bytes = split_chunks(raw_data, chunk_size=100, chunk_bytes=1)
+
+    assert [len(chunk) for chunk in by_size] == [3, 3, 3, 1]
+    assert len(by_size) == expected_chunks
+    assert len(by_bytes) == len(raw_data)
+
+
+def test_duplicates_are_skipped(raw_data):
+    expected_duplicates = 2
+    collection = FakeCollection()
+    raw_data.extend([{'id': 1}, {'id': 2}])
+
+    result = BulkWriter(chunk_size=4, workers=1).write(collection, raw_data)
+
+    assert result.inserted == len(collection.documents)
+    assert result.duplicates == expected_duplicates
+    assert result.failed == 0
+
+
+def test_transient_errors_are_retried(raw_data):
+    collection = FakeCollection(fail_times=2)
+    writer = BulkWriter(chunk_size=100, workers=1, max_retries=2)
+    writer._backoff = lambda attempt: 0
+
+    result = writer.write(collection, raw_data)
+
+    assert result.inserted == len(raw_data)
+    assert collection.calls == writer.max_retries + 1
+
+
+def test_chunk_fails_after_max_retries(raw_data):
+    collection = FakeCollection(fail_times=5)
+    writer = BulkWriter(chunk_size=100, workers=1, max_retries=1)
+    writer._backoff = lambda attempt: 0
+
+    result = writer.write(collection, raw_data)
+
+    assert result.failed == len(raw_data)
+    assert 'connection reset' in result.errors[0]
+    assert result.failed_ids == [item['id'] for item in raw_data]
+
+
+def test_write_async(raw_data):
+    collection = FakeAsyncCollection()
+
+    result = asyncio.run(
+        BulkWriter(chunk_size=3, workers=2).write_async(collection, raw_data)
+    )
+
+    assert result.inserted == len(raw_data)
+    assert len(collection.documents) == len(raw_data)
@@ -0,0 +1,182 @@
+import base64
+import json
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+from src.core.aggregates import compute_aggregates
+from src.core.columnar import compact_frame
+from src.dash.clientside import ASSETS_PATH, encode_array, listing_store
+from src.dash.components.body import treemap
+from src.dash.data import FRAME_SCHEMA, District
+from src.dash.index import ListingIndex
+from tests.benchmarks.synthetic import make_dash_frame
+
+FILTERS = [
+    (None, 1, 10),
+    ('FLAT', 2, 9),
+    ('HOUSE', 3, 3),
+    ('FLAT', 8, 8),
+    (None, 1, 1),
+    (None, 10, 10),
+]
+
+RUN_FILTERS = """
+const fs = require('fs');
+global.window = {};
+eval(fs.readFileSync(process.argv[1], 'utf8'));
+const [store, filters] = JSON.parse(fs.readFileSync(0, 'utf8'));
+const prices = filters.map(([estate, low, high]) =>
+    window.dash_clientside.dashboard
+        .scatter(store, estate, ['log_x'], [low, high])
+        .data.flatMap((trace) => Array.from(trace.y))
+        .sort((a, b) => a - b)
+);
+console.log(JSON.stringify(prices));
+"""
+
+
+def decode_array(column: dict[str, str]) -> np.ndarray:
+    return np.frombuffer(
+        base64.b64decode(column['data']),
+        dtype=np.dtype(column['dtype']).newbyteorder('<'),
+    )
+
+
+@pytest.fixture
+def index():
+    return ListingIndex(compact_frame(make_dash_frame(3_000), FRAME_SCHEMA))
+
+
+@pytest.fixture
+def wide_index():
+    """
+    Listings whose prices are above the int32 range, so they are kept as
+    int64.
+    """
+
+    listings = make_dash_frame(3_000)
+    listings['totalPrice'] = listings['totalPrice'].round() + 2**31
+    return ListingIndex(compact_frame(listings, FRAME_SCHEMA))
+
+
+def slice_prices(store, estate, low_mark, high_mark) -> np.ndarray:
+    prices = decode_array(store['columns']['price'])
+    low = store['marks'].index(low_mark)
+    high = store['marks'].index(high_mark)
+
+    slices = []
+    for name, offsets in store['estates'].items():
+        if estate in {None, name}:
+            start = offsets['bounds'][0] + offsets['lower'][low]
+            end = offsets['bounds'][0] + offsets['upper'][high]
+            slices.append(prices[start:end])
+
+    return np.sort(np.concatenate(slices))
+
+
+def expected_prices(index, estate, low_mark, high_mark) -> np.ndarray:
+    return np.sort(
+        index.area_range(estate, low_mark, high_mark)['totalPrice'].to_numpy()
+    )
+
+
+def test_arrays_are_encoded_with_their_type():
+    values = np.array([1, -2, 30_000], dtype='int16')
+
+    column = encode_array(values)
+
+    assert column['dtype'] == 'int16'
+    assert np.array_equal(decode_array(column), values)
+
+
+def test_wide_integers_are_sent_as_float64(wide_index):
+    store = json.loads(json.dumps(listing_store(wide_index)))
+
+    assert wide_index.df['totalPrice'].dtype == np.int64
+    assert store['columns']['price']['dtype'] == 'float64'
+    for estate, low_mark, high_mark in FILTERS:
+        assert np.array_equal(
+            slice_prices(store, estate, low_mark, high_mark),
+            expected_prices(wide_index, estate, low_mark, high_mark),
+        )
+
+
+def test_store_slices_match_the_index(index):
+    store = json.loads(json.dumps(listing_store(index)))
+
+    for estate, low_mark, high_mark in FILTERS:
+        assert np.array_equal(
+            slice_prices(store, estate, low_mark, high_mark),
+            expected_prices(index, estate, low_mark, high_mark),
+        )
+
+
+def test_store_is_sampled_above_the_limit(index):
+    max_listings = 500
+
+    store = listing_store(index, max_listings=max_listings)
+    listings = len(decode_array(store['columns']['price']))
+
+    # Each room type is sampled in proportion, rounded on its own.
+    assert listings < len(index.df) / 2
+    assert listings == pytest.approx(max_listings, abs=len(store['rooms']))
+    assert listings == sum(
+        end - start
+        for start, end in (
+            offsets['bounds'] for offsets in store['estates'].values()
+        )
+    )
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is needed')
+@pytest.mark.parametrize('index_fixture', ['index', 'wide_index'])
+def test_clientside_filters_match_the_index(request, index_fixture):
+    index = request.getfixturevalue(index_fixture)
+    store = {**listing_store(index), 'layout': {}, 'colors': {}}
+
+    process = subprocess.run(
+        ['node', '-e', RUN_FILTERS, str(ASSETS_PATH / 'clientside.js')],
+        input=json.dumps([store, FILTERS]),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    for prices, (estate, low_mark, high_mark) in zip(
+        json.loads(process.stdout), FILTERS
+    ):
+        assert (
+            prices
+            == expected_prices(index, estate, low_mark, high_mark).tolist()
+        )
+
+
+def test_treemap_store_is_built_from_one_data_version(monkeypatch):
+    versions = []
+    for seed in range(2):
+        listings = make_dash_frame(500, seed=seed)
+        df = compact_frame(listings, FRAME_SCHEMA)
+        versions.append(
+            District(
+                name='lisboa',
+                df=df,
+                aggregates=compute_aggregates(listings),
+                index=ListingIndex(df),
+            )
+        )
+    # Each lookup sees a newer version, as after a refresh.
+    lookups = iter(versions)
+    monkeypatch.setattr(
+        treemap.provider, 'district', lambda name: next(lookups)
+    )
+
+    store = treemap.treemap_store('lisboa')
+
+    first = versions[0]
+    assert store == {
+        estate or '': treemap.treemap_figure(first, estate)
+        for estate in [None, *treemap.estate_options(first)]
+    }
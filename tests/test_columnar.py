@@ -0,0 +1,65 @@
+import pandas as pd
+
+from src.core.columnar import (
+    category_mask,
+    compact_frame,
+    frame_from_batch,
+    memory_report,
+    memory_usage,
+)
+
+SCHEMA = {'estate': 'category', 'totalPrice': 'numeric', 'area': 'numeric'}
+
+
+def listings() -> pd.DataFrame:
+    return pd.DataFrame({
+        'title': ['Ad 1', 'Ad 2', 'Ad 3', 'Ad 4'],
+        'estate': ['FLAT', 'HOUSE', 'FLAT', 'FLAT'],
+        'totalPrice': [100_000.0, 250_000.0, 90_000.0, 1_500_000.0],
+        'area': [50.5, 120.0, 45.0, 300.0],
+    })
+
+
+def test_frame_from_batch_flattens_dotted_fields():
+    batch = [
+        {'id': 1, 'totalPrice': {'value': 100_000}, 'estate': 'FLAT'},
+        {'id': 2, 'totalPrice': {'value': 250_000}},
+        {'id': 3, 'totalPrice': None, 'estate': 'HOUSE'},
+    ]
+
+    df = frame_from_batch(batch=batch, fields=['id', 'totalPrice.value'])
+
+    assert list(df.columns) == ['id', 'totalPrice.value']
+    assert df['id'].tolist() == [1, 2, 3]
+    assert df['totalPrice.value'].iloc[:2].tolist() == [100_000, 250_000]
+    assert df['totalPrice.value'].isna().iloc[2]
+
+
+def test_frame_from_batch_fills_missing_fields_with_nulls():
+    batch = [{'id': 1, 'estate': 'FLAT'}, {'id': 2}]
+
+    df = frame_from_batch(batch=batch, fields=['estate'])
+
+    assert df['estate'].iloc[0] == 'FLAT'
+    assert df['estate'].isna().iloc[1]
+
+
+def test_compact_frame_follows_the_schema():
+    df = listings()
+
+    compact_df = compact_frame(df, SCHEMA)
+
+    assert list(compact_df.columns) == list(SCHEMA)
+    assert compact_df['estate'].dtype == 'category'
+    assert compact_df['totalPrice'].dtype == 'int32'
+    assert compact_df['area'].dtype == 'float32'
+    assert compact_df['totalPrice'].tolist() == df['totalPrice'].tolist()
+    assert memory_usage(compact_df) < memory_usage(df)
+    assert 'dropped' in memory_report(df, compact_df)
+
+
+def test_category_mask_compares_codes():
+    estate = compact_frame(listings(), SCHEMA)['estate']
+
+    assert category_mask(estate, 'FLAT').tolist() == [True, False, True, True]
+    assert not category_mask(estate, 'CASTLE').any()
@@ -1,6 +1,8 @@
 from typing import Any
 
+from src.core.bulk_writer import BulkWriteResult
 from src.ingestion.consolidate import Consolidate
+from src.ingestion.known_ids import KnownIdIndex
 
 
 def test_filter_unique_and_add_availability(raw_data: list[dict]):
@@ -47,3 +49,35 @@ def test_insert_new_ads(
         for item in new_ads
         if item.get('id') not in consolidated_ids
     )
+
+
+def test_new_ads_skip_the_known_ids(
+    tmp_path,
+    filtered_data: list[dict[str, Any]],
+    consolidated_data: list[dict[str, Any]],
+):
+    known_ids = KnownIdIndex(path=tmp_path)
+    known_ids.add([item['id'] for item in consolidated_data] + [1])
+    available = [item for item in consolidated_data if item['is_available']]
+
+    new_ads = Consolidate.new_ads_to_insert(
+        consolidated_data=available,
+        filtered_data=filtered_data,
+        known_ids=known_ids,
+    )
+
+    assert [item['id'] for item in new_ads] == [2, 3, 4, 5]
+
+
+def test_failed_inserts_are_not_known(
+    tmp_path, consolidated_data: list[dict[str, Any]]
+):
+    consolidate = Consolidate.__new__(Consolidate)
+    consolidate.known_ids = KnownIdIndex(path=tmp_path)
+    consolidate.consolidated_data = consolidated_data
+    consolidate.ads_to_insert = [{'id': number} for number in range(1, 6)]
+    consolidate.insert_result = BulkWriteResult(failed=1, failed_ids=[3])
+
+    consolidate.update_known_ids()
+
+    assert consolidate.known_ids.unknown(range(1, 16)) == [3]
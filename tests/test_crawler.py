@@ -0,0 +1,53 @@
+import asyncio
+import json
+
+from src.ingestion.crawler import imovirtual_crawler
+from src.ingestion.crawler.imovirtual_crawler import ImovirtualCrawler
+
+
+class UnreachableMongo:
+    def __init__(self, *args, **kwargs):
+        raise AssertionError('the crawler should not connect to MongoDB')
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, page: int):
+        self.url = f'https://example.com/?page={page}'
+        page_props = {
+            'data': {'searchAds': {'items': [{'id': page}]}},
+        }
+        self.text = (
+            '<script>'
+            f'{json.dumps({"props": {"pageProps": page_props}})}'
+            '</script>'
+        )
+
+
+class FakeClient:
+    def __init__(self, *args, **kwargs): ...
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    @staticmethod
+    async def get(url, params, headers):
+        return FakeResponse(params['page'])
+
+
+def test_fetch_all_without_mongo_storage(monkeypatch):
+    monkeypatch.setattr(imovirtual_crawler, 'AsyncClient', FakeClient)
+    monkeypatch.setattr(
+        imovirtual_crawler, 'AsyncMongoConnection', UnreachableMongo
+    )
+    crawler = ImovirtualCrawler()
+    crawler.url = 'https://example.com/'
+    crawler.mongo_storage = False
+
+    ads = asyncio.run(crawler.fetch_all(total_pages=3))
+
+    assert sorted(ad['id'] for ad in ads) == [1, 2, 3]
@@ -0,0 +1,294 @@
+import re
+import weakref
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.core.mongodb import build_projection
+from src.core.settings import settings
+from src.core.snapshot import latest_snapshot, read_snapshot
+from src.ingestion import dash_etl
+from src.ingestion.dash_etl import (
+    FIELDS,
+    LOCATION_ID_FIELD,
+    dash_pipeline,
+    district_filter,
+    district_pipeline,
+    filter_data,
+    pop_watermark,
+    projection_pipeline,
+    transform_data,
+    watermark_key,
+)
+from tests.benchmarks.synthetic import location_id, make_listings
+
+START = datetime(2024, 10, 1)
+WATERMARK = watermark_key('dash')
+
+
+class FakeMongo:
+    """
+    Keeps the collections in memory and answers the calls made by
+    `dash_pipeline`, applying the district and `updated_at` watermark
+    filters.
+    """
+
+    def __init__(self, consolidated: list[dict]):
+        self.consolidated = consolidated
+        self.dash: dict = {}
+        self.watermarks: dict = {}
+        self.extracted = 0
+
+    @staticmethod
+    def ping():
+        return True
+
+    def changed(self, since):
+        return [
+            document
+            for document in self.consolidated
+            if since is None or document['updated_at'] > since
+        ]
+
+    def aggregate_batches(self, collection, pipeline, batch_size=None):
+        if collection == 'dash':
+            districts = {
+                document['district'] for document in self.dash.values()
+            }
+            yield [{'_id': district} for district in sorted(districts)]
+            return
+
+        since = pipeline[0]['$match'].get('updated_at', {}).get('$gt')
+        districts = {
+            location_id(document).split('/')[0]
+            for document in self.changed(since)
+        }
+        yield [{'_id': district} for district in sorted(districts)]
+
+    def iter_batches(self, collection, filter, fields, batch_size):
+        if collection == 'dash':
+            yield [
+                document
+                for document in self.dash.values()
+                if document['district'] == filter['district']
+            ]
+            return
+
+        since = filter.get('updated_at', {}).get('$gt')
+        pattern = re.compile(filter[LOCATION_ID_FIELD]['$regex'])
+        documents = [
+            dict(document)
+            for document in self.changed(since)
+            if pattern.match(location_id(document))
+        ]
+        self.extracted += len(documents)
+        batch_size = batch_size or len(documents) or 1
+        for start in range(0, len(documents), batch_size):
+            yield documents[start : start + batch_size]
+
+    def save_data(self, collection, data, unique_index, on_duplicate):
+        for document in data:
+            self.dash[document['id']] = document
+
+    def get_watermark(self, pipeline):
+        return self.watermarks.get(pipeline)
+
+    def set_watermark(self, pipeline, watermark):
+        self.watermarks[pipeline] = watermark
+
+
+def make_ad(
+    number: int, updated_at: datetime, location: str = 'lisboa/alvalade'
+) -> dict:
+    return {
+        'id': number,
+        'title': f'ad {number}',
+        'estate': 'FLAT',
+        'transaction': 'SELL',
+        'location': {
+            'address': {'city': {'name': 'Lisboa'}},
+            'reverseGeocoding': {
+                'locations': [
+                    {'id': location.split('/', maxsplit=1)[0]},
+                    {'id': location},
+                ]
+            },
+        },
+        'totalPrice': {'value': 100_000 * number},
+        'pricePerSquareMeter': {'value': 1_000},
+        'areaInSquareMeters': 100 * number,
+        'roomsNumber': 'TWO',
+        'is_available': True,
+        'updated_at': updated_at,
+    }
+
+
+@pytest.fixture
+def mongo(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, 'DASH_ETL_EXTRACTION', 'python')
+    monkeypatch.setattr(settings, 'SNAPSHOT_PATH', str(tmp_path))
+    monkeypatch.setattr(settings, 'DASH_ETL_WORKERS', 1)
+    return FakeMongo([make_ad(number, START) for number in range(1, 6)])
+
+
+def run(mongo, batch_size=None):
+    dash_pipeline(
+        mongo_conn=mongo,
+        extract_from='consolidated',
+        load_to='dash',
+        batch_size=batch_size,
+        incremental=True,
+    )
+
+
+def test_first_run_loads_everything_and_saves_watermark(mongo):
+    run(mongo)
+
+    assert sorted(mongo.dash) == [1, 2, 3, 4, 5]
+    assert mongo.watermarks[WATERMARK] == START
+    assert 'updated_at' not in mongo.dash[1]
+    assert mongo.dash[1]['location'] == 'Alvalade'
+    assert mongo.dash[1]['district'] == 'lisboa'
+    assert read_snapshot(partition='lisboa')['id'].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_districts_are_loaded_into_their_own_partitions(mongo):
+    expected_porto_id = 6
+    mongo.consolidated.append(
+        make_ad(expected_porto_id, START, location='porto/foz-do-douro')
+    )
+
+    run(mongo)
+
+    assert mongo.dash[expected_porto_id]['district'] == 'porto'
+    assert mongo.dash[expected_porto_id]['location'] == 'Foz Do Douro'
+    assert read_snapshot(partition='porto')['id'].tolist() == [
+        expected_porto_id
+    ]
+    assert len(read_snapshot(partition='lisboa')) == len([1, 2, 3, 4, 5])
+    assert (latest_snapshot() / 'porto' / 'headline.arrow').is_file()
+
+
+def test_snapshot_holds_one_district_at_a_time(mongo, monkeypatch):
+    porto_ads = 3
+    mongo.consolidated.extend(
+        make_ad(number, START, location='porto/foz-do-douro')
+        for number in range(6, 6 + porto_ads)
+    )
+    held = {'rows': 0, 'peak': 0}
+    read_dataframe = dash_etl.read_dataframe
+
+    def release(rows):
+        held['rows'] -= rows
+
+    def tracked_read_dataframe(**kwargs):
+        df = read_dataframe(**kwargs)
+        held['rows'] += len(df)
+        held['peak'] = max(held['peak'], held['rows'])
+        weakref.finalize(df, release, len(df))
+        return df
+
+    monkeypatch.setattr(dash_etl, 'read_dataframe', tracked_read_dataframe)
+
+    run(mongo)
+
+    assert held['peak'] == len([1, 2, 3, 4, 5])
+    assert len(read_snapshot(partition='porto')) == porto_ads
+
+
+def test_next_run_only_touches_the_delta(mongo):
+    expected_new_id = 6
+    run(mongo)
+    changed_at = START + timedelta(days=1)
+    mongo.consolidated[0].update(is_available=False, updated_at=changed_at)
+    mongo.consolidated.append(make_ad(expected_new_id, changed_at))
+    mongo.extracted = 0
+
+    run(mongo)
+
+    assert mongo.extracted == len([1, expected_new_id])
+    assert mongo.dash[1]['is_available'] is False
+    assert expected_new_id in mongo.dash
+    assert mongo.watermarks[WATERMARK] == changed_at
+
+
+def test_run_without_changes_keeps_watermark(mongo):
+    run(mongo)
+    mongo.extracted = 0
+
+    run(mongo)
+
+    assert mongo.extracted == 0
+    assert mongo.watermarks[WATERMARK] == START
+
+
+def test_chunked_and_one_shot_load_the_same_documents(mongo, monkeypatch):
+    # Whole batches without a column, which the other batches have.
+    without_rooms, without_title = 50, 100
+    mongo.consolidated = make_listings(size=500, missing_rate=0.2)
+    for number, listing in enumerate(mongo.consolidated):
+        listing['updated_at'] = START
+        if number < without_rooms:
+            listing.pop('roomsNumber', None)
+        elif number < without_title:
+            listing.pop('title', None)
+
+    monkeypatch.setattr(settings, 'DASH_ETL_CHUNKED', False)
+    run(mongo, batch_size=7)
+    one_shot = dict(mongo.dash)
+    mongo.dash.clear()
+    mongo.watermarks.clear()
+
+    monkeypatch.setattr(settings, 'DASH_ETL_CHUNKED', True)
+    run(mongo, batch_size=7)
+
+    assert one_shot
+    assert mongo.dash == one_shot
+
+
+def test_projection_pipeline_matches_python_path(mongo_database):
+    collection = mongo_database['dash_etl_test']
+    collection.drop()
+    collection.insert_many(make_listings(size=1_000, missing_rate=0.2))
+
+    documents = list(
+        collection.find(
+            district_filter('lisboa'), projection=build_projection(FIELDS)
+        )
+    )
+    pop_watermark(data=documents)
+    python_path = transform_data(
+        data=filter_data(data=documents), district='lisboa'
+    )
+
+    projected = list(
+        collection.aggregate(projection_pipeline(district='lisboa'))
+    )
+    pop_watermark(data=projected)
+    aggregation_path = transform_data(data=projected, district='lisboa')
+
+    assert python_path
+    assert sorted(aggregation_path, key=lambda item: item['id']) == sorted(
+        python_path, key=lambda item: item['id']
+    )
+
+
+def test_district_pipeline_lists_changed_districts(mongo_database):
+    collection = mongo_database['dash_etl_test']
+    collection.drop()
+    collection.insert_many([
+        make_ad(1, START),
+        make_ad(2, START, location='porto/foz-do-douro'),
+        make_ad(3, START + timedelta(days=1), location='porto/foz-do-douro'),
+    ])
+
+    every_district = [
+        group['_id'] for group in collection.aggregate(district_pipeline())
+    ]
+    changed = [
+        group['_id']
+        for group in collection.aggregate(district_pipeline(since=START))
+    ]
+
+    assert every_district == ['porto', 'lisboa']
+    assert changed == ['porto']
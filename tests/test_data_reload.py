@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from src.core.settings import settings
+from src.core.snapshot import LISTINGS, write_snapshot
+from src.dash.cache import figure_cache
+from src.dash.data import Data
+from tests.benchmarks.synthetic import make_dash_frame
+
+
+def write_listings(path, size: int) -> None:
+    write_snapshot(
+        {
+            district: {LISTINGS: listings}
+            for district, listings in make_dash_frame(size=size).groupby(
+                'district'
+            )
+        },
+        path=path,
+    )
+
+
+@pytest.fixture
+def snapshot_path(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, 'SNAPSHOT_PATH', str(tmp_path))
+    monkeypatch.setattr(settings, 'SNAPSHOT_KEEP', 2)
+    monkeypatch.setattr(settings, 'DASH_DEFAULT_DISTRICT', 'lisboa')
+    write_listings(tmp_path, size=300)
+    return tmp_path
+
+
+def test_new_snapshot_is_swapped_in(snapshot_path):
+    data = Data()
+    before = data.district('porto')
+    version = data.version
+
+    write_listings(snapshot_path, size=3_000)
+
+    assert data.refresh()
+    assert not data.refresh()
+    assert data.version != version
+    assert figure_cache.version == data.version
+    assert set(data.current.loaded) == {'lisboa', 'porto'}
+    assert len(data.district('porto').df) > len(before.df)
+
+
+def test_version_taken_by_a_callback_stays_consistent(snapshot_path):
+    data = Data()
+    current = data.current
+    district = current.district()
+
+    write_listings(snapshot_path, size=3_000)
+    data.refresh()
+
+    assert current.district() is district
+    assert data.district() is not district
+
+
+def test_unknown_district_falls_back_to_the_default(snapshot_path):
+    data = Data()
+
+    assert data.district('atlantis').name == data.default_district
+
+
+def test_loading_a_district_does_not_block_the_others(snapshot_path):
+    version = Data().current
+    lisboa = version.district('lisboa')
+    loading = threading.Event()
+    release = threading.Event()
+    load_district = version.load_district
+
+    def slow_load(name):
+        loading.set()
+        release.wait(timeout=10)
+        return load_district(name)
+
+    version.load_district = slow_load
+    thread = threading.Thread(target=version.district, args=['porto'])
+    thread.start()
+    loading.wait(timeout=10)
+
+    try:
+        assert version.district('lisboa') is lisboa
+        assert 'porto' not in version.loaded
+    finally:
+        release.set()
+        thread.join()
+
+    assert 'porto' in version.loaded
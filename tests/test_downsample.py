@@ -0,0 +1,64 @@
+import pytest
+
+from src.core.settings import settings
+from src.dash.downsample import (
+    CATEGORY,
+    COUNT,
+    X,
+    Y,
+    density_bins,
+    scatter_points,
+    stratified_sample,
+)
+from tests.benchmarks.synthetic import make_dash_frame
+
+
+@pytest.fixture
+def thresholds(monkeypatch):
+    monkeypatch.setattr(settings, 'DASH_SCATTER_WEBGL_POINTS', 100)
+    monkeypatch.setattr(settings, 'DASH_SCATTER_MAX_POINTS', 1_000)
+    monkeypatch.setattr(settings, 'DASH_SCATTER_BINS', 10)
+
+
+def test_points_are_kept_below_the_thresholds(thresholds):
+    small, medium = make_dash_frame(50), make_dash_frame(500)
+
+    assert scatter_points(small).render_mode == 'svg'
+    assert scatter_points(small).df is small
+    assert scatter_points(medium).render_mode == 'webgl'
+    assert scatter_points(medium).mode == 'listings'
+
+
+def test_bins_count_every_listing_in_a_bounded_grid(thresholds):
+    expected_bins = settings.DASH_SCATTER_BINS**2
+    listings = make_dash_frame(20_000)
+    points = scatter_points(listings)
+
+    per_category = points.df.groupby(CATEGORY, observed=True)[COUNT].sum()
+    expected = listings.groupby(CATEGORY, observed=True).size()
+
+    assert points.mode == 'bins'
+    assert points.size == COUNT
+    assert per_category.to_dict() == expected.to_dict()
+    assert len(points.df) <= expected_bins * len(expected)
+
+
+def test_bins_are_placed_within_the_listings_range():
+    listings = make_dash_frame(5_000)
+    bins = density_bins(listings, bins=20)
+
+    for column in [X, Y]:
+        low, high = listings[column].min(), listings[column].max()
+        assert bins[column].between(low * 0.999, high * 1.001).all()
+
+
+def test_sample_keeps_the_outliers_and_every_room_type():
+    expected_size = 1_000
+    listings = make_dash_frame(20_000)
+    sample = stratified_sample(listings, size=expected_size)
+
+    assert len(sample) <= expected_size
+    assert sample.index.is_unique
+    assert listings[Y].idxmax() in sample.index
+    assert listings[X].idxmin() in sample.index
+    assert set(sample[CATEGORY]) == set(listings[CATEGORY])
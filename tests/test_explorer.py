@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.columnar import compact_frame
+from src.core.settings import settings
+from src.core.snapshot import LISTINGS, write_snapshot
+from src.dash.data import FRAME_SCHEMA, Data
+from src.dash.explorer import (
+    DETAIL_FIELDS,
+    ID,
+    SORTABLE,
+    Condition,
+    ListingExplorer,
+    Query,
+    parse_query,
+)
+from src.dash.index import ListingIndex
+from tests.benchmarks.synthetic import make_dash_frame
+
+PAGE_SIZE = 37
+FILTERS = [
+    '',
+    '{estate} contains flat',
+    '{totalPrice} s> 500000 && {estate} = HOUSE',
+    '{pricePerSquareMeter} <= 2000 && {roomsNumberNotation} != T2',
+    '{totalPrice} s< 0',
+]
+
+
+@pytest.fixture(scope='module')
+def explorer():
+    df = compact_frame(make_dash_frame(3_000), FRAME_SCHEMA)
+    df = df.sample(frac=1, random_state=0).reset_index(drop=True)
+    return ListingExplorer(ListingIndex(df))
+
+
+def expected_positions(df: pd.DataFrame, query: Query) -> list[int]:
+    """
+    Returns the positions of the listings of a query with pandas: sorted by
+    value, then by position, reversed when descending.
+    """
+
+    mask = np.ones(len(df), dtype=bool)
+    for condition in query.conditions:
+        values = df[condition.column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(str).str.lower()
+            value = condition.value.lower()
+            if condition.operator == 'contains':
+                mask &= values.str.contains(value, regex=False).to_numpy()
+            elif condition.operator == '!=':
+                mask &= (values != value).to_numpy()
+            else:
+                mask &= (values == value).to_numpy()
+        else:
+            mask &= {
+                '<': values < condition.value,
+                '<=': values <= condition.value,
+                '>': values > condition.value,
+                '>=': values >= condition.value,
+            }[condition.operator].to_numpy()
+
+    positions = pd.DataFrame({'position': np.arange(len(df))})
+    if query.sort is not None:
+        positions['value'] = df[query.sort].astype(object).to_numpy()
+        positions = positions.sort_values(['value', 'position'])
+    positions = positions.loc[mask[positions['position']], 'position']
+
+    positions = positions.tolist()
+    return positions[::-1] if query.descending else positions
+
+
+def test_parse_query(explorer):
+    query = parse_query(
+        [{'column_id': 'totalPrice', 'direction': 'desc'}],
+        '{totalPrice} s> 100 && {estate} icontains "flat"',
+        explorer.df,
+    )
+
+    assert query == Query(
+        sort='totalPrice',
+        descending=True,
+        conditions=(
+            Condition('totalPrice', '>', 100.0),
+            Condition('estate', 'contains', 'flat'),
+        ),
+    )
+    unsortable = [{'column_id': 'title', 'direction': 'asc'}]
+    assert parse_query(unsortable, None, explorer.df) == Query()
+
+
+@pytest.mark.parametrize(
+    'filter_query',
+    [
+        '{title} icontains foo && {location} icontains bar',
+        '{estate} contains flat && {location} icontains bar',
+        '{totalPrice} s> cheap',
+        '{totalPrice} between 1',
+        '{nope} = 1',
+        'anything',
+    ],
+)
+def test_filters_that_cannot_be_applied_are_rejected(explorer, filter_query):
+    with pytest.raises(ValueError, match='filter|number'):
+        parse_query(None, filter_query, explorer.df)
+
+
+@pytest.mark.parametrize('filter_query', FILTERS)
+@pytest.mark.parametrize('sort', [None, *SORTABLE])
+@pytest.mark.parametrize('direction', ['asc', 'desc'])
+def test_keyset_pages_match_pandas(explorer, filter_query, sort, direction):
+    sort_by = [{'column_id': sort, 'direction': direction}] if sort else []
+    query = parse_query(sort_by, filter_query, explorer.df)
+    expected = expected_positions(explorer.df, query)
+
+    pages, after = [], None
+    while not pages or len(pages[-1]) == PAGE_SIZE:
+        pages.append(explorer.page(query, PAGE_SIZE, after=after).tolist())
+        after = pages[-1][-1] if pages[-1] else None
+
+    assert [item for page in pages for item in page] == expected
+    assert explorer.count(query) == len(expected)
+    for number, page in enumerate(pages):
+        assert explorer.page_at(query, PAGE_SIZE, number).tolist() == page
+
+
+def test_details_are_read_from_the_snapshot(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, 'SNAPSHOT_PATH', str(tmp_path))
+    listings = make_dash_frame(300)
+    write_snapshot(
+        {
+            district: {LISTINGS: district_listings}
+            for district, district_listings in listings.groupby('district')
+        },
+        path=tmp_path,
+    )
+    porto = listings[listings['district'] == 'porto']
+    ids = porto[ID].sample(10, random_state=0).tolist()
+
+    details = Data().current.listing_details('porto', [*ids, -1])
+
+    expected = porto.set_index(ID).loc[ids, DETAIL_FIELDS]
+    assert sorted(details[ID]) == sorted(ids)
+    pd.testing.assert_frame_equal(
+        details.set_index(ID).loc[ids], expected, check_dtype=False
+    )
@@ -0,0 +1,56 @@
+from src.dash.cache import FigureCache
+
+
+def make_plot(cache: FigureCache, calls: list):
+    @cache.memoize
+    def plot(estate, log_axis, area_mark):
+        calls.append((estate, log_axis, area_mark))
+        return {'estate': estate, 'calls': len(calls)}
+
+    return plot
+
+
+def test_repeated_inputs_are_served_from_the_cache():
+    calls: list = []
+    cache = FigureCache(maxsize=8)
+    cache.set_version('v1')
+    plot = make_plot(cache, calls)
+
+    first = plot('FLAT', ['log_x'], [1, 10])
+    second = plot('FLAT', ['log_x'], [1, 10])
+
+    assert first is second
+    assert len(calls) == 1
+    assert cache.info()['hits'] == 1
+
+
+def test_least_recently_used_figure_is_evicted():
+    expected_size = 2
+    calls: list = []
+    cache = FigureCache(maxsize=expected_size)
+    plot = make_plot(cache, calls)
+
+    plot('FLAT', [], [1, 10])
+    plot('HOUSE', [], [1, 10])
+    plot('FLAT', [], [1, 10])
+    plot(None, [], [1, 10])
+    plot('FLAT', [], [1, 10])
+    plot('HOUSE', [], [1, 10])
+
+    assert cache.info()['size'] == expected_size
+    assert [call[0] for call in calls] == ['FLAT', 'HOUSE', None, 'HOUSE']
+
+
+def test_new_data_version_drops_the_figures():
+    calls: list = []
+    cache = FigureCache(maxsize=8)
+    cache.set_version('v1')
+    plot = make_plot(cache, calls)
+    plot('FLAT', [], [1, 10])
+
+    cache.set_version('v1')
+    plot('FLAT', [], [1, 10])
+    cache.set_version('v2')
+
+    assert cache.info()['size'] == 0
+    assert plot('FLAT', [], [1, 10])['calls'] == len(['v1', 'v2'])
@@ -0,0 +1,94 @@
+import asyncio
+
+from pymongo.errors import OperationFailure
+
+from src.core.async_mongodb import AsyncMongoConnection
+from src.core.indexes import index_spec, query_spec, winning_index
+from src.core.mongodb import MongoConnection
+from src.core.settings import settings
+
+
+def test_consolidated_collection_declares_unique_id_index():
+    indexes = [index.document for index in index_spec('consolidated_test')]
+    consolidated_indexes = [
+        index.document for index in index_spec(settings.COLLECTION_CONSOLIDATE)
+    ]
+
+    assert not indexes
+    assert consolidated_indexes[0]['key'] == {'id': 1}
+    assert consolidated_indexes[0]['unique']
+
+
+def test_raw_collections_are_matched_by_prefix():
+    indexes = index_spec('raw_imovirtual')
+    queries = query_spec('raw_imovirtual')
+
+    assert [list(index.document['key']) for index in indexes] == [
+        ['id'],
+        ['crawl_run_id'],
+    ]
+    assert 'ads by crawl run' in queries
+
+
+def test_winning_index_walks_input_stages():
+    index_plan = {
+        'stage': 'FETCH',
+        'inputStage': {'stage': 'IXSCAN', 'indexName': 'id_1'},
+    }
+    sbe_plan = {'queryPlan': {'stage': 'COLLSCAN'}}
+
+    assert winning_index(index_plan) == 'id_1'
+    assert winning_index(sbe_plan) == 'COLLSCAN'
+
+
+class FailingCollection:
+    """
+    Fails to create the indexes `failures` times, then creates them.
+    """
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    def create_indexes(self, indexes):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise OperationFailure('not authorized')
+        return [index.document['name'] for index in indexes]
+
+
+class AsyncFailingCollection(FailingCollection):
+    async def create_indexes(self, indexes):
+        return super().create_indexes(indexes)
+
+
+def test_indexes_are_retried_after_a_failure():
+    collection = FailingCollection(failures=1)
+    mongo = object.__new__(MongoConnection)
+    mongo._db = {settings.COLLECTION_CONSOLIDATE: collection}
+    mongo._ensured_indexes = set()
+    expected_calls = 2
+
+    for _ in range(3):
+        mongo.ensure_indexes(collection=settings.COLLECTION_CONSOLIDATE)
+
+    assert collection.calls == expected_calls
+    assert mongo._ensured_indexes == {(settings.COLLECTION_CONSOLIDATE, '')}
+
+
+def test_async_indexes_are_retried_after_a_failure():
+    collection = AsyncFailingCollection(failures=1)
+    mongo = object.__new__(AsyncMongoConnection)
+    mongo._db = {settings.COLLECTION_CONSOLIDATE: collection}
+    mongo._ensured_indexes = set()
+    expected_calls = 2
+
+    async def ensure():
+        for _ in range(3):
+            await mongo.ensure_indexes(
+                collection=settings.COLLECTION_CONSOLIDATE
+            )
+
+    asyncio.run(ensure())
+
+    assert collection.calls == expected_calls
@@ -0,0 +1,48 @@
+import numpy as np
+
+from src.ingestion.known_ids import KnownIdIndex
+
+
+def test_add_and_contains(tmp_path):
+    expected_added = 3
+    known_id, unknown_id = 3, 2
+    index = KnownIdIndex(path=tmp_path)
+
+    added = index.add([5, 3, 1, 3])
+
+    assert added == expected_added
+    assert known_id in index
+    assert unknown_id not in index
+    assert index.contains([1, 2, 5]).tolist() == [True, False, True]
+
+
+def test_index_is_persisted_and_memory_mapped(tmp_path):
+    expected_length = 100
+    KnownIdIndex(path=tmp_path).add(range(expected_length))
+
+    index = KnownIdIndex(path=tmp_path)
+
+    assert len(index) == expected_length
+    assert isinstance(index.ids, np.memmap)
+    assert index.unknown([99, 100, 50, 101]) == [100, 101]
+
+
+def test_incremental_add_keeps_ids_sorted(tmp_path):
+    index = KnownIdIndex(path=tmp_path)
+    index.add(range(0, 1000, 2))
+
+    added = index.add(range(0, 1000, 3))
+
+    expected_ids = sorted(set(range(0, 1000, 2)) | set(range(0, 1000, 3)))
+    assert added == len(expected_ids) - 500
+    assert KnownIdIndex(path=tmp_path).ids.tolist() == expected_ids
+
+
+def test_bloom_filter_maybe_is_confirmed_by_exact_index(tmp_path):
+    index = KnownIdIndex(path=tmp_path, false_positive_rate=0.5)
+    index.add(range(0, 20_000, 2))
+
+    odd_ids = np.arange(1, 20_000, 2)
+
+    assert index._bloom_check(odd_ids).any()
+    assert not index.contains(odd_ids).any()
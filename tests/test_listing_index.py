@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from src.core.columnar import compact_frame
+from src.dash.data import FRAME_SCHEMA
+from src.dash.index import AREA, AREA_MARKS, ESTATE, ListingIndex
+from tests.benchmarks.synthetic import make_dash_frame
+
+
+@pytest.fixture(scope='module')
+def listings():
+    df = compact_frame(make_dash_frame(5_000), FRAME_SCHEMA)
+    return df.sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('estate', [None, 'FLAT', 'HOUSE', 'CASTLE'])
+def test_area_range_matches_the_masks(listings, estate):
+    index = ListingIndex(listings)
+    marks = list(AREA_MARKS)
+    # As the scatter plot did before the index: the first and last marks
+    # are the smallest and largest areas of the district.
+    areas = AREA_MARKS | {
+        marks[0]: listings[AREA].min(),
+        marks[-1]: listings[AREA].max(),
+    }
+
+    for low in marks:
+        for high in marks[marks.index(low) :]:
+            mask = listings[AREA].between(areas[low], areas[high])
+            if estate is not None:
+                mask &= listings[ESTATE] == estate
+
+            selected = index.area_range(estate, low, high)
+
+            assert sorted(selected.index) == list(listings.index[mask])
+            assert selected[AREA].is_monotonic_increasing
+
+
+def test_category_positions(listings):
+    index = ListingIndex(listings)
+    rooms = listings['roomsNumberNotation']
+
+    for value in rooms.cat.categories:
+        positions = index.positions('roomsNumberNotation', value)
+        assert np.array_equal(positions, np.flatnonzero(rooms == value))
+
+    assert sorted(index.values(ESTATE)) == sorted(listings[ESTATE].unique())
+    assert not len(index.positions(ESTATE, 'CASTLE'))
+
+
+def test_end_marks_select_the_extreme_areas(listings):
+    index = ListingIndex(listings)
+    first, last = min(AREA_MARKS), max(AREA_MARKS)
+
+    smallest = index.area_range(None, first, first)
+    largest = index.area_range(None, last, last)
+
+    assert len(smallest)
+    assert len(largest)
+    assert (smallest[AREA] == listings[AREA].min()).all()
+    assert (largest[AREA] == listings[AREA].max()).all()
@@ -0,0 +1,109 @@
+from datetime import datetime
+
+import pytest
+
+from src.core.mongodb import MongoConnection, batched
+from tests.test_dash_etl import make_ad
+
+COLLECTION = 'batches_test'
+BATCH_SIZE = 3
+BATCH_CASES = [
+    pytest.param(6, [3, 3], id='exact multiple'),
+    pytest.param(7, [3, 3, 1], id='short last batch'),
+    pytest.param(0, [], id='empty cursor'),
+]
+
+
+class FakeCursor:
+    def __init__(self, documents: list[dict]):
+        self.documents = documents
+        self.size = None
+
+    def batch_size(self, size: int) -> 'FakeCursor':
+        self.size = size
+        return self
+
+    def __iter__(self):
+        return iter(self.documents)
+
+
+class FakeCollection:
+    """
+    Answers `find` like pymongo, with a projection of top-level fields,
+    and keeps the cursor it returned.
+    """
+
+    def __init__(self, documents: list[dict]):
+        self.documents = documents
+        self.cursor = None
+
+    def find(self, filter, projection):
+        excluded = {field for field, value in projection.items() if not value}
+        included = set(projection) - excluded
+        self.cursor = FakeCursor([
+            {
+                field: value
+                for field, value in document.items()
+                if field not in excluded
+                and (not included or field in included or field == '_id')
+            }
+            for document in self.documents
+        ])
+        return self.cursor
+
+
+def make_connection(ads: int) -> tuple[MongoConnection, FakeCollection]:
+    collection = FakeCollection([
+        {'_id': number, **make_ad(number, datetime(2024, 10, 1))}
+        for number in range(1, ads + 1)
+    ])
+    mongo = object.__new__(MongoConnection)
+    mongo._db = {COLLECTION: collection}
+    mongo._ensured_indexes = set()
+    return mongo, collection
+
+
+@pytest.mark.parametrize(('documents', 'sizes'), BATCH_CASES)
+def test_batched_sizes(documents, sizes):
+    batches = list(batched(iter(range(documents)), BATCH_SIZE))
+
+    assert [len(batch) for batch in batches] == sizes
+    assert [item for batch in batches for item in batch] == list(
+        range(documents)
+    )
+
+
+@pytest.mark.parametrize(('documents', 'sizes'), BATCH_CASES)
+def test_iter_batches_sizes(documents, sizes):
+    mongo, collection = make_connection(documents)
+
+    batches = list(
+        mongo.iter_batches(collection=COLLECTION, batch_size=BATCH_SIZE)
+    )
+
+    assert collection.cursor.size == BATCH_SIZE
+    assert [len(batch) for batch in batches] == sizes
+    assert [ad['id'] for batch in batches for ad in batch] == list(
+        range(1, documents + 1)
+    )
+
+
+def test_iter_batches_applies_the_projection():
+    ads = 5
+    mongo, _ = make_connection(ads)
+
+    projected = list(
+        mongo.iter_batches(
+            collection=COLLECTION, fields=['id', 'title'], batch_size=2
+        )
+    )
+    every_field = list(mongo.iter_batches(collection=COLLECTION))
+
+    assert [set(ad) for batch in projected for ad in batch] == [
+        {'_id', 'id', 'title'}
+    ] * ads
+    assert all(
+        '_id' not in ad and 'location' in ad
+        for batch in every_field
+        for ad in batch
+    )
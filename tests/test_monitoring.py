@@ -0,0 +1,92 @@
+import json
+from types import SimpleNamespace
+
+from src.core.monitoring import (
+    CommandMetricsListener,
+    LatencyHistogram,
+    MongoStats,
+    PoolMetricsListener,
+)
+
+
+def command_event(request_id, command_name, command=None, **kwargs):
+    return SimpleNamespace(
+        connection_id=('localhost', 27017),
+        request_id=request_id,
+        command_name=command_name,
+        command=command or {},
+        **kwargs,
+    )
+
+
+def test_latency_histogram_percentiles():
+    expected_p50 = 5
+    expected_max = 300.0
+    histogram = LatencyHistogram()
+
+    for duration in [0.5, 3, 4, 4.5, 300]:
+        histogram.add(duration)
+
+    assert histogram.percentile(0.5) == expected_p50
+    assert histogram.percentile(0.99) == expected_max
+    assert histogram.to_dict()['buckets']['<=5ms'] == len([3, 4, 4.5])
+
+
+def test_command_listener_records_per_collection(raw_data):
+    expected_operations = 2
+    expected_max_ms = 2.5
+    stats = MongoStats()
+    listener = CommandMetricsListener(stats, measure_bytes=True)
+
+    listener.started(
+        command_event(1, 'insert', {'insert': 'raw', 'documents': raw_data})
+    )
+    listener.succeeded(
+        command_event(1, 'insert', duration_micros=2500, reply={'n': 10})
+    )
+    listener.started(command_event(2, 'find', {'find': 'raw'}))
+    listener.failed(command_event(2, 'find', duration_micros=800))
+
+    commands = stats.stats()['commands']
+
+    assert len(commands) == expected_operations
+    assert commands['raw.insert']['documents'] == len(raw_data)
+    assert commands['raw.insert']['bytes_sent'] > 0
+    assert commands['raw.insert']['latency']['max_ms'] == expected_max_ms
+    assert commands['raw.find']['failures'] == 1
+
+
+def test_command_bytes_are_not_measured_by_default(raw_data):
+    stats = MongoStats()
+    listener = CommandMetricsListener(stats)
+
+    listener.started(
+        command_event(1, 'insert', {'insert': 'raw', 'documents': raw_data})
+    )
+    listener.succeeded(
+        command_event(1, 'insert', duration_micros=100, reply={'n': 10})
+    )
+
+    insert = stats.stats()['commands']['raw.insert']
+    assert insert['documents'] == len(raw_data)
+    assert insert['bytes_sent'] == insert['bytes_received'] == 0
+
+
+def test_pool_listener_and_dump(tmp_path):
+    expected_checkouts = 2
+    stats = MongoStats()
+    listener = PoolMetricsListener(stats)
+
+    listener.connection_created(None)
+    listener.connection_checked_out(SimpleNamespace(duration=0.002))
+    listener.connection_checked_out(SimpleNamespace(duration=0.001))
+    listener.connection_checked_in(None)
+    listener.connection_closed(None)
+
+    path = stats.dump(tmp_path)
+    pool = json.loads(path.read_text())['pool']
+
+    assert pool['checkouts'] == expected_checkouts
+    assert pool['max_in_use'] == expected_checkouts
+    assert pool['connections_created'] == pool['connections_closed'] == 1
+    assert pool['checkout_wait']['count'] == expected_checkouts
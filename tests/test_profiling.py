@@ -0,0 +1,83 @@
+import json
+import tracemalloc
+
+from src.core.profiling import StageProfiler, compare_reports, main
+from src.core.settings import settings
+
+
+def report(run_id: str, wall_s: float, records: int = 100) -> dict:
+    return {
+        'run_id': run_id,
+        'stages': {
+            'dash': {'wall_s': wall_s, 'cpu_s': 0.1, 'records': records},
+            'dash.load': {'wall_s': 0.01, 'cpu_s': 0.01, 'records': records},
+        },
+    }
+
+
+def test_nested_stages_and_batches_are_recorded():
+    expected_batches = 3
+    profiler = StageProfiler()
+
+    with profiler.stage('dash'):
+        for _ in profiler.profile_batches('extract', [[1, 2], [3], [4]]):
+            with profiler.stage('transform') as stage:
+                stage.records += 1
+
+    stages = profiler.report()['stages']
+
+    assert list(stages) == ['dash', 'dash.extract', 'dash.transform']
+    assert stages['dash']['calls'] == 1
+    assert stages['dash.extract']['records'] == len([1, 2, 3, 4])
+    assert stages['dash.transform']['calls'] == expected_batches
+    assert stages['dash']['wall_s'] >= stages['dash.transform']['wall_s']
+    assert 'transform' in profiler.summary()
+
+
+def test_worker_stages_are_merged_under_the_current_stage():
+    expected_records = 10
+    worker, main_process = StageProfiler(), StageProfiler()
+    for _ in range(2):
+        with worker.stage('load') as stage:
+            stage.records += expected_records // 2
+
+    with main_process.stage('dash'):
+        main_process.merge(worker.collect())
+
+    load = main_process.report()['stages']['dash.load']
+
+    assert load['records'] == expected_records
+    assert not worker.report()['stages']
+
+
+def test_tracemalloc_peak_is_kept_per_stage(monkeypatch):
+    allocated = 5 * 1024**2
+    monkeypatch.setattr(settings, 'PROFILING_TRACEMALLOC', True)
+    profiler = StageProfiler()
+
+    with profiler.stage('consolidate'):
+        with profiler.stage('read'):
+            data = bytearray(allocated)
+        del data
+        with profiler.stage('diff'):
+            pass
+
+    tracemalloc.stop()
+    stages = profiler.report()['stages']
+
+    assert stages['consolidate.read']['peak_traced_bytes'] >= allocated
+    assert stages['consolidate.diff']['peak_traced_bytes'] < allocated
+    assert stages['consolidate']['peak_traced_bytes'] >= allocated
+
+
+def test_compare_flags_regressions(tmp_path):
+    for run_id, wall_s in [('1', 1.0), ('2', 1.2), ('3', 0.9), ('4', 2.0)]:
+        (tmp_path / f'profile_{run_id}.json').write_text(
+            json.dumps(report(run_id, wall_s))
+        )
+
+    regressions = compare_reports(report('5', 1.1), [report('1', 1.0)])
+
+    assert not regressions
+    assert main(['--path', str(tmp_path)]) == 1
+    assert main(['--path', str(tmp_path), '--threshold', '1.5']) == 0
@@ -0,0 +1,99 @@
+import gzip
+from http import HTTPStatus
+
+import pytest
+
+from src.core.snapshot import LISTINGS, write_snapshot
+from src.dash import data as data_module
+from src.dash.cache import response_cache
+from src.dash.components.app import create_app
+from src.dash.data import provider
+from tests.benchmarks.synthetic import make_dash_frame
+
+GZIP = {'Accept-Encoding': 'gzip'}
+
+
+class UnreachableMongo:
+    def __init__(self, *args, **kwargs):
+        raise AssertionError('the dashboard should not connect to MongoDB')
+
+
+def callback_payload(output: str, inputs: dict[str, object]) -> dict:
+    component, prop = output.split('.')
+    return {
+        'output': output,
+        'outputs': {'id': component, 'property': prop},
+        'inputs': [
+            {'id': name.split('.')[0], 'property': 'value', 'value': value}
+            for name, value in inputs.items()
+        ],
+        'changedPropIds': [],
+        'state': [],
+    }
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(data_module, 'MongoConnection', UnreachableMongo)
+    write_snapshot(
+        {
+            district: {LISTINGS: listings}
+            for district, listings in make_dash_frame(size=500).groupby(
+                'district'
+            )
+        },
+        path=tmp_path,
+    )
+    app = create_app(snapshot_path=tmp_path, preload=True)
+    yield app.server.test_client()
+    provider.configure(None)
+
+
+def test_layout_is_served_compressed_from_the_cache(client):
+    raw = client.get('/_dash-layout')
+    misses = response_cache.misses
+
+    compressed = client.get('/_dash-layout', headers=GZIP)
+
+    assert compressed.status_code == HTTPStatus.OK
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert gzip.decompress(compressed.data) == raw.data
+    assert response_cache.misses == misses
+    assert 'Content-Encoding' not in raw.headers
+
+
+def test_static_callbacks_are_cached(client):
+    payload = callback_payload(
+        'heatmap-figure.figure', {'district-selector': 'porto'}
+    )
+    first = client.post('/_dash-update-component', json=payload, headers=GZIP)
+    hits = response_cache.hits
+
+    second = client.post('/_dash-update-component', json=payload, headers=GZIP)
+
+    assert second.status_code == HTTPStatus.OK
+    assert second.data == first.data
+    assert response_cache.hits == hits + 1
+
+
+def test_other_callbacks_are_compressed_as_they_are_sent(client):
+    payload = callback_payload(
+        'scatter-figure.figure',
+        {
+            'district-selector': 'porto',
+            'estate-type-scatter': 'FLAT',
+            'log-axis': ['log'],
+            'area-mark': [1, 10],
+        },
+    )
+    entries = response_cache.misses + response_cache.hits
+
+    response = client.post(
+        '/_dash-update-component', json=payload, headers=GZIP
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert b'scatter-figure' in gzip.decompress(response.data)
+    assert response_cache.misses + response_cache.hits == entries
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.aggregates import compute_aggregates
+from src.core.columnar import compact_frame
+from src.core.snapshot import LISTINGS, write_snapshot
+from src.dash import shared as shared_module
+from src.dash.data import FRAME_SCHEMA, DataVersion
+from src.dash.index import ListingIndex
+from src.dash.shared import (
+    INDEX_PREFIX,
+    SHARED_FILE,
+    column_values,
+    process_memory,
+    read_frame,
+    write_frame,
+)
+from tests.benchmarks.synthetic import make_dash_frame
+
+
+@pytest.fixture
+def index():
+    return ListingIndex(compact_frame(make_dash_frame(2_000), FRAME_SCHEMA))
+
+
+@pytest.fixture
+def mapped_tables(monkeypatch):
+    """
+    The Arrow tables memory-mapped by `read_frame`, in the order read.
+    """
+
+    tables = []
+    read_table = shared_module.read_table
+
+    def tracked_read_table(file_path):
+        tables.append(read_table(file_path))
+        return tables[-1]
+
+    monkeypatch.setattr(shared_module, 'read_table', tracked_read_table)
+    return tables
+
+
+def assert_shares_mapped_buffers(shared: ListingIndex, table) -> None:
+    for column in shared.df.columns:
+        series = shared.df[column]
+        values = (
+            series.array.codes
+            if isinstance(series.dtype, pd.CategoricalDtype)
+            else series.to_numpy()
+        )
+        assert np.shares_memory(values, column_values(table, column))
+    for name, positions in shared.arrays.items():
+        mapped = column_values(table, f'{INDEX_PREFIX}{name}')
+        assert np.shares_memory(positions, mapped)
+
+
+def test_shared_frame_is_mapped_back_as_written(
+    index, mapped_tables, tmp_path
+):
+    file_path = tmp_path / SHARED_FILE
+    write_frame(index, file_path)
+
+    shared = read_frame(file_path)
+    again = read_frame(file_path)
+
+    pd.testing.assert_frame_equal(shared.df, index.df.reset_index(drop=True))
+    assert shared.offsets == index.offsets
+    for name, positions in index.arrays.items():
+        assert np.array_equal(shared.arrays[name], positions)
+    assert_shares_mapped_buffers(shared, mapped_tables[0])
+    assert_shares_mapped_buffers(again, mapped_tables[1])
+    pd.testing.assert_frame_equal(
+        shared.area_range('FLAT', 2, 9).reset_index(drop=True),
+        index.area_range('FLAT', 2, 9).reset_index(drop=True),
+    )
+
+
+def test_shared_frame_is_written_once(index, tmp_path):
+    file_path = tmp_path / SHARED_FILE
+    write_frame(index, file_path)
+    inode = file_path.stat().st_ino
+
+    write_frame(index, file_path)
+
+    assert file_path.stat().st_ino == inode
+    assert [path.name for path in tmp_path.iterdir()] == [SHARED_FILE]
+
+
+def test_workers_map_the_frame_of_the_first_one(mapped_tables, tmp_path):
+    write_snapshot(
+        {
+            district: {LISTINGS: listings, **compute_aggregates(listings)}
+            for district, listings in make_dash_frame(size=1_000).groupby(
+                'district'
+            )
+        },
+        path=tmp_path,
+    )
+    version_dir = next(tmp_path.iterdir())
+
+    first = DataVersion(version_dir.name, version_dir).district('porto')
+    second = DataVersion(version_dir.name, version_dir).district('porto')
+
+    assert (version_dir / 'porto' / SHARED_FILE).exists()
+    assert_shares_mapped_buffers(second.index, mapped_tables[-1])
+    assert len(second.df) == len(first.df)
+    assert second.aggregates.keys() == first.aggregates.keys()
+
+
+def test_process_memory_is_reported():
+    assert all(value >= 0 for value in process_memory().values())
+    assert max(process_memory().values()) > 0
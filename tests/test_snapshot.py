@@ -0,0 +1,89 @@
+import pandas as pd
+
+from src.core.snapshot import (
+    LISTINGS,
+    TMP_PREFIX,
+    latest_snapshot,
+    list_snapshots,
+    load_snapshot,
+    read_snapshot,
+    snapshot_partitions,
+    write_snapshot,
+)
+
+
+def listings(size: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        'id': range(size),
+        'estate': ['FLAT'] * size,
+        'location': ['Alvalade'] * size,
+        'totalPrice': [100_000] * size,
+        'areaInSquareMeters': [90] * size,
+        'extra': ['dropped'] * size,
+    })
+
+
+def partitions(size: int, **tables: pd.DataFrame) -> dict:
+    return {'lisboa': {LISTINGS: listings(size), **tables}}
+
+
+def test_snapshot_has_typed_columns(tmp_path):
+    expected_rows = 3
+    write_snapshot(partitions(expected_rows), path=tmp_path)
+
+    df = read_snapshot(path=tmp_path)
+
+    assert len(df) == expected_rows
+    assert 'extra' not in df.columns
+    assert df['totalPrice'].dtype == 'float64'
+    assert df['id'].dtype == 'int64'
+    assert df['title'].isna().all()
+
+
+def test_newest_snapshot_is_read_and_old_ones_pruned(tmp_path):
+    expected_versions = 2
+    (tmp_path / f'{TMP_PREFIX}unfinished').mkdir()
+
+    for size in [1, 2, 3]:
+        newest = write_snapshot(partitions(size), path=tmp_path, keep=2)
+
+    assert latest_snapshot(path=tmp_path) == newest
+    assert len(list_snapshots(path=tmp_path)) == expected_versions
+    assert len(read_snapshot(path=tmp_path)) == len([1, 2, 3])
+
+
+def test_no_snapshot(tmp_path):
+    assert read_snapshot(path=tmp_path / 'missing') is None
+
+
+def test_snapshot_tables_come_from_the_same_version(tmp_path):
+    table = pd.DataFrame({'location': ['Alvalade'], 'median': [1.0]})
+    version_dir = write_snapshot(
+        partitions(2, location_prices=table), path=tmp_path
+    )
+
+    snapshot = load_snapshot(path=tmp_path)
+
+    assert snapshot.version == version_dir.name
+    assert list(snapshot.tables) == ['location_prices']
+    pd.testing.assert_frame_equal(
+        snapshot.tables['location_prices'], table, check_dtype=False
+    )
+
+
+def test_only_the_requested_partition_is_loaded(tmp_path):
+    expected_rows = 2
+    version_dir = write_snapshot(
+        {
+            'lisboa': {LISTINGS: listings(1)},
+            'porto': {LISTINGS: listings(expected_rows)},
+        },
+        path=tmp_path,
+    )
+
+    snapshot = load_snapshot(path=tmp_path, partition='porto')
+
+    assert snapshot_partitions(version_dir) == ['lisboa', 'porto']
+    assert snapshot.partition == 'porto'
+    assert len(snapshot.listings) == expected_rows
+    assert load_snapshot(path=tmp_path, partition='setubal') is None